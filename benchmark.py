@@ -0,0 +1,440 @@
+"""
+Banco de pruebas sin cámara ni pantalla para medir el rendimiento.
+
+Reproduce videos grabados o frames sintéticos con una silueta de mano a través
+del mismo camino que main.py (calibración -> process_frame -> contornos ->
+detect_gestures -> movement) usando un sustituto de pyautogui que solo registra
+las llamadas. Informa los FPS y la latencia por etapa de cada configuración,
+y compara el retraso frente al temblor de cada filtro del cursor.
+
+Uso:
+    python benchmark.py
+    python benchmark.py --video sesion.avi --configs base roi
+    python benchmark.py --video "capturas/*.png"
+    python benchmark.py --frames 600 --json resultados.json --min-fps 60
+"""
+import argparse
+import json
+import sys
+import time
+import types
+import cv2
+import numpy as np
+
+# Configuraciones a comparar: nombre -> valores de config a sobrescribir
+CONFIGURATIONS = {
+    "base": {},
+    "roi": {"ROI_TRACKING": True},
+    "adaptive": {"ADAPTIVE_BACKGROUND": True},
+    "roi+adaptive": {"ROI_TRACKING": True, "ADAPTIVE_BACKGROUND": True},
+    "scale0.5": {"PROCESSING_SCALE": 0.5},
+    "scale0.25": {"PROCESSING_SCALE": 0.25},
+    "stats": {"BACKGROUND_STATISTICS": True},
+    "stats+mad": {"BACKGROUND_STATISTICS": True, "BACKGROUND_ESTIMATOR": "mad"},
+    "nocache": {"GESTURE_CACHE": False},
+    "blobs": {"BLOB_ANALYSIS": True},
+    "blobs+two_hands": {"BLOB_ANALYSIS": True, "MAX_HANDS": 2},
+    "two_hands": {"MAX_HANDS": 2},
+    "skin": {"SKIN_SEGMENTATION": True, "SKIN_TABLE_PATH": None},
+    # Objetivo inalcanzable a propósito para recorrer los niveles de calidad
+    "budget": {"FRAME_BUDGET": True, "TARGET_FPS": 1000, "BUDGET_COOLDOWN": 0.1},
+}
+
+class RecordingPyAutoGUI(types.ModuleType):
+    """
+    Sustituto de pyautogui que registra las llamadas en lugar de enviarlas al sistema.
+    """
+
+    def __init__(self, screen_size=(1920, 1080)):
+        super().__init__("pyautogui")
+        self.__version__ = "recording"
+        self.FAILSAFE = True
+        self.PAUSE = 0.0
+        self.screen_size = screen_size
+        self.calls = []
+
+    def size(self):
+        return self.screen_size
+
+    def moveTo(self, x=None, y=None, *args, **kwargs):
+        self.calls.append(("moveTo", x, y))
+
+    def click(self, *args, **kwargs):
+        self.calls.append(("click",))
+
+    def scroll(self, clicks, *args, **kwargs):
+        self.calls.append(("scroll", clicks))
+
+    def hotkey(self, *keys, **kwargs):
+        self.calls.append(("hotkey",) + keys)
+
+def install_recording_pyautogui(screen_size=(1920, 1080)):
+    """
+    Reemplaza pyautogui por el sustituto que registra las llamadas.
+
+    Debe llamarse antes de importar los módulos del proyecto, ya que config.py
+    y movement.py importan pyautogui al cargarse.
+
+    Returns:
+        RecordingPyAutoGUI: Sustituto instalado
+    """
+    recorder = RecordingPyAutoGUI(screen_size)
+    sys.modules["pyautogui"] = recorder
+    return recorder
+
+class SyntheticHandSource:
+    """
+    Fuente de frames sintéticos con la misma interfaz que cv2.VideoCapture.
+
+    Los primeros `background_frames` frames muestran solo el fondo (para la
+    calibración); después aparece una silueta de mano que recorre la imagen y
+    cambia de número de dedos levantados.
+    """
+
+    def __init__(self, frames=300, size=(640, 480), background_frames=30, seed=0):
+        """
+        Args:
+            frames: Número de frames con mano tras la calibración
+            size: Tupla (ancho, alto) de los frames
+            background_frames: Número de frames iniciales sin mano
+            seed: Semilla del generador aleatorio
+        """
+        self.width, self.height = size
+        self.total = background_frames + frames
+        self.background_frames = background_frames
+        self.index = 0
+
+        # Fondo con textura y un degradado suave, más unos pocos patrones de ruido
+        rng = np.random.default_rng(seed)
+        gradient = np.linspace(60, 120, self.width, dtype=np.float32)[None, :, None]
+        texture = rng.normal(0, 6, (self.height, self.width, 3)).astype(np.float32)
+        self.background = np.clip(gradient + texture, 0, 255).astype(np.uint8)
+        self.noise = [rng.integers(-3, 4, (self.height, self.width, 3)).astype(np.int16)
+                      for _ in range(4)]
+
+    def isOpened(self):
+        return True
+
+    def get(self, prop):
+        if prop == cv2.CAP_PROP_FRAME_WIDTH:
+            return float(self.width)
+        if prop == cv2.CAP_PROP_FRAME_HEIGHT:
+            return float(self.height)
+        if prop == cv2.CAP_PROP_FPS:
+            return 30.0
+        return 0.0
+
+    def set(self, prop, value):
+        return False
+
+    def release(self):
+        pass
+
+    def _draw_hand(self, frame, i):
+        # Trayectoria de Lissajous y número de dedos que cambia cada 60 frames
+        t = i / 30.0
+        cx = int(self.width * (0.5 + 0.35 * np.sin(2.0 * t)))
+        cy = int(self.height * (0.55 + 0.15 * np.sin(2.9 * t)))
+        fingers = (i // 60) % 6
+        skin = (140, 170, 215)
+
+        cv2.rectangle(frame, (cx - 35, cy + 40), (cx + 35, self.height), skin, -1)
+        cv2.ellipse(frame, (cx, cy), (55, 65), 0, 0, 360, skin, -1)
+        for k in range(fingers):
+            angle = np.radians(-60 + k * 30)
+            tip = (int(cx + 120 * np.sin(angle)), int(cy - 120 * np.cos(angle)))
+            cv2.line(frame, (cx, cy), tip, skin, 22)
+
+    def read(self):
+        if self.index >= self.total:
+            return False, None
+        i = self.index
+        self.index += 1
+
+        noisy = self.background + self.noise[i % len(self.noise)]
+        frame = np.clip(noisy, 0, 255).astype(np.uint8)
+        if i >= self.background_frames:
+            self._draw_hand(frame, i - self.background_frames)
+        return True, frame
+
+class _ConfigOverride:
+    """
+    Sobrescribe valores de config durante un bloque with y los restaura después.
+    """
+
+    def __init__(self, config, overrides):
+        self.config = config
+        self.overrides = overrides
+        self._saved = {}
+
+    def __enter__(self):
+        for name, value in self.overrides.items():
+            self._saved[name] = getattr(self.config, name)
+            setattr(self.config, name, value)
+        return self.config
+
+    def __exit__(self, *exc):
+        for name, value in self._saved.items():
+            setattr(self.config, name, value)
+
+def run_benchmark(source, recorder, overrides=None):
+    """
+    Ejecuta el camino completo de detección sobre una fuente de frames.
+
+    Args:
+        source: Objeto con la interfaz de cv2.VideoCapture
+        recorder: RecordingPyAutoGUI instalado
+        overrides: Valores de config a sobrescribir durante la ejecución
+
+    Returns:
+        dict: FPS, número de frames, acciones registradas y latencia por etapa
+    """
+    import calibration
+    import config
+    import frame_budget
+    import metrics
+    import movement
+    import tracker
+
+    with _ConfigOverride(config, overrides or {}):
+        background, threshold_map = calibration.calibrate(source, show=False)
+        frame_width = int(source.get(cv2.CAP_PROP_FRAME_WIDTH)) or background.shape[1]
+        frame_height = int(source.get(cv2.CAP_PROP_FRAME_HEIGHT)) or background.shape[0]
+        hand_tracker = tracker.HandTracker(
+            background, (frame_width, frame_height), recorder.size(), threshold_map
+        )
+
+        budget = None
+        if config.FRAME_BUDGET:
+            budget = frame_budget.FrameBudgetController(
+                hand_tracker, config.TARGET_FPS, config.BUDGET_WINDOW,
+                config.BUDGET_HEADROOM, config.BUDGET_COOLDOWN)
+
+        # Marcas de tiempo de la fuente, para que los tiempos de confirmación de
+        # gestos no dependan de lo rápido que se reproduzca
+        frame_period = 1.0 / (source.get(cv2.CAP_PROP_FPS) or 30.0)
+
+        # Los enfriamientos de las acciones también siguen el reloj de la
+        # reproducción; si no, a cientos de FPS casi todas caen en enfriamiento
+        dispatcher = movement.action_dispatcher
+        dispatcher.clock = lambda: frames * frame_period
+        dispatcher.reset()
+
+        del recorder.calls[:]
+        submitted = movement.cursor_emitter.submitted
+        stage_metrics = metrics.StageMetrics()
+        frames = 0
+        actions = 0
+        start = time.perf_counter()
+        while True:
+            t0 = time.perf_counter()
+            ret, frame = source.read()
+            if not ret or frame is None:
+                break
+            t1 = time.perf_counter()
+            frame = cv2.flip(frame, 1, dst=hand_tracker.workspace.get('flip', frame.shape))
+            t2 = time.perf_counter()
+            result = hand_tracker.process(frame, frames * frame_period)
+            t3 = time.perf_counter()
+            if result['stable'] and movement.execute_action(result):
+                actions += 1
+            t4 = time.perf_counter()
+            if budget is not None:
+                budget.update(t4 - t1, time.monotonic())
+
+            stage_metrics.record_many(hand_tracker.stage_times)
+            stage_metrics.record_many({"capture": t1 - t0, "flip": t2 - t1,
+                                       "mouse_output": t4 - t3, "total": t4 - t0})
+            frames += 1
+        elapsed = time.perf_counter() - start
+
+        # Esperar a que se envíen el cursor y las acciones pendientes al sustituto
+        movement.cursor_emitter.stop()
+        dispatcher.flush()
+        dispatcher.clock = time.monotonic
+        dispatcher.reset()
+        cache = hand_tracker.gesture_cache
+        cache_stats = (cache.hits, cache.misses) if cache is not None else None
+        budget_stats = (budget.level, budget.changes) if budget is not None else None
+
+    return {
+        "frames": frames,
+        "fps": frames / elapsed if elapsed > 0 else 0.0,
+        "actions": actions,
+        "pyautogui_calls": len(recorder.calls),
+        "cursor_targets": movement.cursor_emitter.submitted - submitted,
+        "cursor_moves": sum(1 for call in recorder.calls if call[0] == "moveTo"),
+        "gesture_cache": cache_stats,
+        "budget": budget_stats,
+        "stages": stage_metrics.summary(),
+    }
+
+def cursor_trajectory(seconds=20.0, rate=30.0, noise_px=6.0, seed=0):
+    """
+    Genera una trayectoria de cursor con pausas y desplazamientos, y su versión ruidosa.
+
+    Returns:
+        tuple: (tiempos (N,), trayectoria real (N, 2), medidas ruidosas (N, 2),
+            máscara de pausa (N,))
+    """
+    rng = np.random.default_rng(seed)
+    times = np.arange(0.0, seconds, 1.0 / rate)
+    truth = np.empty((times.size, 2))
+    still = np.zeros(times.size, bool)
+
+    # Alternar 1 s quieto y 0.5 s de desplazamiento suave hacia un punto aleatorio
+    current = np.array([960.0, 540.0])
+    target = current
+    segment_start = 0.0
+    for i, t in enumerate(times):
+        phase = (t - segment_start) % 1.5
+        if phase < 1.0:
+            if i > 0 and (times[i - 1] - segment_start) % 1.5 >= 1.0:
+                current = target
+            truth[i] = current
+            # Ignorar el asentamiento justo después de un movimiento
+            still[i] = phase > 0.3
+        else:
+            if phase - 1.0 < 1.0 / rate:
+                target = rng.uniform([200, 150], [1720, 930])
+            progress = (1 - np.cos(np.pi * (phase - 1.0) / 0.5)) / 2
+            truth[i] = current + (target - current) * progress
+    measured = truth + rng.normal(0.0, noise_px, truth.shape)
+    return times, truth, measured, still
+
+def evaluate_filters(names=None, rate=30.0):
+    """
+    Compara los filtros del cursor en retraso frente a temblor.
+
+    Args:
+        names: Nombres de filtros.FILTERS a evaluar, o None para todos
+        rate: Frecuencia de muestreo simulada en Hz
+
+    Returns:
+        dict: filtro -> {'lag_ms', 'jitter_px', 'rmse_px', 'us_per_update'}
+    """
+    import filters
+
+    times, truth, measured, still = cursor_trajectory(rate=rate)
+    moving = ~still
+    report = {}
+    for name in names or list(filters.FILTERS):
+        cursor_filter = filters.create_filter(name)
+        start = time.perf_counter()
+        output = np.array([cursor_filter((x, y), t) for (x, y), t in zip(measured, times)],
+                          dtype=np.float64)
+        elapsed = time.perf_counter() - start
+
+        # Temblor: desplazamiento cuadrático medio entre frames con la mano quieta
+        steps = np.linalg.norm(np.diff(output, axis=0), axis=1)
+        jitter = float(np.sqrt(np.mean(steps[still[1:] & still[:-1]] ** 2)))
+
+        # Retraso: desfase (en frames) que mejor alinea la salida con la trayectoria real
+        best_shift, best_error = 0, np.inf
+        for shift in range(-5, 16):
+            if shift >= 0:
+                error = output[shift:] - truth[:truth.shape[0] - shift]
+                mask = moving[shift:]
+            else:
+                error = output[:shift] - truth[-shift:]
+                mask = moving[:shift]
+            rms = np.sqrt(np.mean(np.sum(error[mask] ** 2, axis=1)))
+            if rms < best_error:
+                best_shift, best_error = shift, rms
+
+        report[name] = {
+            "lag_ms": best_shift * 1000.0 / rate,
+            "jitter_px": jitter,
+            "rmse_px": float(np.sqrt(np.mean(np.sum((output - truth) ** 2, axis=1)))),
+            "us_per_update": elapsed / times.size * 1e6,
+        }
+    return report
+
+def print_filter_report(report):
+    """
+    Imprime la comparación de filtros del cursor.
+    """
+    print("\n== Filtros del cursor (retraso frente a temblor)")
+    print(f"{'filtro':<18}{'retraso ms':>12}{'temblor px':>12}{'rmse px':>10}{'us/muestra':>12}")
+    for name, stats in report.items():
+        print(f"{name:<18}{stats['lag_ms']:>12.1f}{stats['jitter_px']:>12.2f}"
+              f"{stats['rmse_px']:>10.1f}{stats['us_per_update']:>12.1f}")
+
+def print_report(name, report):
+    """
+    Imprime el resultado de una configuración en forma de tabla.
+    """
+    print(f"\n== {name}: {report['frames']} frames, {report['fps']:.1f} FPS, "
+          f"{report['actions']} acciones, {report['pyautogui_calls']} llamadas a pyautogui "
+          f"({report['cursor_moves']} de {report['cursor_targets']} posiciones del cursor enviadas)")
+    if report["gesture_cache"]:
+        hits, misses = report["gesture_cache"]
+        print(f"Caché de gestos: {hits} aciertos, {misses} fallos "
+              f"({100.0 * hits / max(1, hits + misses):.0f}% reutilizado)")
+    if report["budget"]:
+        level, changes = report["budget"]
+        print(f"Presupuesto de frame: nivel final {level} tras {changes} cambios de calidad")
+    print(f"{'etapa':<18}{'media ms':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    for stage, stats in report["stages"].items():
+        print(f"{stage:<18}{stats['mean_ms']:>10.3f}{stats['p50_ms']:>10.3f}"
+              f"{stats['p95_ms']:>10.3f}{stats['p99_ms']:>10.3f}{stats['max_ms']:>10.3f}")
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Banco de pruebas de Hand Mouse sin cámara.")
+    parser.add_argument("--video", action="append", default=[],
+                        help="Video grabado, carpeta o patrón de imágenes a reproducir (los "
+                             "primeros frames deben mostrar solo el fondo); se puede repetir")
+    parser.add_argument("--frames", type=int, default=300,
+                        help="Frames con mano de la fuente sintética")
+    parser.add_argument("--configs", nargs="+", default=list(CONFIGURATIONS),
+                        choices=list(CONFIGURATIONS), help="Configuraciones a medir")
+    parser.add_argument("--filters", nargs="*", default=None,
+                        help="Filtros del cursor a comparar (por defecto todos)")
+    parser.add_argument("--json", help="Archivo donde guardar los resultados en JSON")
+    parser.add_argument("--min-fps", type=float, default=0.0,
+                        help="Falla (código 1) si alguna configuración baja de estos FPS")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    """
+    Ejecuta todas las combinaciones de fuente y configuración.
+    """
+    args = parse_args(argv)
+    recorder = install_recording_pyautogui()
+    import config
+    import frame_source
+
+    if args.video:
+        sources = {path: (lambda path=path: frame_source.open_source(path)) for path in args.video}
+    else:
+        sources = {"sintetica": lambda: SyntheticHandSource(
+            args.frames, (config.FRAME_WIDTH, config.FRAME_HEIGHT), config.CALIBRATION_FRAMES)}
+
+    results = {}
+    failed = False
+    for source_name, make_source in sources.items():
+        for config_name in args.configs:
+            source = make_source()
+            try:
+                report = run_benchmark(source, recorder, CONFIGURATIONS[config_name])
+            finally:
+                source.release()
+            name = f"{source_name} [{config_name}]"
+            results[name] = report
+            print_report(name, report)
+            if report["fps"] < args.min_fps:
+                print(f"REGRESIÓN: {name} por debajo de {args.min_fps} FPS")
+                failed = True
+
+    filter_report = evaluate_filters(args.filters)
+    print_filter_report(filter_report)
+    results["filtros"] = filter_report
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResultados guardados en {args.json}")
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
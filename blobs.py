@@ -0,0 +1,130 @@
+"""
+Análisis de manchas de la silueta en una sola pasada y seguimiento de hasta dos manos.
+
+cv2.connectedComponentsWithStats da el área, el rectángulo y el centroide de
+todas las manchas de la imagen binaria en una sola pasada en C, de modo que
+el ruido de muchas manchas pequeñas no cuesta trabajo en Python: solo se
+traza el contorno de las manchas más grandes que superan el área mínima.
+Con una silueta limpia (pocos contornos) trazar todos los contornos sigue
+siendo más barato, así que es opcional (BLOB_ANALYSIS).
+"""
+import cv2
+import numpy as np
+
+import config
+
+def find_blobs(thresh, min_area, max_blobs=1, offset=(0, 0)):
+    """
+    Busca las manchas más grandes de una imagen binaria.
+
+    Args:
+        thresh: Imagen binaria (de la ventana si hay offset)
+        min_area: Área mínima en píxeles para considerar una mancha
+        max_blobs: Número máximo de manchas a devolver
+        offset: Posición (x, y) de thresh dentro del frame
+
+    Returns:
+        list: Manchas de mayor a menor área, cada una un dict con 'contour',
+            'area' (del contorno), 'bbox' y 'centroid' en coordenadas del frame
+    """
+    # Grana (BBDT) resulta más rápido aquí que el algoritmo por defecto
+    count, labels, stats, centroids = cv2.connectedComponentsWithStatsWithAlgorithm(
+        thresh, 8, cv2.CV_32S, cv2.CCL_GRANA)
+    if count <= 1:
+        return []
+
+    # La etiqueta 0 es el fondo; ordenar el resto por área y filtrar en NumPy
+    areas = stats[1:, cv2.CC_STAT_AREA]
+    candidates = np.flatnonzero(areas > min_area) + 1
+    candidates = candidates[np.argsort(-areas[candidates - 1], kind='stable')][:max_blobs]
+
+    ox, oy = offset
+    blobs = []
+    for label in candidates.tolist():
+        x, y, w, h = stats[label, :4].tolist()
+        # Trazar solo la mancha dentro de su rectángulo
+        mask = np.equal(labels[y:y + h, x:x + w], label).view(np.uint8)
+        contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE,
+                                       offset=(x + ox, y + oy))
+        contour = max(contours, key=len)
+        area = cv2.contourArea(contour)
+        if area <= min_area:
+            continue
+        blobs.append({
+            'contour': contour,
+            'area': area,
+            'bbox': (x + ox, y + oy, w, h),
+            'centroid': (centroids[label, 0] + ox, centroids[label, 1] + oy),
+        })
+    return blobs
+
+class BlobTracker:
+    """
+    Asigna identificadores estables a las manchas entre frames.
+
+    Cada mancha se empareja con la pista más cercana (por centroide) dentro
+    de max_distance; las manchas sin pareja abren una pista nueva y las
+    pistas sin mancha se olvidan tras max_misses frames.
+    """
+
+    def __init__(self, max_distance=config.BLOB_MATCH_DISTANCE, max_misses=config.BLOB_MAX_MISSES):
+        """
+        Args:
+            max_distance: Distancia máxima en píxeles entre frames para conservar el identificador
+            max_misses: Frames seguidos sin mancha antes de olvidar una pista
+        """
+        self.max_distance = max_distance
+        self.max_misses = max_misses
+        self.reset()
+
+    def reset(self):
+        """
+        Olvida todas las pistas.
+        """
+        self.tracks = {}
+        self._next_id = 0
+
+    def update(self, blobs):
+        """
+        Empareja las manchas del frame con las pistas y les asigna su 'id'.
+
+        Args:
+            blobs: Manchas devueltas por find_blobs
+
+        Returns:
+            list: Las mismas manchas con la clave 'id', de la pista más antigua a la más nueva
+        """
+        # Emparejamiento voraz por distancia creciente (son muy pocas manchas)
+        pairs = []
+        for track_id, (position, _) in self.tracks.items():
+            for index, blob in enumerate(blobs):
+                distance = np.hypot(blob['centroid'][0] - position[0],
+                                    blob['centroid'][1] - position[1])
+                if distance <= self.max_distance:
+                    pairs.append((distance, track_id, index))
+        pairs.sort()
+
+        matched_tracks = set()
+        for _, track_id, index in pairs:
+            if track_id in matched_tracks or 'id' in blobs[index]:
+                continue
+            blobs[index]['id'] = track_id
+            matched_tracks.add(track_id)
+
+        for blob in blobs:
+            if 'id' not in blob:
+                blob['id'] = self._next_id
+                self._next_id += 1
+            self.tracks[blob['id']] = (blob['centroid'], 0)
+
+        # Envejecer las pistas sin mancha en este frame
+        seen = {blob['id'] for blob in blobs}
+        for track_id, (position, misses) in list(self.tracks.items()):
+            if track_id in seen:
+                continue
+            if misses + 1 > self.max_misses:
+                del self.tracks[track_id]
+            else:
+                self.tracks[track_id] = (position, misses + 1)
+
+        return sorted(blobs, key=lambda blob: blob['id'])
\ No newline at end of file
@@ -1,20 +1,28 @@
 """
 Funciones relacionadas con la calibración del fondo para detección de movimiento.
 """
+import os
 import cv2
 import numpy as np
-from config import CALIBRATION_FRAMES
+import config
+from config import (CALIBRATION_FRAMES, BACKGROUND_LEARNING_RATE, BACKGROUND_CACHE_PATH,
+                    CACHE_VERIFY_FRAMES, CACHE_MAX_DIFFERENCE, CAMERA_INDEX)
 
-def calibrate_background(cap, frames=CALIBRATION_FRAMES):
+# Tamaño de la miniatura usada como huella de la escena
+FINGERPRINT_SIZE = (32, 24)
+
+def calibrate_background(cap, frames=CALIBRATION_FRAMES, show=True):
     """
     Calibra el fondo capturando varios frames y calculando un promedio ponderado.
     
     Args:
         cap: Objeto de captura de video
         frames: Número de frames a utilizar para la calibración
+        show: Si es False no se abre la ventana de progreso (modo sin ventanas)
         
     Returns:
-        background: Imagen de fondo calibrada
+        background: Imagen de fondo calibrada, volteada horizontalmente como
+            los frames del bucle principal
     """
     try:
         print("Calibrando fondo... mantén la cámara libre por 3 segundos")
@@ -34,17 +42,381 @@ def calibrate_background(cap, frames=CALIBRATION_FRAMES):
             cv2.accumulateWeighted(gray, background, 0.5)
             
             # Mostrar progreso
-            progress = int((i / frames) * 100)
-            cv2.putText(frame, f"Calibrando: {progress}%", (10, 30),
-                        cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
-            cv2.imshow('Calibración', frame)
-            cv2.waitKey(1)
+            if show:
+                progress = int((i / frames) * 100)
+                cv2.putText(frame, f"Calibrando: {progress}%", (10, 30),
+                            cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
+                cv2.imshow('Calibración', frame)
+                cv2.waitKey(1)
             
         if background is None:
             raise Exception("No se pudo calibrar el fondo - no se capturaron frames válidos")
             
-        cv2.destroyWindow('Calibración')
-        return background.astype(np.uint8)
+        if show:
+            cv2.destroyWindow('Calibración')
+        
+        # El bucle principal voltea los frames (interfaz tipo espejo): voltear
+        # también el fondo para que coincida con ellos
+        return cv2.flip(background.astype(np.uint8), 1)
     except Exception as e:
         print(f"Error en calibrate_background: {e}")
-        raise
\ No newline at end of file
+        raise
+
+def calibrate_background_statistics(cap, frames=CALIBRATION_FRAMES, show=True, estimator=None):
+    """
+    Calibra un modelo estadístico del fondo por píxel.
+    
+    Apila los frames de calibración (en grises y con el mismo desenfoque que
+    process_frame) en un solo arreglo y calcula en una pasada vectorizada el
+    centro y la dispersión de cada píxel. El umbral de cada píxel es k·σ,
+    acotado entre STAT_THRESHOLD_MIN y STAT_THRESHOLD_MAX, de modo que los
+    píxeles ruidosos (parpadeo, monitores) necesitan más diferencia para
+    considerarse primer plano.
+    
+    Args:
+        cap: Objeto de captura de video
+        frames: Número de frames a utilizar para la calibración
+        show: Si es False no se abre la ventana de progreso (modo sin ventanas)
+        estimator: "std" (media y desviación típica), "mad" (mediana y
+            desviación absoluta mediana, robusta a frames atípicos) o None
+            para config.BACKGROUND_ESTIMATOR
+        
+    Returns:
+        tuple: (fondo, mapa de umbrales), ambos uint8 y volteados
+            horizontalmente como los frames del bucle principal
+    """
+    try:
+        print("Calibrando fondo... mantén la cámara libre por 3 segundos")
+        stack = None
+        count = 0
+        
+        for i in range(frames):
+            ret, frame = cap.read()
+            if not ret or frame is None:
+                print("Error: No se pudo leer frame durante la calibración")
+                continue
+            
+            if stack is None:
+                stack = np.empty((frames,) + frame.shape[:2], np.uint8)
+            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+            cv2.GaussianBlur(gray, (7, 7), 0, dst=stack[count])
+            count += 1
+            
+            # Mostrar progreso
+            if show:
+                progress = int((i / frames) * 100)
+                cv2.putText(frame, f"Calibrando: {progress}%", (10, 30),
+                            cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
+                cv2.imshow('Calibración', frame)
+                cv2.waitKey(1)
+        
+        if stack is None:
+            raise Exception("No se pudo calibrar el fondo - no se capturaron frames válidos")
+        
+        if show:
+            cv2.destroyWindow('Calibración')
+        
+        stack = stack[:count]
+        estimator = config.BACKGROUND_ESTIMATOR if estimator is None else estimator
+        if estimator == "mad":
+            center = np.median(stack, axis=0).astype(np.float32)
+            # 1.4826·MAD estima σ para ruido gaussiano
+            sigma = 1.4826 * np.median(np.abs(stack - center), axis=0)
+        else:
+            center = stack.mean(axis=0, dtype=np.float32)
+            sigma = stack.std(axis=0, dtype=np.float32)
+        
+        background = np.rint(center).astype(np.uint8)
+        threshold_map = np.clip(config.STAT_THRESHOLD_K * sigma, config.STAT_THRESHOLD_MIN,
+                                config.STAT_THRESHOLD_MAX).astype(np.uint8)
+        return cv2.flip(background, 1), cv2.flip(threshold_map, 1)
+    except Exception as e:
+        print(f"Error en calibrate_background_statistics: {e}")
+        raise
+
+def calibrate(cap, show=True, statistics=None):
+    """
+    Calibra el fondo con el modo configurado.
+    
+    Args:
+        cap: Objeto de captura de video
+        show: Si es False no se abre la ventana de progreso
+        statistics: Si es True calibra el modelo estadístico por píxel, o
+            None para config.BACKGROUND_STATISTICS
+        
+    Returns:
+        tuple: (fondo, mapa de umbrales por píxel o None para el umbral global)
+    """
+    if config.BACKGROUND_STATISTICS if statistics is None else statistics:
+        return calibrate_background_statistics(cap, show=show)
+    return calibrate_background(cap, show=show), None
+
+def scene_fingerprint(gray):
+    """
+    Huella de la escena: miniatura en punto flotante de un frame en grises.
+    
+    Es lo bastante pequeña para compararla en microsegundos y tolera el ruido
+    del sensor, pero cambia si se mueve la cámara o algo grande en la escena.
+    """
+    return cv2.resize(gray, FINGERPRINT_SIZE, interpolation=cv2.INTER_AREA).astype(np.float32)
+
+def save_background_cache(background, threshold_map=None, camera_id=CAMERA_INDEX,
+                          path=BACKGROUND_CACHE_PATH):
+    """
+    Guarda el fondo calibrado junto con la cámara, la resolución y la huella de la escena.
+    
+    Args:
+        background: Fondo calibrado (uint8 en escala de grises)
+        threshold_map: Mapa de umbrales por píxel, o None
+        camera_id: Identificador de la cámara
+        path: Archivo de caché (.npz)
+    """
+    if threshold_map is None:
+        threshold_map = np.empty((0, 0), np.uint8)
+    try:
+        with open(path, "wb") as f:
+            np.savez(f, background=background, threshold_map=threshold_map,
+                     camera_id=str(camera_id), fingerprint=scene_fingerprint(background))
+    except OSError as e:
+        print(f"Error guardando el fondo en caché: {e}")
+
+def load_background_cache(resolution, camera_id=CAMERA_INDEX, path=BACKGROUND_CACHE_PATH):
+    """
+    Carga el fondo en caché si corresponde a la misma cámara, resolución y
+    modo de calibración.
+    
+    Args:
+        resolution: Tupla (ancho, alto) de la captura actual
+        camera_id: Identificador de la cámara actual
+        path: Archivo de caché (.npz)
+        
+    Returns:
+        tuple: (fondo, mapa de umbrales o None, huella), o None si no hay
+            caché válida
+    """
+    if not os.path.exists(path):
+        return None
+    try:
+        with np.load(path, allow_pickle=False) as data:
+            background = data["background"]
+            threshold_map = data["threshold_map"]
+            cached_camera = str(data["camera_id"])
+            fingerprint = data["fingerprint"]
+    except (OSError, KeyError, ValueError) as e:
+        print(f"Error leyendo el fondo en caché: {e}")
+        return None
+    
+    width, height = resolution
+    if cached_camera != str(camera_id) or background.shape != (height, width):
+        return None
+    threshold_map = threshold_map if threshold_map.size else None
+    if (threshold_map is not None) != config.BACKGROUND_STATISTICS:
+        return None
+    return background, threshold_map, fingerprint
+
+def verify_background(cap, fingerprint, frames=CACHE_VERIFY_FRAMES,
+                      max_difference=CACHE_MAX_DIFFERENCE):
+    """
+    Comprueba con unos pocos frames en vivo que la escena no ha cambiado.
+    
+    Args:
+        cap: Objeto de captura de video
+        fingerprint: Huella del fondo en caché
+        frames: Frames en vivo a promediar
+        max_difference: Diferencia media máxima en niveles de gris
+        
+    Returns:
+        bool: True si la escena coincide con la del fondo en caché
+    """
+    live = None
+    count = 0
+    for _ in range(frames):
+        ret, frame = cap.read()
+        if not ret or frame is None:
+            continue
+        # Misma orientación que el fondo calibrado (volteado)
+        gray = cv2.cvtColor(cv2.flip(frame, 1), cv2.COLOR_BGR2GRAY)
+        thumb = scene_fingerprint(gray)
+        live = thumb if live is None else live + thumb
+        count += 1
+    if count == 0:
+        return False
+    difference = float(np.mean(np.abs(live / count - fingerprint)))
+    return difference <= max_difference
+
+def calibrate_background_cached(cap, resolution, camera_id=CAMERA_INDEX,
+                                path=BACKGROUND_CACHE_PATH, show=True):
+    """
+    Reutiliza el fondo en caché si la escena no ha cambiado; si no, calibra y lo guarda.
+    
+    Args:
+        cap: Objeto de captura de video
+        resolution: Tupla (ancho, alto) de la captura
+        camera_id: Identificador de la cámara
+        path: Archivo de caché (.npz)
+        show: Si es False no se abre la ventana de progreso
+        
+    Returns:
+        tuple: (fondo, mapa de umbrales o None), volteados como los frames del
+            bucle principal
+    """
+    cached = load_background_cache(resolution, camera_id, path)
+    if cached is not None:
+        background, threshold_map, fingerprint = cached
+        if verify_background(cap, fingerprint):
+            print("Fondo en caché verificado; se omite la calibración.")
+            return background, threshold_map
+        print("La escena cambió desde la última calibración.")
+    
+    background, threshold_map = calibrate(cap, show=show)
+    save_background_cache(background, threshold_map, camera_id, path)
+    return background, threshold_map
+
+def calibrate_skin(cap, background, skin_model, frames=None, show=True):
+    """
+    Aprende la tabla de color de piel de la mano del usuario.
+    
+    En cada frame, los píxeles que difieren del fondo (erosionados para
+    quedarse con el interior de la mano y evitar los bordes) se cuentan como
+    piel y el resto como no piel.
+    
+    Args:
+        cap: Objeto de captura de video
+        background: Fondo calibrado (volteado, como los frames del bucle principal)
+        skin_model: SkinModel a entrenar
+        frames: Número de frames con la mano, o None para config.SKIN_CALIBRATION_FRAMES
+        show: Si es False no se abre la ventana de progreso
+        
+    Returns:
+        int: Colores aprendidos (0 si no se vio la mano y se mantiene la tabla)
+    """
+    frames = frames or config.SKIN_CALIBRATION_FRAMES
+    print("Calibrando piel... coloca la mano abierta frente a la cámara")
+    kernel = np.ones((7, 7), np.uint8)
+    for i in range(frames):
+        ret, frame = cap.read()
+        if not ret or frame is None:
+            print("Error: No se pudo leer frame durante la calibración de piel")
+            continue
+        frame = cv2.flip(frame, 1)
+        gray = cv2.GaussianBlur(cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY), (7, 7), 0)
+        _, moving = cv2.threshold(cv2.absdiff(background, gray), 25, 255, cv2.THRESH_BINARY)
+        hand = cv2.erode(moving, kernel, iterations=2)
+        skin_model.accumulate(frame, hand)
+        
+        if show:
+            progress = int((i / frames) * 100)
+            frame[hand > 0] //= 2
+            cv2.putText(frame, f"Calibrando piel: {progress}%", (10, 30),
+                        cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
+            cv2.imshow('Calibración', frame)
+            cv2.waitKey(1)
+    if show:
+        cv2.destroyWindow('Calibración')
+    
+    if skin_model.skin_samples < config.SKIN_MIN_SAMPLES * frames:
+        print("No se detectó la mano; se mantiene la tabla de piel anterior.")
+        return 0
+    learned = skin_model.fit()
+    print(f"Piel calibrada: {learned} colores aprendidos.")
+    return learned
+
+class BackgroundModel:
+    """
+    Modelo de fondo adaptativo que se actualiza un poco en cada frame.
+    
+    Mantiene una media móvil exponencial en punto flotante y su versión uint8
+    para la resta de fondo. Los píxeles marcados como primer plano (la mano y
+    un pequeño margen alrededor) no se actualizan, de modo que la mano no se
+    incorpora al fondo mientras la deriva de iluminación sí. Con seguimiento
+    por ventana, update() solo aprende dentro de la ventana y update_outside()
+    pone al día el resto del frame cada cierto número de frames.
+    """
+    
+    def __init__(self, background, learning_rate=BACKGROUND_LEARNING_RATE):
+        """
+        Args:
+            background: Fondo calibrado inicial (uint8 en escala de grises)
+            learning_rate: Peso de cada frame nuevo en la media (0 = sin aprendizaje)
+        """
+        self.learning_rate = learning_rate
+        self.frozen = False
+        self._kernel = np.ones((5, 5), np.uint8)
+        self.reset(background)
+    
+    def reset(self, background):
+        """
+        Reinicia el modelo con un fondo recién calibrado.
+        """
+        self.image = background.copy()
+        self.model = background.astype(np.float32)
+        self._mask = np.empty_like(background)
+    
+    def freeze(self):
+        """
+        Detiene la actualización del fondo.
+        """
+        self.frozen = True
+    
+    def unfreeze(self):
+        """
+        Reanuda la actualización del fondo.
+        """
+        self.frozen = False
+    
+    def toggle_freeze(self):
+        """
+        Alterna entre fondo congelado y adaptativo.
+        
+        Returns:
+            bool: True si el fondo quedó congelado
+        """
+        self.frozen = not self.frozen
+        return self.frozen
+    
+    def update(self, gray, foreground, roi=None):
+        """
+        Incorpora un frame al fondo ignorando los píxeles de primer plano.
+        
+        Args:
+            gray: Frame en escala de grises (de la ventana si hay roi)
+            foreground: Imagen binaria de primer plano del mismo tamaño que gray
+            roi: Ventana (x, y, ancho, alto) de gray dentro del frame
+        """
+        if self.frozen or self.learning_rate <= 0:
+            return
+        
+        model, image, mask = self.model, self.image, self._mask
+        if roi is not None:
+            x, y, w, h = roi
+            model = model[y:y + h, x:x + w]
+            image = image[y:y + h, x:x + w]
+            mask = mask[y:y + h, x:x + w]
+        
+        # Actualizar solo el fondo visible, con margen alrededor de la mano
+        cv2.dilate(foreground, self._kernel, dst=mask, iterations=2)
+        cv2.bitwise_not(mask, dst=mask)
+        cv2.accumulateWeighted(gray, model, self.learning_rate, mask=mask)
+        cv2.convertScaleAbs(model, dst=image)
+    
+    def update_outside(self, gray, roi, frames=1):
+        """
+        Incorpora un frame completo salvo la ventana de seguimiento.
+        
+        Fuera de la ventana no hay mano, así que todo se aprende como fondo.
+        
+        Args:
+            gray: Frame completo en escala de grises
+            roi: Ventana (x, y, ancho, alto) que se deja sin actualizar
+            frames: Frames transcurridos desde la anterior actualización
+                completa (el peso se escala para aprender al mismo ritmo)
+        """
+        if self.frozen or self.learning_rate <= 0:
+            return
+        
+        mask = self._mask
+        mask.fill(255)
+        x, y, w, h = roi
+        mask[y:y + h, x:x + w] = 0
+        cv2.accumulateWeighted(gray, self.model, min(1.0, self.learning_rate * frames), mask=mask)
+        cv2.convertScaleAbs(self.model, dst=self.image)
\ No newline at end of file
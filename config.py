@@ -2,27 +2,158 @@
 Configuraciones globales para el sistema de control por gestos.
 Centraliza todas las constantes y configuraciones del programa.
 """
-import pyautogui
 
 # Configuración de pyautogui
-pyautogui.FAILSAFE = True
-PYAUTOGUI_PAUSE = 0.1  # Pausa entre comandos en segundos
+PYAUTOGUI_PAUSE = 0.0  # Pausa entre comandos en segundos (la frecuencia la limitan los enfriamientos)
+
+# Configuración del despachador de acciones
+ACTION_COOLDOWN = 0.2  # Enfriamiento por defecto entre disparos de una misma acción (segundos)
+ACTION_COOLDOWNS = {  # Enfriamientos por acción (segundos)
+    "click": 0.2,
+    "scroll_up": 0.2,
+    "scroll_down": 0.2,
+    "zoom_in": 0.2,
+    "zoom_out": 0.2,
+    "rotate_left": 0.2,
+    "rotate_right": 0.2,
+}
 
 # Configuración para reconocimiento de gestos
 MIN_AREA = 1000  # Área mínima para considerar un contorno
 DEFECT_THRESHOLD = 12000  # Umbral para detectar defectos en la convexidad
+DEFECT_ANGLE_MAX = 90  # Ángulo máximo (grados) en el valle entre dos dedos
 HAND_RATIO_THRESHOLD = 1.5  # Umbral para detección de mano abierta/cerrada
 
+# Configuración de la segmentación
+FOREGROUND_THRESHOLD = 25  # Diferencia mínima con el fondo (niveles de gris) con el umbral global
+MORPH_ITERATIONS = 2  # Iteraciones de cierre y apertura con el umbral global
+
+# Configuración del análisis de manchas
+BLOB_ANALYSIS = False  # Buscar la mano con componentes conexas (más rápido con siluetas ruidosas) en lugar de trazar todos los contornos
+MAX_HANDS = 1  # Manos seguidas a la vez (1 o 2); la más antigua controla el cursor
+BLOB_MATCH_DISTANCE = 80  # Desplazamiento máximo en píxeles entre frames para conservar el identificador de una mano
+BLOB_MAX_MISSES = 3  # Frames seguidos sin ver una mano antes de olvidar su identificador
+
+# Configuración de la caché de gestos
+GESTURE_CACHE = True  # Reutilizar la clasificación mientras la forma de la mano no cambie
+GESTURE_CACHE_TOLERANCE = 0.02  # Variación relativa máxima de área, ancho y alto del contorno
+GESTURE_CACHE_HU_TOLERANCE = 0.03  # Variación máxima de los momentos de Hu (escala logarítmica)
+
 # Configuración de estabilidad
-GESTURE_STABILITY = 5  # Cuadros necesarios para confirmar un gesto
+GESTURE_ENTER_DWELL = 0.15  # Segundos que debe mantenerse un gesto para activarse
+GESTURE_EXIT_DWELL = 0.1  # Segundos que debe faltar un gesto para liberarse
+GESTURE_DWELLS = {  # Tiempos (entrada, salida) en segundos por gesto
+    "hand_closed": (0.15, 0.1),
+    "hand_open": (0.15, 0.1),
+    "pinch": (0.15, 0.1),
+    "rotate": (0.15, 0.1),
+}
+GESTURE_MAX_OUTLIERS = 1  # Frames seguidos con otro gesto que se ignoran como ruido
 SCREEN_MARGIN = 50  # Margen en píxeles para evitar llegar a los bordes de la pantalla
 
 # Configuración de la cámara
+CAMERA_INDEX = 0  # Índice de la cámara a abrir
 CAMERA_WIDTH = 640
 CAMERA_HEIGHT = 480
+CAMERA_FPS = 30  # FPS pedidos al controlador de la cámara (0 para su valor por defecto)
+CAMERA_FOURCC = "MJPG"  # Formato de captura: "MJPG", "YUYV" o None para el del controlador
+CAMERA_BUFFER_SIZE = 1  # Frames que el controlador puede encolar (0 para no cambiarlo; no todos los backends lo respetan)
+CAMERA_DRAIN = True  # Descartar con grab() los frames encolados para entregar siempre el más reciente
+CAMERA_MAX_DRAIN = 4  # Frames encolados que se descartan como máximo en cada lectura
 CALIBRATION_FRAMES = 30  # Número de frames para calibrar
 FRAME_WIDTH = 640  # Ancho de la ventana de visualización
 FRAME_HEIGHT = 480  # Alto de la ventana de visualización
 LEFT_REGION_FACTOR = 0.25  # Factor para determinar región izquierda
 RIGHT_REGION_FACTOR = 0.75  # Factor para determinar región derecha
-GESTURE_STABILITY = 5  # Cuadros necesarios para confirmar un gesto
\ No newline at end of file
+
+# Configuración del arranque rápido
+FAST_START = False  # Reutilizar el fondo en caché si la escena no cambió y omitir la espera inicial
+BACKGROUND_CACHE_PATH = "fondo_cache.npz"  # Fondo calibrado con la cámara, la resolución y la huella de la escena
+CACHE_VERIFY_FRAMES = 5  # Frames en vivo para comprobar el fondo en caché
+CACHE_MAX_DIFFERENCE = 8.0  # Diferencia media máxima (niveles de gris) para aceptar el fondo en caché
+
+# Configuración del modo pipeline
+PIPELINE_MODE = False  # Captura, visión y salida del ratón en hilos separados
+
+# Configuración de la captura en un proceso aparte (requiere Python 3.8+)
+SHARED_MEMORY_CAPTURE = False  # Capturar en otro proceso y leer los frames de memoria compartida
+FRAME_RING_SLOTS = 4  # Ranuras del anillo de frames compartido
+
+# Configuración del seguimiento por ventana (ROI)
+ROI_TRACKING = False  # Procesar solo una ventana alrededor de la mano una vez localizada
+ROI_PADDING = 40  # Margen base en píxeles alrededor del contorno de la mano
+ROI_EDGE_MARGIN = 8  # Distancia al borde de la ventana que hace crecer el margen
+ROI_GROWTH = 1.5  # Factor de crecimiento del margen cuando la mano se acerca al borde
+ROI_MAX_PADDING = 160  # Margen máximo en píxeles
+
+# Configuración del fondo adaptativo
+ADAPTIVE_BACKGROUND = False  # Actualizar el fondo un poco en cada frame
+BACKGROUND_LEARNING_RATE = 0.01  # Peso de cada frame nuevo en el fondo (0 = fondo estático)
+BACKGROUND_FULL_UPDATE_INTERVAL = 10  # Con ROI_TRACKING, frames entre actualizaciones del fondo fuera de la ventana
+
+# Configuración del modelo estadístico del fondo
+BACKGROUND_STATISTICS = False  # Umbral por píxel (k·σ) calculado en la calibración en lugar del global
+BACKGROUND_ESTIMATOR = "std"  # "std" (media y desviación típica) o "mad" (mediana y MAD, más robusto)
+STAT_THRESHOLD_K = 3.0  # Desviaciones típicas que debe superar un píxel para ser primer plano
+STAT_THRESHOLD_MIN = 15  # Umbral mínimo por píxel (niveles de gris)
+STAT_THRESHOLD_MAX = 80  # Umbral máximo por píxel (niveles de gris)
+STAT_MORPH_ITERATIONS = 1  # Iteraciones de cierre y apertura con umbral por píxel (MORPH_ITERATIONS con el global)
+
+# Configuración de la segmentación por color de piel
+SKIN_SEGMENTATION = False  # Combinar la resta de fondo con una tabla de color de piel
+SKIN_LUT_BITS = 5  # Bits por canal de la tabla BGR (5 = 32x32x32 colores)
+SKIN_THRESHOLD = 128  # Probabilidad mínima (0-255) para considerar piel un color
+SKIN_CALIBRATION = True  # Aprender la tabla de la mano del usuario al arrancar
+SKIN_CALIBRATION_FRAMES = 30  # Frames con la mano para aprender la tabla
+SKIN_MIN_SAMPLES = 20  # Muestras mínimas de un color para aprenderlo (si no, se usa la regla YCrCb)
+SKIN_TABLE_PATH = "tabla_piel.npy"  # Tabla aprendida (None para no guardarla)
+SKIN_MORPH_ITERATIONS = 1  # Iteraciones morfológicas con la máscara de piel, más limpia que la de movimiento
+
+# Configuración del detector de la mano
+DETECTOR_BACKEND = "contours"  # "contours" (resta de fondo y defectos) o "mediapipe" (puntos de referencia)
+MEDIAPIPE_DETECT_EVERY = 5  # Frames entre ejecuciones del modelo mientras se sigue la mano
+MEDIAPIPE_MIN_CONFIDENCE = 0.5  # Confianza mínima del modelo y del seguimiento
+MEDIAPIPE_MIN_TRACKED = 0.8  # Fracción mínima de puntos seguidos por flujo óptico
+MEDIAPIPE_MODEL_PATH = "hand_landmarker.task"  # Modelo para mediapipe >= 0.10.14 (API de tareas)
+
+# Configuración de la visualización
+DISPLAY_MODE = "full"  # "full" (cada frame), "preview" (a PREVIEW_RATE_HZ) o "headless" (sin ventanas)
+PREVIEW_RATE_HZ = 10  # Frecuencia de dibujo en modo "preview"
+
+# Configuración de las métricas de latencia
+METRICS_JSON_PATH = "latencias.json"  # Resumen por etapa al salir (None para no exportar)
+METRICS_CSV_PATH = "latencias.csv"  # Resumen por etapa al salir (None para no exportar)
+
+# Configuración de la telemetría por frame
+TELEMETRY = True  # Registrar cada frame en un archivo circular (ver telemetry.py)
+TELEMETRY_PATH = "telemetria.bin"  # Archivo del registro circular
+TELEMETRY_CAPACITY = 108000  # Registros guardados (una hora a 30 FPS, unos 12 MB)
+
+# Configuración de la resolución de procesamiento
+PROCESSING_SCALE = 1.0  # Escala de segmentación y contornos respecto a la captura (0.5 = 320x240)
+
+# Configuración del presupuesto de tiempo por frame
+FRAME_BUDGET = False  # Rebajar la calidad del procesamiento para mantener TARGET_FPS
+TARGET_FPS = 30  # FPS objetivo; el presupuesto por frame es 1/TARGET_FPS sin contar la espera de la cámara
+BUDGET_WINDOW = 30  # Frames de la media móvil del tiempo por frame
+BUDGET_HEADROOM = 0.6  # Se recupera calidad si la media baja de esta fracción del presupuesto
+BUDGET_COOLDOWN = 1.0  # Segundos mínimos entre dos cambios de calidad
+BUDGET_SCALE_FACTOR = 0.5  # Factor sobre PROCESSING_SCALE en los niveles de escala reducida
+
+# Configuración del filtro del cursor
+CURSOR_FILTER = "one_euro"  # "one_euro", "kalman", "exponential" o "moving_average" (el original)
+CURSOR_OUTPUT_HZ = 60  # Envíos de posición del cursor por segundo como máximo (refresco de pantalla)
+CURSOR_DEADBAND = 2  # Desplazamiento mínimo en píxeles para mover el cursor
+CURSOR_FILTER_RESET_GAP = 0.3  # Segundos sin posiciones filtradas tras los que el filtro olvida la velocidad
+ONE_EURO_MIN_CUTOFF = 1.0  # Frecuencia de corte (Hz) con la mano quieta
+ONE_EURO_BETA = 0.01  # Aumento de la frecuencia de corte por píxel/s de velocidad
+ONE_EURO_D_CUTOFF = 1.0  # Frecuencia de corte (Hz) del estimador de velocidad
+KALMAN_PROCESS_NOISE = 1e6  # Varianza de la aceleración de la mano (píxeles²/s⁴)
+KALMAN_MEASUREMENT_NOISE = 36.0  # Varianza del centro medido (píxeles²)
+KALMAN_LATENCY = 0.033  # Tiempo (s) que el predictor adelanta el cursor
+
+# Configuración del supervisor de varias cámaras (supervisor.py)
+SESSION_STATS_INTERVAL = 2.0  # Segundos entre informes de FPS y latencia de cada sesión
+SESSION_RESTART_DELAY = 1.0  # Espera inicial (s) antes de reiniciar una sesión caída
+SESSION_MAX_RESTARTS = 5  # Reinicios permitidos por sesión
+SESSION_STABLE_PERIOD = 60.0  # Segundos en marcha tras los que se olvidan los reinicios de una sesión
\ No newline at end of file
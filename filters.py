@@ -0,0 +1,209 @@
+"""
+Filtros del cursor con actualización incremental O(1) por muestra.
+
+Todos los filtros reciben posiciones de pantalla con la marca de tiempo de la
+muestra (time.monotonic()) y devuelven la posición filtrada en enteros:
+
+    cursor_filter = create_filter("one_euro")
+    x, y = cursor_filter((screen_x, screen_y), timestamp)
+"""
+import math
+from collections import deque
+
+import config
+import movement
+
+class WeightedAverageFilter:
+    """
+    Media ponderada de las últimas posiciones (el suavizado original).
+
+    Se conserva como referencia: no es O(1) y retrasa el cursor varios frames.
+    """
+
+    def __init__(self, max_len=7):
+        self.max_len = max_len
+        self.history = deque()
+
+    def reset(self):
+        self.history.clear()
+
+    def __call__(self, position, timestamp):
+        return movement.smooth_movement(self.history, position, self.max_len)
+
+class ExponentialFilter:
+    """
+    Media móvil exponencial con peso fijo por muestra.
+    """
+
+    def __init__(self, alpha=0.5):
+        """
+        Args:
+            alpha: Peso de la muestra nueva (1 = sin suavizado)
+        """
+        self.alpha = alpha
+        self.state = None
+
+    def reset(self):
+        self.state = None
+
+    def __call__(self, position, timestamp):
+        if self.state is None:
+            self.state = (float(position[0]), float(position[1]))
+        else:
+            a = self.alpha
+            self.state = (self.state[0] + a * (position[0] - self.state[0]),
+                          self.state[1] + a * (position[1] - self.state[1]))
+        return int(self.state[0]), int(self.state[1])
+
+def _smoothing_factor(cutoff, dt):
+    """
+    Peso de un filtro paso bajo de primer orden con frecuencia de corte en Hz.
+    """
+    tau = 1.0 / (2.0 * math.pi * cutoff)
+    return 1.0 / (1.0 + tau / dt)
+
+class OneEuroFilter:
+    """
+    Filtro paso bajo adaptativo (One-Euro).
+
+    La frecuencia de corte sube con la velocidad de la mano: con la mano quieta
+    el filtro suaviza mucho (sin temblor) y en movimientos rápidos casi no
+    suaviza (sin retraso). La velocidad se estima con su propio paso bajo.
+    """
+
+    def __init__(self, min_cutoff=config.ONE_EURO_MIN_CUTOFF, beta=config.ONE_EURO_BETA,
+                 d_cutoff=config.ONE_EURO_D_CUTOFF):
+        """
+        Args:
+            min_cutoff: Frecuencia de corte en Hz con la mano quieta
+            beta: Aumento de la frecuencia de corte por píxel/s de velocidad
+            d_cutoff: Frecuencia de corte en Hz del estimador de velocidad
+        """
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.d_cutoff = d_cutoff
+        self.reset()
+
+    def reset(self):
+        self.state = None
+        self.velocity = (0.0, 0.0)
+        self.timestamp = None
+
+    def __call__(self, position, timestamp):
+        x, y = float(position[0]), float(position[1])
+        if self.state is None:
+            self.state = (x, y)
+            self.timestamp = timestamp
+            return int(x), int(y)
+
+        dt = max(timestamp - self.timestamp, 1e-6)
+        self.timestamp = timestamp
+        prev_x, prev_y = self.state
+
+        # Velocidad filtrada
+        a_d = _smoothing_factor(self.d_cutoff, dt)
+        vx = self.velocity[0] + a_d * ((x - prev_x) / dt - self.velocity[0])
+        vy = self.velocity[1] + a_d * ((y - prev_y) / dt - self.velocity[1])
+        self.velocity = (vx, vy)
+
+        # Frecuencia de corte según la velocidad
+        cutoff = self.min_cutoff + self.beta * math.hypot(vx, vy)
+        a = _smoothing_factor(cutoff, dt)
+        self.state = (prev_x + a * (x - prev_x), prev_y + a * (y - prev_y))
+        return int(self.state[0]), int(self.state[1])
+
+class _KalmanAxis:
+    """
+    Filtro de Kalman de velocidad constante para un eje (estado posición, velocidad).
+    """
+
+    def __init__(self, position, process_noise, measurement_noise):
+        self.p = position
+        self.v = 0.0
+        # Covarianza del estado [[pp, pv], [pv, vv]]
+        self.pp, self.pv, self.vv = measurement_noise, 0.0, 1e6
+        self.q = process_noise
+        self.r = measurement_noise
+
+    def update(self, z, dt):
+        # Predicción con ruido de aceleración blanca
+        q = self.q
+        self.p += self.v * dt
+        self.pp += dt * (2.0 * self.pv + dt * self.vv) + q * dt ** 4 / 4.0
+        self.pv += dt * self.vv + q * dt ** 3 / 2.0
+        self.vv += q * dt ** 2
+
+        # Corrección con la medida
+        s = self.pp + self.r
+        k_p = self.pp / s
+        k_v = self.pv / s
+        innovation = z - self.p
+        self.p += k_p * innovation
+        self.v += k_v * innovation
+        self.vv -= k_v * self.pv
+        self.pv -= k_v * self.pp
+        self.pp -= k_p * self.pp
+
+class KalmanFilter:
+    """
+    Predictor de Kalman de velocidad constante.
+
+    Además de filtrar el ruido, extrapola la posición `latency` segundos hacia
+    adelante con la velocidad estimada para compensar el retraso del pipeline
+    (captura, procesamiento y salida).
+    """
+
+    def __init__(self, process_noise=config.KALMAN_PROCESS_NOISE,
+                 measurement_noise=config.KALMAN_MEASUREMENT_NOISE,
+                 latency=config.KALMAN_LATENCY):
+        """
+        Args:
+            process_noise: Varianza de la aceleración (píxeles²/s⁴)
+            measurement_noise: Varianza de la medida (píxeles²)
+            latency: Tiempo en segundos que se predice hacia adelante
+        """
+        self.process_noise = process_noise
+        self.measurement_noise = measurement_noise
+        self.latency = latency
+        self.reset()
+
+    def reset(self):
+        self.axes = None
+        self.timestamp = None
+
+    def __call__(self, position, timestamp):
+        if self.axes is None:
+            self.axes = [_KalmanAxis(float(value), self.process_noise, self.measurement_noise)
+                         for value in position]
+            self.timestamp = timestamp
+            return int(position[0]), int(position[1])
+
+        dt = max(timestamp - self.timestamp, 1e-6)
+        self.timestamp = timestamp
+        for axis, value in zip(self.axes, position):
+            axis.update(float(value), dt)
+        x, y = (axis.p + axis.v * self.latency for axis in self.axes)
+        return int(x), int(y)
+
+# Filtros disponibles por nombre (config.CURSOR_FILTER)
+FILTERS = {
+    "moving_average": WeightedAverageFilter,
+    "exponential": ExponentialFilter,
+    "one_euro": OneEuroFilter,
+    "kalman": KalmanFilter,
+}
+
+def create_filter(name=None):
+    """
+    Crea el filtro del cursor indicado, con los parámetros de config.
+
+    Args:
+        name: Nombre del filtro (ver FILTERS), o None para config.CURSOR_FILTER
+
+    Returns:
+        Filtro invocable como filtro(posición, marca_de_tiempo)
+    """
+    name = config.CURSOR_FILTER if name is None else name
+    if name not in FILTERS:
+        raise ValueError(f"Filtro de cursor desconocido: {name}")
+    return FILTERS[name]()
\ No newline at end of file
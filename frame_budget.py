@@ -0,0 +1,119 @@
+"""
+Control del presupuesto de tiempo por frame.
+
+Cuando el equipo está cargado, el tiempo de procesamiento de cada frame
+crece y el cursor responde con retraso. El controlador compara la media
+móvil de ese tiempo con el presupuesto 1/TARGET_FPS y, si se pasa, baja un
+nivel de calidad; cuando sobra margen, la recupera paso a paso. Cada cambio
+se anuncia por consola.
+"""
+from collections import deque
+
+import config
+
+# Niveles de calidad, de mejor a más barato; cada uno añade una rebaja al anterior
+QUALITY_LEVELS = (
+    ("completa", {"morph_reduction": 0, "scale_factor": 1.0,
+                  "overlays": True, "gesture_interval": 1}),
+    ("menos morfología", {"morph_reduction": 1, "scale_factor": 1.0,
+                          "overlays": True, "gesture_interval": 1}),
+    ("escala reducida", {"morph_reduction": 1, "scale_factor": config.BUDGET_SCALE_FACTOR,
+                         "overlays": True, "gesture_interval": 1}),
+    ("sin superposiciones", {"morph_reduction": 1, "scale_factor": config.BUDGET_SCALE_FACTOR,
+                             "overlays": False, "gesture_interval": 1}),
+    ("gestos alternos", {"morph_reduction": 1, "scale_factor": config.BUDGET_SCALE_FACTOR,
+                         "overlays": False, "gesture_interval": 2}),
+)
+
+class FrameBudgetController:
+    """
+    Ajusta la calidad del HandTracker para mantener los FPS objetivo.
+
+    El tiempo que se mide es el de trabajo (procesar, actuar y dibujar), sin
+    la espera de la cámara, que solo limita los FPS y no se puede recortar.
+    Tras cada cambio de nivel se vacía la ventana, de modo que la siguiente
+    decisión se toma con medidas del nivel nuevo.
+    """
+
+    def __init__(self, tracker, target_fps=config.TARGET_FPS, window=config.BUDGET_WINDOW,
+                 headroom=config.BUDGET_HEADROOM, cooldown=config.BUDGET_COOLDOWN,
+                 levels=QUALITY_LEVELS):
+        """
+        Args:
+            tracker: HandTracker cuya calidad se ajusta
+            target_fps: FPS objetivo
+            window: Frames de la media móvil
+            headroom: Fracción del presupuesto por debajo de la cual se recupera calidad
+            cooldown: Segundos mínimos entre dos cambios de nivel
+            levels: Secuencia de (nombre, ajustes) de mejor a más barato
+        """
+        self.tracker = tracker
+        self.budget = 1.0 / target_fps
+        self.headroom = headroom
+        self.cooldown = cooldown
+        self.levels = levels
+        self.base_scale = tracker.scale
+        self.frame_times = deque(maxlen=window)
+        self.level = 0
+        self.changes = 0
+        self._last_change = None
+
+    @property
+    def draw_overlays(self):
+        """
+        Indica si en el nivel actual se dibujan la detección y el panel.
+        """
+        return self.levels[self.level][1]["overlays"]
+
+    @property
+    def average(self):
+        """
+        Media móvil del tiempo por frame en segundos (0 sin medidas).
+        """
+        if not self.frame_times:
+            return 0.0
+        return sum(self.frame_times) / len(self.frame_times)
+
+    def apply(self):
+        """
+        Aplica al tracker los ajustes del nivel actual.
+        """
+        settings = self.levels[self.level][1]
+        self.tracker.morph_reduction = settings["morph_reduction"]
+        self.tracker.gesture_interval = settings["gesture_interval"]
+        self.tracker.set_scale(self.base_scale * settings["scale_factor"])
+
+    def update(self, frame_time, now):
+        """
+        Registra el tiempo de un frame y cambia de nivel si hace falta.
+
+        Args:
+            frame_time: Tiempo de trabajo del frame en segundos
+            now: Instante actual (time.monotonic())
+
+        Returns:
+            bool: True si cambió el nivel de calidad
+        """
+        self.frame_times.append(frame_time)
+        if len(self.frame_times) < self.frame_times.maxlen:
+            return False
+        if self._last_change is not None and now - self._last_change < self.cooldown:
+            return False
+
+        average = self.average
+        if average > self.budget and self.level < len(self.levels) - 1:
+            step = 1
+        elif average < self.headroom * self.budget and self.level > 0:
+            step = -1
+        else:
+            return False
+
+        self.level += step
+        self.changes += 1
+        self._last_change = now
+        self.frame_times.clear()
+        self.apply()
+        direction = "bajando" if step > 0 else "subiendo"
+        print(f"Presupuesto de frame: {average * 1000:.1f} ms de {self.budget * 1000:.1f} ms; "
+              f"{direction} calidad a nivel {self.level} ({self.levels[self.level][0]})")
+        return True
\ No newline at end of file
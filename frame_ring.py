@@ -0,0 +1,261 @@
+"""
+Captura en un proceso aparte con un anillo de frames en memoria compartida.
+
+El proceso de captura decodifica cada frame directamente en una ranura de un
+bloque de multiprocessing.shared_memory y publica su número de secuencia. El
+proceso de visión lee siempre la ranura más reciente como una vista de NumPy,
+sin copias ni pickling, de modo que las etapas de Python que consumen CPU no
+frenan la adquisición de frames.
+"""
+import multiprocessing
+import time
+from multiprocessing import shared_memory
+
+import cv2
+import numpy as np
+
+import config
+import frame_source
+
+class SharedFrameRing:
+    """
+    Anillo de ranuras de frames de forma fija en memoria compartida.
+
+    Cabecera (int64): última secuencia publicada, indicador de cierre y la
+    secuencia de cada ranura (-1 mientras se escribe), seguida de la marca de
+    tiempo (float64) de cada ranura. Un solo proceso escribe; los lectores
+    comprueban con is_valid() que la ranura no se haya reescrito.
+    """
+
+    def __init__(self, shape, slots=config.FRAME_RING_SLOTS, name=None):
+        """
+        Args:
+            shape: Forma (alto, ancho, canales) de cada frame
+            slots: Número de ranuras del anillo
+            name: Nombre de un anillo existente, o None para crear uno nuevo
+        """
+        self.shape = tuple(shape)
+        self.slots = slots
+        self.owner = name is None
+        header_size = 8 * (2 + 2 * slots)
+        frame_size = int(np.prod(self.shape))
+        self.shm = shared_memory.SharedMemory(name=name, create=self.owner,
+                                              size=header_size + frame_size * slots)
+        buf = self.shm.buf
+        self._header = np.ndarray((2 + slots,), np.int64, buf)
+        self._times = np.ndarray((slots,), np.float64, buf, offset=8 * (2 + slots))
+        self._frames = np.ndarray((slots,) + self.shape, np.uint8, buf, offset=header_size)
+        if self.owner:
+            self._header[:] = 0
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    @property
+    def latest(self):
+        """
+        Última secuencia publicada (0 si aún no hay frames).
+        """
+        return int(self._header[0])
+
+    @property
+    def closed(self):
+        return bool(self._header[1])
+
+    def begin_write(self):
+        """
+        Reserva la ranura del siguiente frame para escribir en ella.
+
+        Returns:
+            tuple: (secuencia, vista de la ranura)
+        """
+        seq = self.latest + 1
+        index = seq % self.slots
+        self._header[2 + index] = -1
+        return seq, self._frames[index]
+
+    def publish(self, seq, timestamp):
+        """
+        Publica la ranura escrita como el frame más reciente.
+        """
+        index = seq % self.slots
+        self._times[index] = timestamp
+        self._header[2 + index] = seq
+        self._header[0] = seq
+
+    def mark_closed(self):
+        """
+        Indica a los lectores que no habrá más frames.
+        """
+        self._header[1] = 1
+
+    def wait_newer(self, seq, timeout=None, poll=0.0005):
+        """
+        Espera un frame posterior a `seq` y devuelve el más reciente.
+
+        Args:
+            seq: Última secuencia ya leída
+            timeout: Tiempo máximo de espera en segundos
+            poll: Intervalo de sondeo en segundos
+
+        Returns:
+            tuple: (secuencia, vista del frame, marca de tiempo), o None si
+                vence el tiempo o el anillo se cerró
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            latest = self.latest
+            if latest > seq:
+                index = latest % self.slots
+                return latest, self._frames[index], float(self._times[index])
+            if self.closed or (deadline is not None and time.monotonic() >= deadline):
+                return None
+            time.sleep(poll)
+
+    def is_valid(self, seq):
+        """
+        Indica si la ranura de `seq` sigue conteniendo ese frame.
+        """
+        return int(self._header[2 + seq % self.slots]) == seq
+
+    def close(self):
+        """
+        Libera las vistas y el bloque; el creador además lo elimina.
+        """
+        del self._header, self._times, self._frames
+        try:
+            self.shm.close()
+        except BufferError:
+            # Aún hay vistas de frames en uso; el bloque se libera al terminar el proceso
+            pass
+        if self.owner:
+            self.shm.unlink()
+
+def _capture_worker(source, ring_name, shape, slots, stop_event):
+    """
+    Proceso de captura: escribe cada frame de la cámara en el anillo.
+    """
+    ring = SharedFrameRing(shape, slots, name=ring_name)
+    height, width = shape[:2]
+    cap = frame_source.open_source(source)
+    try:
+        if not cap.isOpened():
+            print(f"Error: No se pudo abrir la cámara {source}.")
+            return
+        cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+        while not stop_event.is_set():
+            seq, slot = ring.begin_write()
+            # Decodificar directamente en la ranura compartida
+            ret, frame = cap.read(slot)
+            if not ret or frame is None:
+                print("Error: No se pudo leer frame")
+                break
+            if frame is not slot:
+                if frame.shape == slot.shape:
+                    slot[...] = frame
+                else:
+                    cv2.resize(frame, (width, height), dst=slot)
+            ring.publish(seq, cap.timestamp)
+    finally:
+        ring.mark_closed()
+        cap.release()
+        ring.close()
+
+class SharedMemoryCapture:
+    """
+    Sustituto de cv2.VideoCapture que captura en otro proceso.
+
+    read() devuelve siempre el frame más reciente como una vista de la memoria
+    compartida (sin copia); la vista es válida hasta que el proceso de captura
+    da la vuelta al anillo, así que debe copiarse o voltearse enseguida y
+    comprobarse después con frame_valid().
+    """
+
+    def __init__(self, source=0, shape=(config.FRAME_HEIGHT, config.FRAME_WIDTH, 3),
+                 slots=config.FRAME_RING_SLOTS, open_timeout=10.0):
+        """
+        Args:
+            source: Índice de la cámara o ruta de video
+            shape: Forma (alto, ancho, canales) de los frames
+            slots: Número de ranuras del anillo
+            open_timeout: Segundos de espera por el primer frame en isOpened()
+        """
+        self.ring = SharedFrameRing(shape, slots)
+        self.open_timeout = open_timeout
+        self.last_seq = 0
+        self.timestamp = None
+        self.dropped = 0
+        self.torn = 0
+        context = multiprocessing.get_context("spawn")
+        self._stop_event = context.Event()
+        self.process = context.Process(
+            target=_capture_worker,
+            args=(source, self.ring.name, self.ring.shape, slots, self._stop_event),
+            name="captura", daemon=True)
+        self.process.start()
+
+    def isOpened(self):
+        """
+        Espera al primer frame; False si la cámara no llegó a abrirse.
+        """
+        return self.ring.wait_newer(0, self.open_timeout) is not None
+
+    def read(self, image=None):
+        """
+        Devuelve el frame más reciente posterior al último leído.
+
+        Args:
+            image: Ignorado (se acepta por compatibilidad con cv2.VideoCapture)
+
+        Returns:
+            tuple: (éxito, vista del frame)
+        """
+        latest = self.ring.wait_newer(self.last_seq, timeout=2.0)
+        if latest is None:
+            return False, None
+        seq, frame, self.timestamp = latest
+        if self.last_seq:
+            self.dropped += seq - self.last_seq - 1
+        self.last_seq = seq
+        return True, frame
+
+    def frame_valid(self):
+        """
+        Indica si la ranura del último frame leído no se reescribió.
+
+        Se llama después de copiar o voltear la vista devuelta por read(); si
+        devuelve False, la copia puede mezclar dos frames y debe descartarse.
+        """
+        if self.ring.is_valid(self.last_seq):
+            return True
+        self.torn += 1
+        return False
+
+    def get(self, prop):
+        if prop == cv2.CAP_PROP_FRAME_WIDTH:
+            return float(self.ring.shape[1])
+        if prop == cv2.CAP_PROP_FRAME_HEIGHT:
+            return float(self.ring.shape[0])
+        return 0.0
+
+    def set(self, prop, value):
+        # La resolución se fija al crear el anillo
+        return False
+
+    def release(self):
+        """
+        Detiene el proceso de captura y libera la memoria compartida.
+        """
+        if self.ring is None:
+            return
+        self._stop_event.set()
+        self.process.join(timeout=2.0)
+        if self.process.is_alive():
+            self.process.terminate()
+        self.ring.close()
+        self.ring = None
+        if self.dropped or self.torn:
+            print(f"Frames descartados por retraso: captura={self.dropped}, "
+                  f"reescritos durante la lectura={self.torn}")
\ No newline at end of file
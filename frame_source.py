@@ -0,0 +1,266 @@
+"""
+Fuentes de frames con marca de tiempo: cámara, archivo de video y secuencia de imágenes.
+
+Todas tienen la interfaz de cv2.VideoCapture (isOpened, read, get, set,
+release) y guardan en `timestamp` el instante (time.monotonic()) en que se
+capturó el último frame leído, de modo que las etapas posteriores pueden
+medir la latencia real desde la cámara hasta el cursor.
+
+La cámara se configura con un buffer corto, el formato y los FPS de config,
+y antes de cada lectura descarta con grab() los frames que el controlador
+tenga encolados, para entregar siempre el más reciente.
+"""
+import glob
+import os
+import time
+
+import cv2
+
+import config
+
+# Extensiones que se aceptan en una carpeta de imágenes
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp")
+
+def _decode_fourcc(value):
+    """
+    Convierte el valor numérico de CAP_PROP_FOURCC en su código de cuatro letras.
+    """
+    value = int(value)
+    return "".join(chr((value >> 8 * i) & 0xFF) for i in range(4)).strip("\x00 ")
+
+class CameraSource:
+    """
+    Cámara en vivo que siempre entrega el frame más reciente.
+
+    Un grab() que vuelve casi al instante devuelve un frame que ya esperaba
+    en la cola del controlador; uno que bloquea, un frame recién capturado.
+    Si desde la última lectura pasó más de un periodo de frame, se descartan
+    frames mientras vuelvan al instante (hasta max_drain).
+    """
+
+    def __init__(self, index=config.CAMERA_INDEX, width=config.FRAME_WIDTH,
+                 height=config.FRAME_HEIGHT, fps=config.CAMERA_FPS,
+                 fourcc=config.CAMERA_FOURCC, buffer_size=config.CAMERA_BUFFER_SIZE,
+                 drain=config.CAMERA_DRAIN, max_drain=config.CAMERA_MAX_DRAIN):
+        """
+        Args:
+            index: Índice de la cámara
+            width: Ancho de captura pedido
+            height: Alto de captura pedido
+            fps: FPS pedidos (0 para el valor por defecto del controlador)
+            fourcc: Formato de captura ("MJPG", "YUYV"...) o None
+            buffer_size: Frames que puede encolar el controlador (0 para no tocarlo)
+            drain: Descartar los frames encolados antes de cada lectura
+            max_drain: Frames descartados como máximo por lectura
+        """
+        self.cap = cv2.VideoCapture(index)
+        self.drain = drain
+        self.max_drain = max_drain
+        self.timestamp = None
+        self.drained = 0
+        self._last_grab = None
+        if self.cap.isOpened():
+            # El formato va antes que la resolución: en V4L2 limita las resoluciones posibles
+            if fourcc:
+                self.cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*fourcc))
+            self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+            self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+            if fps:
+                self.cap.set(cv2.CAP_PROP_FPS, fps)
+            if buffer_size:
+                self.cap.set(cv2.CAP_PROP_BUFFERSIZE, buffer_size)
+
+        # Un grab() más rápido que un cuarto de periodo sale de la cola
+        self.period = 1.0 / (self.cap.get(cv2.CAP_PROP_FPS) or fps or 30.0)
+        self.drain_threshold = self.period / 4
+
+    def describe(self):
+        """
+        Devuelve la configuración que aceptó el controlador, para mostrarla al abrir.
+        """
+        get = self.cap.get
+        return (f"{int(get(cv2.CAP_PROP_FRAME_WIDTH))}x{int(get(cv2.CAP_PROP_FRAME_HEIGHT))} "
+                f"a {get(cv2.CAP_PROP_FPS):.0f} FPS, formato "
+                f"{_decode_fourcc(get(cv2.CAP_PROP_FOURCC)) or '?'}, "
+                f"buffer {int(get(cv2.CAP_PROP_BUFFERSIZE))}")
+
+    def isOpened(self):
+        return self.cap.isOpened()
+
+    def _grab_latest(self):
+        """
+        Captura el frame más reciente, descartando los encolados.
+
+        Returns:
+            bool: True si se capturó un frame
+        """
+        start = time.monotonic()
+        if not self.cap.grab():
+            return False
+        end = time.monotonic()
+
+        if self.drain and self._last_grab is not None and start - self._last_grab > self.period:
+            drained = 0
+            while end - start < self.drain_threshold and drained < self.max_drain:
+                start = end
+                if not self.cap.grab():
+                    return False
+                end = time.monotonic()
+                drained += 1
+            self.drained += drained
+
+        self._last_grab = end
+        self.timestamp = end
+        return True
+
+    def read(self, image=None):
+        """
+        Lee el frame más reciente.
+
+        Args:
+            image: Buffer donde decodificar el frame, o None
+
+        Returns:
+            tuple: (éxito, frame)
+        """
+        if not self._grab_latest():
+            return False, None
+        return self.cap.retrieve(image)
+
+    def get(self, prop):
+        return self.cap.get(prop)
+
+    def set(self, prop, value):
+        return self.cap.set(prop, value)
+
+    def release(self):
+        self.cap.release()
+        if self.drained:
+            print(f"Frames encolados descartados por la cámara: {self.drained}")
+
+class VideoFileSource:
+    """
+    Archivo de video como fuente de pruebas.
+
+    Las marcas de tiempo avanzan con los FPS del archivo desde que se abre,
+    no con la velocidad de lectura, así que las pruebas son reproducibles.
+    """
+
+    def __init__(self, path, fps=None):
+        """
+        Args:
+            path: Ruta del archivo de video
+            fps: FPS de las marcas de tiempo, o None para los del archivo
+        """
+        self.cap = cv2.VideoCapture(path)
+        self.fps = fps or self.cap.get(cv2.CAP_PROP_FPS) or 30.0
+        self.timestamp = None
+        self.frame_index = 0
+        self._start = time.monotonic()
+
+    def isOpened(self):
+        return self.cap.isOpened()
+
+    def read(self, image=None):
+        ret, frame = self.cap.read(image)
+        if ret:
+            self.timestamp = self._start + self.frame_index / self.fps
+            self.frame_index += 1
+        return ret, frame
+
+    def get(self, prop):
+        if prop == cv2.CAP_PROP_FPS:
+            return float(self.fps)
+        return self.cap.get(prop)
+
+    def set(self, prop, value):
+        # La resolución del archivo no se puede cambiar
+        return False
+
+    def release(self):
+        self.cap.release()
+
+class ImageSequenceSource:
+    """
+    Secuencia de imágenes (carpeta o patrón glob) como fuente de pruebas.
+
+    Las imágenes se leen en orden alfabético; las marcas de tiempo avanzan a
+    `fps` frames por segundo como en VideoFileSource.
+    """
+
+    def __init__(self, pattern, fps=30.0):
+        """
+        Args:
+            pattern: Carpeta con las imágenes o patrón glob ("capturas/*.png")
+            fps: FPS de las marcas de tiempo
+        """
+        if os.path.isdir(pattern):
+            paths = [os.path.join(pattern, name) for name in os.listdir(pattern)
+                     if name.lower().endswith(IMAGE_EXTENSIONS)]
+        else:
+            paths = glob.glob(pattern)
+        self.paths = sorted(paths)
+        self.fps = fps
+        self.timestamp = None
+        self.frame_index = 0
+        self._start = time.monotonic()
+        self._shape = None
+        if self.paths:
+            first = cv2.imread(self.paths[0])
+            self._shape = first.shape if first is not None else None
+
+    def isOpened(self):
+        return self._shape is not None
+
+    def read(self, image=None):
+        """
+        Lee la siguiente imagen de la secuencia.
+
+        Args:
+            image: Ignorado (se acepta por compatibilidad con cv2.VideoCapture)
+
+        Returns:
+            tuple: (éxito, frame)
+        """
+        if self.frame_index >= len(self.paths):
+            return False, None
+        frame = cv2.imread(self.paths[self.frame_index])
+        if frame is None:
+            print(f"Error: No se pudo leer la imagen {self.paths[self.frame_index]}")
+            return False, None
+        self.timestamp = self._start + self.frame_index / self.fps
+        self.frame_index += 1
+        return True, frame
+
+    def get(self, prop):
+        if self._shape is None:
+            return 0.0
+        if prop == cv2.CAP_PROP_FRAME_WIDTH:
+            return float(self._shape[1])
+        if prop == cv2.CAP_PROP_FRAME_HEIGHT:
+            return float(self._shape[0])
+        if prop == cv2.CAP_PROP_FPS:
+            return float(self.fps)
+        if prop == cv2.CAP_PROP_FRAME_COUNT:
+            return float(len(self.paths))
+        return 0.0
+
+    def set(self, prop, value):
+        return False
+
+    def release(self):
+        self.paths = []
+
+def open_source(source):
+    """
+    Abre una cámara (índice numérico), una secuencia de imágenes (carpeta o
+    patrón con comodines) o un archivo de video.
+
+    Returns:
+        Fuente con la interfaz de cv2.VideoCapture y el atributo `timestamp`
+    """
+    if isinstance(source, int) or str(source).isdigit():
+        return CameraSource(int(source))
+    if os.path.isdir(source) or glob.has_magic(source):
+        return ImageSequenceSource(source)
+    return VideoFileSource(source)
\ No newline at end of file
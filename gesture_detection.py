@@ -3,67 +3,310 @@ Módulo para la detección de gestos a partir de contornos de la mano.
 """
 import cv2
 import numpy as np
-from config import DEFECT_THRESHOLD, HAND_RATIO_THRESHOLD
+from config import (DEFECT_THRESHOLD, DEFECT_ANGLE_MAX, HAND_RATIO_THRESHOLD,
+                    GESTURE_CACHE_TOLERANCE, GESTURE_CACHE_HU_TOLERANCE)
 
-def detect_gestures(contour, frame):
+# Defectos vacíos para contornos sin defectos de convexidad
+_NO_DEFECTS = np.empty((0, 4), np.int32)
+
+def analyze_defects(contour, defects, defect_threshold=DEFECT_THRESHOLD,
+                    max_angle=DEFECT_ANGLE_MAX):
     """
-    Detecta gestos basados en el análisis de contornos y defectos de convexidad.
+    Analiza todos los defectos de convexidad a la vez con NumPy.
+    
+    Para cada defecto calcula la profundidad, la longitud de los dos segmentos
+    que van del valle (punto más lejano) a los extremos y el ángulo entre ellos.
+    Un defecto cuenta como separación entre dedos si es lo bastante profundo y
+    su ángulo es agudo; los defectos de la muñeca y el antebrazo son amplios y
+    quedan descartados.
     
     Args:
         contour: Contorno de la mano
-        frame: Frame para visualización
+        defects: Resultado de cv2.convexityDefects, o None
+        defect_threshold: Profundidad mínima (en unidades de OpenCV, 1/256 píxel)
+        max_angle: Ángulo máximo en grados en el valle entre dos dedos
         
     Returns:
-        str: Nombre del gesto detectado, o None si no se detecta ninguno
+        dict: Arreglos 'start', 'end', 'far' (N x 2), 'depth', 'angle',
+            'lengths' (N x 2) e 'is_finger' (N,)
     """
-    try:
-        if contour is None or len(contour) < 5:
-            return None
-            
-        # Calcular el rectángulo mínimo que contiene el contorno
-        rect = cv2.minAreaRect(contour)
-        box = cv2.boxPoints(rect)
-        box = np.int0(box)
-        cv2.drawContours(frame, [box], 0, (0, 0, 255), 2)
+    defects = _NO_DEFECTS if defects is None else defects.reshape(-1, 4)
+    points = contour.reshape(-1, 2)
+    start = points[defects[:, 0]]
+    end = points[defects[:, 1]]
+    far = points[defects[:, 2]]
+    depth = defects[:, 3]
+    
+    # Vectores del valle a cada extremo y ángulo entre ellos
+    to_start = (start - far).astype(np.float32)
+    to_end = (end - far).astype(np.float32)
+    lengths = np.stack([np.hypot(to_start[:, 0], to_start[:, 1]),
+                        np.hypot(to_end[:, 0], to_end[:, 1])], axis=1)
+    cosine = np.einsum('ij,ij->i', to_start, to_end) / (lengths[:, 0] * lengths[:, 1] + 1e-6)
+    angle = np.degrees(np.arccos(np.clip(cosine, -1.0, 1.0)))
+    
+    return {
+        'start': start,
+        'end': end,
+        'far': far,
+        'depth': depth,
+        'angle': angle,
+        'lengths': lengths,
+        'is_finger': (depth > defect_threshold) & (angle < max_angle),
+    }
+
+def analyze_contour(contour, defect_threshold=DEFECT_THRESHOLD):
+    """
+    Calcula las características de forma del contorno usadas para clasificar gestos.
+    
+    Args:
+        contour: Contorno de la mano
+        defect_threshold: Profundidad mínima de un defecto para contarlo como dedo
+            (ajustada a la resolución del contorno)
         
-        # Calcular el ratio largo/ancho para análisis de la forma
-        width, height = rect[1]
-        aspect_ratio = max(width, height) / (min(width, height) + 0.01)
+    Returns:
+        dict: Características con las claves 'box', 'aspect_ratio', 'finger_count'
+            y 'defects' (ver analyze_defects), o None si el contorno no es válido
+    """
+    if contour is None or len(contour) < 5:
+        return None
         
-        # Calcular casco convexo y defectos
-        hull = cv2.convexHull(contour, returnPoints=False)
-        defects = cv2.convexityDefects(contour, hull)
+    # Calcular el rectángulo mínimo que contiene el contorno
+    rect = cv2.minAreaRect(contour)
+    box = np.intp(cv2.boxPoints(rect))
+    
+    # Calcular el ratio largo/ancho para análisis de la forma
+    width, height = rect[1]
+    aspect_ratio = max(width, height) / (min(width, height) + 0.01)
+    
+    # Calcular casco convexo y defectos
+    hull = cv2.convexHull(contour, returnPoints=False)
+    defects = analyze_defects(contour, cv2.convexityDefects(contour, hull), defect_threshold)
+    
+    return {
+        'box': box,
+        'aspect_ratio': aspect_ratio,
+        'finger_count': int(np.count_nonzero(defects['is_finger'])),
+        'defects': defects,
+    }
+
+def scale_features(features, factor):
+    """
+    Escala las coordenadas y profundidades de unas características.
+    
+    Args:
+        features: Diccionario devuelto por analyze_contour, o None
+        factor: Factor de escala a aplicar
         
-        finger_count = 0
-        if defects is not None:
-            for i in range(defects.shape[0]):
-                s, e, f, d = defects[i, 0]
-                start = tuple(contour[s][0])
-                end = tuple(contour[e][0])
-                far = tuple(contour[f][0])
-                
-                cv2.circle(frame, far, 5, [0, 0, 255], -1)
-                if d > DEFECT_THRESHOLD:
-                    finger_count += 1
-                    cv2.line(frame, start, end, [0, 255, 0], 2)
+    Returns:
+        dict: Copia escalada de las características, o None
+    """
+    if features is None:
+        return None
+    
+    defects = dict(features['defects'])
+    for key in ('start', 'end', 'far'):
+        defects[key] = (defects[key] * factor).astype(np.int32)
+    defects['depth'] = defects['depth'] * factor
+    defects['lengths'] = defects['lengths'] * factor
+    
+    scaled = dict(features)
+    scaled['box'] = np.intp(features['box'] * factor)
+    scaled['defects'] = defects
+    return scaled
+
+def translate_features(features, dx, dy):
+    """
+    Desplaza las coordenadas de unas características de contorno.
+    
+    Args:
+        features: Diccionario devuelto por analyze_contour, o None
+        dx: Desplazamiento horizontal en píxeles
+        dy: Desplazamiento vertical en píxeles
         
-        # Información de depuración
-        cv2.putText(frame, f"Defectos: {finger_count}", (10, 50),
-                    cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
-        cv2.putText(frame, f"Ratio: {aspect_ratio:.2f}", (10, 80),
-                    cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
+    Returns:
+        dict: Copia desplazada de las características, o None
+    """
+    if features is None or (dx == 0 and dy == 0):
+        return features
+    
+    offset = np.array((dx, dy), np.int32)
+    defects = dict(features['defects'])
+    for key in ('start', 'end', 'far'):
+        defects[key] = defects[key] + offset
+    
+    translated = dict(features)
+    translated['box'] = features['box'] + offset
+    translated['defects'] = defects
+    return translated
+
+def classify_gesture(features, ratio_threshold=HAND_RATIO_THRESHOLD):
+    """
+    Clasifica el gesto a partir de las características del contorno.
+    
+    Args:
+        features: Diccionario devuelto por analyze_contour
+        ratio_threshold: Proporción largo/ancho máxima de la mano cerrada y la pinza
         
-        # Lógica de detección según cantidad de defectos y ratio
-        if finger_count == 1 and aspect_ratio < HAND_RATIO_THRESHOLD:
-            return "pinch"  # Dos dedos juntos
-        elif finger_count == 2:
-            return "rotate"  # Tres dedos levantados
-        elif finger_count >= 3:
-            return "hand_open"  # Mano abierta
-        elif finger_count == 0 and aspect_ratio < HAND_RATIO_THRESHOLD:
-            return "hand_closed"  # Mano cerrada
-            
+    Returns:
+        str: Nombre del gesto detectado, o None si no se detecta ninguno
+    """
+    if features is None:
         return None
+    finger_count = features['finger_count']
+    aspect_ratio = features['aspect_ratio']
+    
+    # Lógica de detección según cantidad de defectos y ratio
+    if finger_count == 1 and aspect_ratio < ratio_threshold:
+        return "pinch"  # Dos dedos juntos
+    elif finger_count == 2:
+        return "rotate"  # Tres dedos levantados
+    elif finger_count >= 3:
+        return "hand_open"  # Mano abierta
+    elif finger_count == 0 and aspect_ratio < ratio_threshold:
+        return "hand_closed"  # Mano cerrada
+        
+    return None
+
+def draw_gesture_debug(frame, features):
+    """
+    Dibuja el rectángulo, los defectos de convexidad y la información de depuración.
+    
+    Args:
+        frame: Frame donde dibujar
+        features: Diccionario devuelto por analyze_contour
+    """
+    if features is None:
+        return
+    cv2.drawContours(frame, [features['box']], 0, (0, 0, 255), 2)
+    
+    defects = features['defects']
+    for start, end, far, is_finger in zip(defects['start'].tolist(), defects['end'].tolist(),
+                                          defects['far'].tolist(), defects['is_finger']):
+        cv2.circle(frame, tuple(far), 5, [0, 0, 255], -1)
+        if is_finger:
+            cv2.line(frame, tuple(start), tuple(end), [0, 255, 0], 2)
+    
+    # Información de depuración
+    cv2.putText(frame, f"Defectos: {features['finger_count']}", (10, 50),
+                cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
+    cv2.putText(frame, f"Ratio: {features['aspect_ratio']:.2f}", (10, 80),
+                cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
+
+def analyze_gesture(contour, defect_threshold=DEFECT_THRESHOLD):
+    """
+    Detecta el gesto de un contorno sin dibujar nada.
+    
+    Args:
+        contour: Contorno de la mano
+        defect_threshold: Profundidad mínima de un defecto para contarlo como dedo
+        
+    Returns:
+        tuple: (nombre del gesto o None, características o None)
+    """
+    try:
+        features = analyze_contour(contour, defect_threshold)
+        return classify_gesture(features), features
     except Exception as e:
         print(f"Error en detect_gestures: {e}")
-        return None
\ No newline at end of file
+        return None, None
+
+class GestureCache:
+    """
+    Memoriza la clasificación del último contorno analizado.
+    
+    La firma de un contorno (área, ancho y alto del rectángulo envolvente y los
+    tres primeros momentos de Hu en escala logarítmica) se calcula a partir de
+    sus momentos, que el llamador ya tiene. Mientras la firma se mantenga dentro
+    de la tolerancia respecto a la del contorno analizado, se reutiliza su
+    gesto y se desplazan sus características, sin repetir la envolvente
+    convexa ni los defectos. La firma de referencia no se actualiza en los
+    aciertos, así que un cambio lento de forma también acaba invalidándola.
+    """
+    
+    def __init__(self, tolerance=GESTURE_CACHE_TOLERANCE, hu_tolerance=GESTURE_CACHE_HU_TOLERANCE):
+        """
+        Args:
+            tolerance: Variación relativa máxima del área, el ancho y el alto
+            hu_tolerance: Variación máxima de los momentos de Hu (escala logarítmica)
+        """
+        self.tolerance = tolerance
+        self.hu_tolerance = hu_tolerance
+        self.hits = 0
+        self.misses = 0
+        self.reset()
+    
+    def reset(self):
+        """
+        Descarta la clasificación memorizada.
+        """
+        self._signature = None
+        self._origin = None
+        self._result = None
+    
+    @property
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+    
+    @staticmethod
+    def signature(contour, moments):
+        """
+        Firma barata de un contorno.
+        
+        Returns:
+            tuple: ((área, ancho, alto), momentos de Hu logarítmicos, origen (x, y))
+        """
+        x, y, w, h = cv2.boundingRect(contour)
+        hu = cv2.HuMoments(moments).ravel()[:3]
+        log_hu = -np.sign(hu) * np.log10(np.abs(hu) + 1e-30)
+        return np.array((moments['m00'], w, h), np.float64), log_hu, (x, y)
+    
+    def _matches(self, size, log_hu):
+        ref_size, ref_hu = self._signature
+        return (np.all(np.abs(size - ref_size) <= self.tolerance * ref_size) and
+                np.all(np.abs(log_hu - ref_hu) <= self.hu_tolerance))
+    
+    def analyze(self, contour, moments=None, defect_threshold=DEFECT_THRESHOLD):
+        """
+        Como analyze_gesture, pero reutilizando el resultado si la forma no cambió.
+        
+        Args:
+            contour: Contorno de la mano
+            moments: cv2.moments(contour), o None para calcularlos
+            defect_threshold: Profundidad mínima de un defecto para contarlo como dedo
+            
+        Returns:
+            tuple: (nombre del gesto o None, características o None)
+        """
+        if moments is None:
+            moments = cv2.moments(contour)
+        size, log_hu, origin = self.signature(contour, moments)
+        if self._signature is not None and self._matches(size, log_hu):
+            self.hits += 1
+            gesture, features = self._result
+            return gesture, translate_features(features, origin[0] - self._origin[0],
+                                               origin[1] - self._origin[1])
+        
+        self.misses += 1
+        gesture, features = analyze_gesture(contour, defect_threshold)
+        self._signature = (size, log_hu)
+        self._origin = origin
+        self._result = (gesture, features)
+        return gesture, features
+
+def detect_gestures(contour, frame=None):
+    """
+    Detecta gestos basados en el análisis de contornos y defectos de convexidad.
+    
+    Args:
+        contour: Contorno de la mano
+        frame: Frame para visualización, o None para no dibujar nada
+        
+    Returns:
+        str: Nombre del gesto detectado, o None si no se detecta ninguno
+    """
+    gesture, features = analyze_gesture(contour)
+    if frame is not None:
+        draw_gesture_debug(frame, features)
+    return gesture
\ No newline at end of file
@@ -0,0 +1,252 @@
+"""
+Detector de la mano por puntos de referencia (MediaPipe Hands).
+
+Alternativa a la resta de fondo y los defectos de convexidad: no necesita un
+fondo estático. Para reducir el costo, el modelo de puntos solo se ejecuta
+cada MEDIAPIPE_DETECT_EVERY frames o cuando baja la confianza del
+seguimiento; entre medias los puntos se siguen con flujo óptico (Lucas-Kanade),
+que cuesta una fracción del modelo.
+"""
+import time
+import cv2
+import numpy as np
+
+import config
+
+# Índices de los puntos de referencia de MediaPipe Hands
+WRIST = 0
+THUMB_IP = 3
+THUMB_TIP = 4
+INDEX_MCP = 5
+FINGER_PIPS = (6, 10, 14, 18)
+FINGER_TIPS = (8, 12, 16, 20)
+PALM = (0, 5, 9, 13, 17)
+
+def count_extended_fingers(points):
+    """
+    Cuenta los dedos extendidos a partir de los 21 puntos de la mano.
+
+    Un dedo está extendido si su punta está más lejos de la muñeca que su
+    articulación media; el pulgar, si su punta está más lejos de la base del
+    índice que su articulación.
+
+    Args:
+        points: Arreglo (21, 2) de puntos en píxeles
+
+    Returns:
+        int: Número de dedos extendidos (0-5)
+    """
+    wrist = points[WRIST]
+    tips = np.linalg.norm(points[list(FINGER_TIPS)] - wrist, axis=1)
+    pips = np.linalg.norm(points[list(FINGER_PIPS)] - wrist, axis=1)
+    count = int(np.count_nonzero(tips > pips))
+
+    index_base = points[INDEX_MCP]
+    if np.linalg.norm(points[THUMB_TIP] - index_base) > np.linalg.norm(points[THUMB_IP] - index_base):
+        count += 1
+    return count
+
+def classify_landmarks(points):
+    """
+    Traduce los puntos de la mano a los gestos de gesture_detection.
+
+    Args:
+        points: Arreglo (21, 2) de puntos en píxeles
+
+    Returns:
+        str: Nombre del gesto detectado, o None si no se detecta ninguno
+    """
+    fingers = count_extended_fingers(points)
+    if fingers == 2:
+        return "pinch"  # Dos dedos juntos
+    elif fingers == 3:
+        return "rotate"  # Tres dedos levantados
+    elif fingers >= 4:
+        return "hand_open"  # Mano abierta
+    elif fingers == 0:
+        return "hand_closed"  # Mano cerrada
+    return None
+
+def _create_landmarker(model_path, min_confidence):
+    """
+    Crea la función de puntos de referencia con la API disponible de MediaPipe.
+
+    Returns:
+        tuple: (función(rgb, ms) -> (puntos normalizados (21, 2) o None, confianza),
+            función de cierre)
+    """
+    import mediapipe as mp
+
+    # API clásica (mediapipe <= 0.10): no necesita archivo de modelo
+    if hasattr(mp, "solutions"):
+        hands = mp.solutions.hands.Hands(static_image_mode=False, max_num_hands=1,
+                                         model_complexity=0,
+                                         min_detection_confidence=min_confidence,
+                                         min_tracking_confidence=min_confidence)
+
+        def landmark(rgb, timestamp_ms):
+            results = hands.process(rgb)
+            if not results.multi_hand_landmarks:
+                return None, 0.0
+            points = np.array([(p.x, p.y) for p in results.multi_hand_landmarks[0].landmark],
+                              np.float32)
+            return points, results.multi_handedness[0].classification[0].score
+        return landmark, hands.close
+
+    # API de tareas: necesita el modelo hand_landmarker.task
+    from mediapipe.tasks.python import vision
+    options = vision.HandLandmarkerOptions(
+        base_options=mp.tasks.BaseOptions(model_asset_path=model_path),
+        running_mode=vision.RunningMode.VIDEO, num_hands=1,
+        min_hand_detection_confidence=min_confidence,
+        min_tracking_confidence=min_confidence)
+    landmarker = vision.HandLandmarker.create_from_options(options)
+
+    def landmark(rgb, timestamp_ms):
+        image = mp.Image(image_format=mp.ImageFormat.SRGB, data=np.ascontiguousarray(rgb))
+        result = landmarker.detect_for_video(image, timestamp_ms)
+        if not result.hand_landmarks:
+            return None, 0.0
+        points = np.array([(p.x, p.y) for p in result.hand_landmarks[0]], np.float32)
+        return points, result.handedness[0][0].score
+    return landmark, landmarker.close
+
+class MediaPipeHandDetector:
+    """
+    Detector de la mano con MediaPipe y seguimiento por flujo óptico entre medias.
+
+    Tras cada frame, `last_cost` guarda su costo en segundos y `last_mode` si
+    se ejecutó el modelo ('model') o solo el seguimiento ('tracking'), para
+    comparar backends en cada equipo.
+    """
+
+    def __init__(self, detect_every=config.MEDIAPIPE_DETECT_EVERY,
+                 min_confidence=config.MEDIAPIPE_MIN_CONFIDENCE,
+                 min_tracked=config.MEDIAPIPE_MIN_TRACKED,
+                 model_path=config.MEDIAPIPE_MODEL_PATH):
+        """
+        Args:
+            detect_every: Frames entre ejecuciones del modelo mientras se sigue la mano
+            min_confidence: Confianza mínima del modelo y del seguimiento
+            min_tracked: Fracción mínima de puntos seguidos por el flujo óptico
+            model_path: Modelo hand_landmarker.task (solo para la API de tareas)
+        """
+        self.detect_every = max(1, detect_every)
+        self.min_confidence = min_confidence
+        self.min_tracked = min_tracked
+        self._landmark, self._close = _create_landmarker(model_path, min_confidence)
+        self.points = None
+        self.confidence = 0.0
+        self._prev_gray = None
+        self._since_model = 0
+        self._last_ms = -1
+        self.last_cost = 0.0
+        self.last_mode = None
+
+    def _run_model(self, frame, timestamp):
+        """
+        Ejecuta el modelo de puntos sobre el frame completo.
+        """
+        # La API de video exige marcas de tiempo estrictamente crecientes
+        timestamp_ms = max(int(timestamp * 1000), self._last_ms + 1)
+        self._last_ms = timestamp_ms
+        points, score = self._landmark(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB), timestamp_ms)
+        if points is None:
+            self.points = None
+            self.confidence = 0.0
+        else:
+            height, width = frame.shape[:2]
+            self.points = points * np.float32((width, height))
+            self.confidence = score
+        self._since_model = 0
+
+    def _track(self, gray):
+        """
+        Sigue los puntos desde el frame anterior con Lucas-Kanade ida y vuelta.
+
+        Returns:
+            bool: True si el seguimiento es fiable
+        """
+        prev = self.points.reshape(-1, 1, 2)
+        params = dict(winSize=(15, 15), maxLevel=2)
+        moved, status, _ = cv2.calcOpticalFlowPyrLK(self._prev_gray, gray, prev, None, **params)
+        back, back_status, _ = cv2.calcOpticalFlowPyrLK(gray, self._prev_gray, moved, None, **params)
+
+        # Un punto es fiable si se encuentra en ambos sentidos y vuelve a su sitio
+        error = np.linalg.norm((back - prev).reshape(-1, 2), axis=1)
+        good = (status.ravel() == 1) & (back_status.ravel() == 1) & (error < 2.0)
+        tracked = float(np.count_nonzero(good)) / len(good)
+        self.confidence *= tracked
+        if tracked < self.min_tracked or self.confidence < self.min_confidence:
+            return False
+
+        # Los puntos perdidos se desplazan con el movimiento medio de los demás
+        moved = moved.reshape(-1, 2)
+        shift = np.median(moved[good] - self.points[good], axis=0)
+        self.points = np.where(good[:, None], moved, self.points + shift)
+        return True
+
+    def detect(self, frame, timestamp):
+        """
+        Detecta la mano en un frame.
+
+        Args:
+            frame: Frame BGR (ya volteado)
+            timestamp: Instante del frame en segundos
+
+        Returns:
+            dict: Detección con las claves 'landmarks' (21, 2), 'contour' (envolvente
+                convexa de los puntos), 'center', 'area' y 'gesture', o None sin mano
+        """
+        start = time.perf_counter()
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+
+        self._since_model += 1
+        tracked = (self.points is not None and self._prev_gray is not None and
+                   self._since_model < self.detect_every and self._track(gray))
+        if not tracked:
+            self._run_model(frame, timestamp)
+        self._prev_gray = gray
+        self.last_mode = 'tracking' if tracked else 'model'
+
+        detection = None
+        if self.points is not None:
+            hull = cv2.convexHull(self.points.astype(np.int32))
+            center = self.points[list(PALM)].mean(axis=0)
+            detection = {
+                'landmarks': self.points,
+                'contour': hull,
+                'center': (float(center[0]), float(center[1])),
+                'area': cv2.contourArea(hull),
+                'gesture': classify_landmarks(self.points),
+            }
+        self.last_cost = time.perf_counter() - start
+        return detection
+
+    def reset(self):
+        """
+        Olvida los puntos seguidos (por ejemplo al cambiar la resolución);
+        el siguiente frame ejecuta el modelo.
+        """
+        self.points = None
+        self.confidence = 0.0
+        self._prev_gray = None
+
+    def close(self):
+        """
+        Libera los recursos de MediaPipe.
+        """
+        self._close()
+
+def create_detector():
+    """
+    Crea el detector de MediaPipe con los parámetros de config.
+
+    Returns:
+        MediaPipeHandDetector, o None si MediaPipe no está disponible
+    """
+    try:
+        return MediaPipeHandDetector()
+    except Exception as e:
+        print(f"No se pudo iniciar MediaPipe ({e}); se usa la detección por contornos.")
+        return None
\ No newline at end of file
@@ -2,160 +2,169 @@
 Punto de entrada principal para el programa de control por gestos.
 """
 import cv2
-import numpy as np
-import pyautogui
 import time
 import sys
-from collections import deque
 
 # Importar módulos del proyecto
 import config
 import calibration
-import gesture_detection
+import frame_budget
+import frame_ring
+import frame_source
+import metrics
 import movement
+import pipeline
+import telemetry
+import tracker
 import utils
 
 def main():
     """
     Función principal del programa.
     """
+    # Se exportan y cierran en el finally, también al salir con Ctrl+C
+    cap = None
+    stage_metrics = None
+    recorder = None
     try:
         # Configurar el manejador de señales para Ctrl+C
         utils.setup_exit_handler()
         
-        # Inicializar configuración de PyAutoGUI
-        pyautogui.FAILSAFE = True
-        pyautogui.PAUSE = config.PYAUTOGUI_PAUSE
+        # Importar pyautogui en segundo plano mientras se abre la cámara y se calibra
+        movement.pyautogui.preload()
         
         # Imprimir información del sistema
         utils.print_system_info()
         
-        # Inicializar captura de video
-        cap = cv2.VideoCapture(0)
+        # Inicializar captura de video (en otro proceso si está activado)
+        if config.SHARED_MEMORY_CAPTURE:
+            cap = frame_ring.SharedMemoryCapture(config.CAMERA_INDEX)
+        else:
+            cap = frame_source.CameraSource(config.CAMERA_INDEX)
         if not cap.isOpened():
             print("Error: No se pudo abrir la cámara. Verifica que esté conectada.")
             return
             
         print("Cámara inicializada correctamente.")
-        cap.set(cv2.CAP_PROP_FRAME_WIDTH, config.FRAME_WIDTH)
-        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, config.FRAME_HEIGHT)
+        if isinstance(cap, frame_source.CameraSource):
+            print(f"Cámara: {cap.describe()}")
         
-        # Realizar calibración inicial
+        # Decidir cuándo dibujar según el modo de visualización
+        renderer = utils.RenderScheduler()
+        show_windows = not renderer.headless
+        
+        frame_width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+        frame_height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        
+        # Realizar calibración inicial (en arranque rápido, reutilizando el fondo en caché)
         try:
-            background = calibration.calibrate_background(cap)
-            print("Calibración completada. Posiciónate para comenzar...")
-            time.sleep(2)
+            if config.FAST_START:
+                background, threshold_map = calibration.calibrate_background_cached(
+                    cap, (frame_width, frame_height), show=show_windows)
+            else:
+                background, threshold_map = calibration.calibrate(cap, show=show_windows)
+                print("Calibración completada. Posiciónate para comenzar...")
+                time.sleep(2)
         except Exception as e:
             print(f"Error durante la calibración: {e}")
-            cap.release()
-            cv2.destroyAllWindows()
+            if show_windows:
+                cv2.destroyAllWindows()
             return
         
-        # Variables para seguimiento
-        prev_area = 0
-        screen_width, screen_height = pyautogui.size()
-        pos_history = deque()
-        frame_width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-        frame_height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        # Inicializar configuración de PyAutoGUI (ya importado en segundo plano)
+        pyautogui = movement.pyautogui.load()
+        pyautogui.FAILSAFE = True
+        pyautogui.PAUSE = config.PYAUTOGUI_PAUSE
         
-        # Definir regiones de la pantalla
-        left_region = frame_width * config.LEFT_REGION_FACTOR
-        right_region = frame_width * config.RIGHT_REGION_FACTOR
+        # Inicializar el seguimiento de la mano
+        screen_width, screen_height = pyautogui.size()
+        hand_tracker = tracker.HandTracker(
+            background, (frame_width, frame_height), (screen_width, screen_height),
+            threshold_map
+        )
         
-        # Inicializar variables para detección de gestos
-        last_gesture = None
-        gesture_counter = 0
+        # Aprender el color de piel del usuario (en arranque rápido, si no hay tabla guardada)
+        skin_model = hand_tracker.skin_model
+        if skin_model is not None and config.SKIN_CALIBRATION and \
+                not (config.FAST_START and skin_model.learned):
+            if calibration.calibrate_skin(cap, background, skin_model, show=show_windows):
+                skin_model.save(config.SKIN_TABLE_PATH)
         
-        # Crear panel de control
+        # Crear panel de control y métricas de latencia por etapa
         control_area = utils.create_control_panel()
+        stage_metrics = metrics.StageMetrics()
         
-        print("Iniciando captura de movimiento. Presiona 'q' para salir o 'r' para recalibrar.")
+        # Rebajar la calidad si no se llega a los FPS objetivo
+        budget = frame_budget.FrameBudgetController(hand_tracker) if config.FRAME_BUDGET else None
         
-        # Bucle principal
-        while True:
-            ret, frame = cap.read()
+        # Registro circular de lo que se vio en cada frame
+        recorder = telemetry.open_recorder()
+        
+        if renderer.headless:
+            print("Iniciando captura de movimiento sin ventanas. Presiona Ctrl+C para salir.")
+        else:
+            print("Iniciando captura de movimiento. Presiona 'q' para salir o 'r' para recalibrar.")
+        
+        if config.PIPELINE_MODE:
+            pipeline.run_pipeline(cap, hand_tracker, control_area, renderer, stage_metrics, budget,
+                                  recorder)
+            if show_windows:
+                cv2.destroyAllWindows()
+            return
+        
+        # Los buffers de captura y volteo se reutilizan en cada frame
+        workspace = hand_tracker.workspace
+        shared_capture = isinstance(cap, frame_ring.SharedMemoryCapture)
+        work_start = None
+        
+        # Bucle principal (hasta salir o hasta que salte el failsafe de pyautogui)
+        while not movement.failsafe_triggered.is_set():
+            # Tiempo de trabajo del frame anterior, sin la espera de la cámara
+            if budget is not None and work_start is not None:
+                budget.update(time.perf_counter() - work_start, time.monotonic())
+            
+            start = time.perf_counter()
+            ret, frame = cap.read(workspace.get('capture', (frame_height, frame_width, 3)))
             if not ret or frame is None:
                 print("Error: No se pudo leer frame")
                 break
+            captured = work_start = time.perf_counter()
+            frame_times = {"capture": captured - start}
                 
             # Voltear horizontalmente para una interfaz tipo espejo
-            frame = cv2.flip(frame, 1)
+            frame = cv2.flip(frame, 1, dst=workspace.get('flip', frame.shape))
+            frame_times["flip"] = time.perf_counter() - captured
             
-            # Procesar frame para extraer silueta
-            thresh, display_frame = utils.process_frame(frame, background)
+            # Descartar el frame si el proceso de captura reescribió su ranura mientras se volteaba
+            if shared_capture and not cap.frame_valid():
+                continue
             
-            # Dibujar guías de interfaz
-            display_frame = utils.draw_interface_guides(
-                display_frame, left_region, right_region, 
-                frame_height, frame_width
-            )
+            # Extraer silueta, detectar la mano y estabilizar el gesto
+            result = hand_tracker.process(frame, cap.timestamp)
+            frame_times.update(hand_tracker.stage_times)
             
-            # Mostrar imagen umbralizada
-            cv2.imshow('Threshold', thresh)
+            # Acciones por región y gesto, solo si el gesto es estable
+            action = None
+            if result['stable']:
+                start = time.perf_counter()
+                action = movement.execute_action(result)
+                frame_times["mouse_output"] = time.perf_counter() - start
+                # Latencia desde la captura del frame hasta la acción
+                frame_times["capture_to_action"] = time.monotonic() - result['timestamp']
+            stage_metrics.record_many(frame_times)
+            if recorder is not None:
+                recorder.record(result, action, frame_times)
             
-            # Encontrar contornos en la imagen umbralizada
-            contours, _ = cv2.findContours(thresh, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-            
-            # Procesar contornos si existen
-            if contours:
-                max_contour = max(contours, key=cv2.contourArea)
-                area = cv2.contourArea(max_contour)
-                
-                # Procesar solo si el contorno supera el área mínima
-                if area > config.MIN_AREA:
-                    cv2.drawContours(display_frame, [max_contour], 0, (0, 255, 0), 2)
-                    
-                    # Calcular centro del contorno
-                    M = cv2.moments(max_contour)
-                    if M["m00"] != 0:
-                        cx = int(M["m10"] / M["m00"])
-                        cy = int(M["m01"] / M["m00"])
-                        cv2.circle(display_frame, (cx, cy), 5, (0, 0, 255), -1)
-                        
-                        # Detectar gestos
-                        current_gesture = gesture_detection.detect_gestures(max_contour, display_frame)
-                        
-                        # Estabilizar gestos
-                        if current_gesture == last_gesture:
-                            gesture_counter += 1
-                        else:
-                            gesture_counter = 0
-                            last_gesture = current_gesture
-                        
-                        # Aplicar gestos solo si son estables
-                        is_gesture_applied = gesture_counter >= config.GESTURE_STABILITY
-                        action = None
-                        
-                        if is_gesture_applied:
-                            # Mapear coordenadas de la cámara a coordenadas de pantalla
-                            screen_x = int(np.interp(cx, [0, frame_width], 
-                                                   [config.SCREEN_MARGIN, screen_width - config.SCREEN_MARGIN]))
-                            screen_y = int(np.interp(cy, [0, frame_height], 
-                                                   [config.SCREEN_MARGIN, screen_height - config.SCREEN_MARGIN]))
-                            
-                            # Suavizar movimiento
-                            smooth_x, smooth_y = movement.smooth_movement(pos_history, (screen_x, screen_y))
-                            
-                            # Acciones por región y gesto
-                            if cx < left_region:  # Región izquierda
-                                action = movement.handle_left_region(current_gesture)
-                            elif cx > right_region:  # Región derecha
-                                action = movement.handle_right_region(current_gesture)
-                            else:  # Región central
-                                pyautogui.moveTo(smooth_x, smooth_y)
-                                action = movement.handle_center_region(current_gesture, area, prev_area)
-                            
-                            prev_area = area
-                        
-                        # Actualizar panel de control
-                        control_area = utils.update_control_panel(
-                            control_area, area, (cx, cy), 
-                            current_gesture, action, is_gesture_applied
-                        )
-            
-            # Mostrar frames
-            cv2.imshow('Hand Mouse', display_frame)
-            cv2.imshow('Control Area', control_area)
+            # Dibujar y mostrar solo cuando toca según el modo de visualización
+            if not renderer.due():
+                continue
+            start = time.perf_counter()
+            control_area = utils.render_views(
+                result, control_area, action,
+                hand_tracker.left_region, hand_tracker.right_region, stage_metrics,
+                overlays=budget is None or budget.draw_overlays
+            )
+            stage_metrics.record("display", time.perf_counter() - start)
             
             # Procesar teclas
             key = cv2.waitKey(1)
@@ -164,15 +173,32 @@ def main():
                 break
             elif key == ord('r'):
                 print("Recalibrando...")
-                background = calibration.calibrate_background(cap)
+                background, threshold_map = calibration.calibrate(cap)
+                if config.FAST_START:
+                    calibration.save_background_cache(background, threshold_map)
+                hand_tracker.set_background(background, threshold_map)
+                work_start = None
                 print("Recalibración completada.")
+            elif key == ord('b') and hand_tracker.bg_model is not None:
+                frozen = hand_tracker.bg_model.toggle_freeze()
+                print("Fondo congelado." if frozen else "Actualización del fondo reanudada.")
         
         # Liberar recursos
-        cap.release()
-        cv2.destroyAllWindows()
+        if show_windows:
+            cv2.destroyAllWindows()
     except Exception as e:
         print(f"Error en main: {e}")
     finally:
+        # Exportar métricas y cerrar la telemetría
+        if stage_metrics is not None:
+            stage_metrics.export(config.METRICS_JSON_PATH, config.METRICS_CSV_PATH)
+        if recorder is not None:
+            recorder.close()
+        # Liberar la cámara (y detener el proceso de captura en memoria compartida)
+        if cap is not None:
+            cap.release()
+        movement.cursor_emitter.stop()
+        movement.action_dispatcher.shutdown()
         print("Programa terminado.")
 
 if __name__ == "__main__":
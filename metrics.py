@@ -0,0 +1,178 @@
+"""
+Instrumentación de latencia por etapa con histogramas de bajo costo.
+"""
+import csv
+import json
+import math
+import threading
+import numpy as np
+
+# Orden de las etapas del bucle principal (las etapas desconocidas van al final)
+STAGES = (
+    "capture",
+    "flip",
+    "resize",
+    "process_frame",
+    "find_contours",
+    "detect_gestures",
+    "landmarks_model",
+    "landmarks_tracking",
+    "smooth_movement",
+    "mouse_output",
+    "capture_to_action",
+    "display",
+)
+
+class LatencyHistogram:
+    """
+    Histograma de duraciones con intervalos logarítmicos.
+
+    Registrar una muestra es O(1) y no reserva memoria; los percentiles se
+    calculan a partir de los conteos acumulados, con un error relativo acotado
+    por el ancho de cada intervalo (unos 12% con 20 intervalos por década).
+    """
+
+    def __init__(self, min_seconds=1e-6, max_seconds=10.0, bins_per_decade=20):
+        """
+        Args:
+            min_seconds: Límite inferior del primer intervalo
+            max_seconds: Límite superior del último intervalo
+            bins_per_decade: Intervalos por cada factor 10
+        """
+        self.min_seconds = min_seconds
+        self.bins_per_decade = bins_per_decade
+        decades = math.log10(max_seconds / min_seconds)
+        self.bins = int(math.ceil(decades * bins_per_decade))
+        self.counts = np.zeros(self.bins, np.int64)
+        self.edges = min_seconds * 10.0 ** (np.arange(self.bins + 1) / bins_per_decade)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds):
+        """
+        Registra una duración en segundos.
+        """
+        if seconds <= self.min_seconds:
+            index = 0
+        else:
+            index = int(math.log10(seconds / self.min_seconds) * self.bins_per_decade)
+            index = min(index, self.bins - 1)
+        self.counts[index] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def percentile(self, p):
+        """
+        Devuelve el percentil p (0-100) en segundos, o 0.0 sin muestras.
+        """
+        if self.count == 0:
+            return 0.0
+        target = self.count * p / 100.0
+        index = int(np.searchsorted(np.cumsum(self.counts), target))
+        index = min(index, self.bins - 1)
+        # Punto medio geométrico del intervalo, sin superar el máximo observado
+        value = math.sqrt(self.edges[index] * self.edges[index + 1])
+        return min(value, self.max)
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+    def reset(self):
+        """
+        Descarta todas las muestras.
+        """
+        self.counts.fill(0)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+class StageMetrics:
+    """
+    Conjunto de histogramas de latencia, uno por etapa.
+
+    Es seguro usarlo desde varios hilos (modo pipeline).
+    """
+
+    def __init__(self):
+        self.histograms = {}
+        self._lock = threading.Lock()
+
+    def record(self, stage, seconds):
+        """
+        Registra la duración de una etapa en segundos.
+        """
+        with self._lock:
+            histogram = self.histograms.get(stage)
+            if histogram is None:
+                histogram = self.histograms[stage] = LatencyHistogram()
+            histogram.record(seconds)
+
+    def record_many(self, stage_times):
+        """
+        Registra un diccionario etapa -> duración en segundos.
+        """
+        for stage, seconds in stage_times.items():
+            self.record(stage, seconds)
+
+    def stages(self):
+        """
+        Devuelve los nombres de las etapas registradas, en el orden del bucle.
+        """
+        known = [stage for stage in STAGES if stage in self.histograms]
+        return known + sorted(set(self.histograms) - set(STAGES))
+
+    def summary(self):
+        """
+        Resume cada etapa en milisegundos.
+
+        Returns:
+            dict: etapa -> {'count', 'mean_ms', 'p50_ms', 'p95_ms', 'p99_ms', 'max_ms'}
+        """
+        with self._lock:
+            return {
+                stage: {
+                    "count": self.histograms[stage].count,
+                    "mean_ms": self.histograms[stage].mean * 1000.0,
+                    "p50_ms": self.histograms[stage].percentile(50) * 1000.0,
+                    "p95_ms": self.histograms[stage].percentile(95) * 1000.0,
+                    "p99_ms": self.histograms[stage].percentile(99) * 1000.0,
+                    "max_ms": self.histograms[stage].max * 1000.0,
+                }
+                for stage in self.stages()
+            }
+
+    def export_json(self, path):
+        """
+        Guarda el resumen por etapa en un archivo JSON.
+        """
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.summary(), f, indent=2)
+
+    def export_csv(self, path):
+        """
+        Guarda el resumen por etapa en un archivo CSV.
+        """
+        fields = ["stage", "count", "mean_ms", "p50_ms", "p95_ms", "p99_ms", "max_ms"]
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=fields)
+            writer.writeheader()
+            for stage, stats in self.summary().items():
+                writer.writerow(dict(stage=stage, **stats))
+
+    def export(self, json_path=None, csv_path=None):
+        """
+        Exporta el resumen a los archivos indicados, ignorando los que sean None.
+        """
+        try:
+            if json_path:
+                self.export_json(json_path)
+                print(f"Métricas de latencia guardadas en {json_path}")
+            if csv_path:
+                self.export_csv(csv_path)
+                print(f"Métricas de latencia guardadas en {csv_path}")
+        except OSError as e:
+            print(f"Error exportando métricas: {e}")
\ No newline at end of file
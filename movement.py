@@ -1,10 +1,243 @@
 """
 Módulo para el manejo de movimientos y acciones del ratón.
 """
-import pyautogui
 import numpy as np
+import threading
 import time
 from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from config import ACTION_COOLDOWN, ACTION_COOLDOWNS, CURSOR_DEADBAND, CURSOR_OUTPUT_HZ
+from utils import LazyModule
+
+# pyautogui tarda en importarse: se carga al enviar el primer evento (o antes
+# con pyautogui.preload())
+pyautogui = LazyModule("pyautogui")
+
+# Se activa cuando salta el failsafe de pyautogui (cursor en una esquina); los
+# bucles principales lo comprueban en cada frame para terminar el programa
+failsafe_triggered = threading.Event()
+
+def _is_failsafe(error):
+    """
+    Indica si un error es el FailSafeException de pyautogui.
+    """
+    failsafe = getattr(pyautogui.load(), "FailSafeException", None)
+    return failsafe is not None and isinstance(error, failsafe)
+
+def _trigger_failsafe():
+    """
+    Anuncia el failsafe una sola vez y pide terminar el programa.
+    """
+    if not failsafe_triggered.is_set():
+        failsafe_triggered.set()
+        print("Failsafe de PyAutoGUI activado (cursor en una esquina de la pantalla). Terminando...")
+
+class ActionDispatcher:
+    """
+    Despachador no bloqueante de acciones del ratón y del teclado.
+    
+    Cada acción tiene un tiempo de enfriamiento medido con el reloj del
+    despachador (time.monotonic() por defecto; el banco de pruebas usa el de
+    la reproducción); mientras no haya transcurrido, los nuevos disparos de
+    esa acción se ignoran.
+    Los eventos se envían al sistema desde un único hilo ejecutor, en orden,
+    sin detener el bucle de la cámara. Si salta el failsafe de pyautogui se
+    activa failsafe_triggered y no se envían más eventos.
+    """
+    
+    def __init__(self, cooldown=ACTION_COOLDOWN, cooldowns=None, clock=time.monotonic):
+        """
+        Args:
+            cooldown: Enfriamiento por defecto en segundos
+            cooldowns: Diccionario acción -> enfriamiento en segundos
+            clock: Función que devuelve el instante actual en segundos
+        """
+        self.cooldown = cooldown
+        self.clock = clock
+        self.cooldowns = dict(ACTION_COOLDOWNS if cooldowns is None else cooldowns)
+        self._last_fired = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="acciones")
+    
+    def get_cooldown(self, action):
+        """
+        Devuelve el enfriamiento en segundos de una acción.
+        """
+        return self.cooldowns.get(action, self.cooldown)
+    
+    def ready(self, action, now=None):
+        """
+        Indica si la acción puede dispararse sin violar su enfriamiento.
+        """
+        now = self.clock() if now is None else now
+        last = self._last_fired.get(action)
+        return last is None or now - last >= self.get_cooldown(action)
+    
+    def submit(self, action, func, *args):
+        """
+        Programa una acción si su enfriamiento ha terminado.
+        
+        Args:
+            action: Nombre de la acción (clave del enfriamiento)
+            func: Función de pyautogui que envía el evento
+            *args: Argumentos para func
+            
+        Returns:
+            bool: True si la acción se programó, False si está en enfriamiento
+        """
+        if failsafe_triggered.is_set():
+            return False
+        now = self.clock()
+        with self._lock:
+            if not self.ready(action, now):
+                return False
+            self._last_fired[action] = now
+        self._executor.submit(self._run, action, func, args)
+        return True
+    
+    def _run(self, action, func, args):
+        if failsafe_triggered.is_set():
+            return
+        try:
+            func(*args)
+        except Exception as e:
+            # El failsafe es la salida de emergencia del usuario: termina el programa
+            if _is_failsafe(e):
+                _trigger_failsafe()
+            else:
+                print(f"Error ejecutando la acción {action}: {e}")
+    
+    def reset(self):
+        """
+        Olvida los últimos disparos, de modo que ninguna acción esté en enfriamiento.
+        """
+        with self._lock:
+            self._last_fired.clear()
+    
+    def flush(self):
+        """
+        Espera a que se envíen todos los eventos programados hasta ahora.
+        """
+        self._executor.submit(lambda: None).result()
+    
+    def shutdown(self, wait=True):
+        """
+        Espera a que se envíen los eventos pendientes y detiene el ejecutor.
+        """
+        self._executor.shutdown(wait=wait)
+
+class CursorEmitter:
+    """
+    Salida del cursor con coalescencia y frecuencia limitada.
+    
+    Solo se conserva la última posición objetivo; un hilo propio la envía al
+    sistema a un ritmo fijo (por ejemplo el refresco de la pantalla) y descarta
+    los movimientos que no superan la zona muerta. Así el número de llamadas a
+    moveTo no crece con los FPS de la cámara. Si salta el failsafe de
+    pyautogui, el hilo se detiene y no vuelve a arrancar.
+    """
+    
+    def __init__(self, rate_hz=CURSOR_OUTPUT_HZ, deadband=CURSOR_DEADBAND):
+        """
+        Args:
+            rate_hz: Envíos por segundo como máximo
+            deadband: Desplazamiento mínimo en píxeles para mover el cursor
+        """
+        self.period = 1.0 / rate_hz
+        self.deadband = deadband
+        self._target = None
+        self._last_sent = None
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+        self.submitted = 0
+        self.sent = 0
+    
+    def move(self, position):
+        """
+        Fija la posición objetivo del cursor, reemplazando la pendiente.
+        """
+        with self._lock:
+            self._target = position
+            self.submitted += 1
+            if self._thread is None and not failsafe_triggered.is_set():
+                self._stop_event.clear()
+                self._thread = threading.Thread(target=self._run, name="cursor", daemon=True)
+                self._thread.start()
+    
+    def emit_pending(self):
+        """
+        Envía ya la posición pendiente si supera la zona muerta.
+        
+        Se usa antes de un clic para que ocurra en la última posición.
+        """
+        with self._lock:
+            target = self._target
+            self._target = None
+            if target is None or failsafe_triggered.is_set():
+                return
+            if self._last_sent is not None:
+                dx = target[0] - self._last_sent[0]
+                dy = target[1] - self._last_sent[1]
+                if dx * dx + dy * dy <= self.deadband * self.deadband:
+                    return
+            try:
+                # _pause=False evita la pausa de pyautogui tras cada llamada
+                pyautogui.moveTo(target[0], target[1], _pause=False)
+                self._last_sent = target
+                self.sent += 1
+            except Exception as e:
+                if _is_failsafe(e):
+                    _trigger_failsafe()
+                    self._stop_event.set()
+                else:
+                    print(f"Error moviendo el cursor: {e}")
+    
+    def _run(self):
+        next_tick = time.monotonic()
+        while not self._stop_event.is_set():
+            self.emit_pending()
+            # Ritmo fijo sin acumular deriva
+            next_tick += self.period
+            delay = next_tick - time.monotonic()
+            if delay < 0:
+                next_tick = time.monotonic()
+                delay = 0
+            self._stop_event.wait(delay)
+        with self._lock:
+            self._thread = None
+    
+    def stop(self):
+        """
+        Envía la posición pendiente y detiene el hilo de salida.
+        """
+        self._stop_event.set()
+        thread = self._thread
+        if thread is not None:
+            thread.join(timeout=1.0)
+        self.emit_pending()
+
+# Despachador compartido por los manejadores de región
+action_dispatcher = ActionDispatcher()
+
+# Salida del cursor compartida por los manejadores de región
+cursor_emitter = CursorEmitter()
+
+def _click_at_cursor():
+    """
+    Hace clic tras enviar la última posición pendiente del cursor.
+    """
+    cursor_emitter.emit_pending()
+    pyautogui.click()
+
+def _dispatch(action, func, *args):
+    """
+    Programa una acción en el despachador compartido.
+    
+    Returns:
+        str: Nombre de la acción si se programó, None si está en enfriamiento
+    """
+    return action if action_dispatcher.submit(action, func, *args) else None
 
 def smooth_movement(history, new_pos, max_len=7):
     """
@@ -53,44 +286,38 @@ def perform_action(gesture, position, region, screen_size, prev_area=None, area=
     # Acciones según la región y el gesto
     if region == 'left':
         if gesture == "pinch":
-            pyautogui.hotkey('ctrl', '-')  # Zoom out
-            time.sleep(0.2)
+            _dispatch("zoom_out", pyautogui.hotkey, 'ctrl', '-')  # Zoom out
             return area
         elif gesture == "rotate":
-            pyautogui.hotkey('ctrl', 'alt', 'left')  # Rotar izquierda
-            time.sleep(0.2)
+            _dispatch("rotate_left", pyautogui.hotkey, 'ctrl', 'alt', 'left')  # Rotar izquierda
             return area
             
     elif region == 'right':
         if gesture == "pinch":
-            pyautogui.hotkey('ctrl', '+')  # Zoom in
-            time.sleep(0.2)
+            _dispatch("zoom_in", pyautogui.hotkey, 'ctrl', '+')  # Zoom in
             return area
         elif gesture == "rotate":
-            pyautogui.hotkey('ctrl', 'alt', 'right')  # Rotar derecha
-            time.sleep(0.2)
+            _dispatch("rotate_right", pyautogui.hotkey, 'ctrl', 'alt', 'right')  # Rotar derecha
             return area
             
     else:  # Región central
-        pyautogui.moveTo(x, y)
+        cursor_emitter.move((x, y))
         if gesture == "hand_closed":
-            pyautogui.click()
-            time.sleep(0.2)
+            _dispatch("click", pyautogui.click)
             return area
         elif gesture == "hand_open":
-            pyautogui.scroll(50)  # Scroll arriba
-            time.sleep(0.2)
+            _dispatch("scroll_up", pyautogui.scroll, 50)  # Scroll arriba
             return area
         elif prev_area is not None and area is not None:
             area_diff = area - prev_area
             if abs(area_diff) > 2000:
                 scroll_dir = 50 if area_diff > 0 else -50
-                pyautogui.scroll(scroll_dir)
-                time.sleep(0.2)
+                action = "scroll_down" if scroll_dir < 0 else "scroll_up"
+                _dispatch(action, pyautogui.scroll, scroll_dir)
                 
     return area
 
-def handle_center_region(gesture, area, prev_area):
+def handle_center_region(gesture, area, prev_area, pressed=True):
     """
     Maneja las acciones para la región central basadas en el gesto detectado.
     
@@ -98,25 +325,21 @@ def handle_center_region(gesture, area, prev_area):
         gesture: Nombre del gesto detectado
         area: Área actual del contorno
         prev_area: Área del contorno en el frame anterior
+        pressed: Indica si el gesto acaba de activarse (el clic solo se hace entonces)
         
     Returns:
-        str: Acción realizada
+        str: Acción programada, o None si no hay acción o está en enfriamiento
     """
     if gesture == "hand_closed":
-        pyautogui.click()
-        time.sleep(0.2)
-        return "click"
+        return _dispatch("click", _click_at_cursor) if pressed else None
     elif gesture == "hand_open":
-        pyautogui.scroll(50)  # Scroll arriba
-        time.sleep(0.2)
-        return "scroll_up"
+        return _dispatch("scroll_up", pyautogui.scroll, 50)  # Scroll arriba
     elif prev_area is not None and area is not None:
         area_diff = area - prev_area
         if abs(area_diff) > 2000:
             scroll_dir = 50 if area_diff > 0 else -50
-            pyautogui.scroll(scroll_dir)
-            time.sleep(0.2)
-            return "scroll_down" if scroll_dir < 0 else "scroll_up"
+            action = "scroll_down" if scroll_dir < 0 else "scroll_up"
+            return _dispatch(action, pyautogui.scroll, scroll_dir)
     return None
 
 def handle_left_region(gesture):
@@ -127,16 +350,12 @@ def handle_left_region(gesture):
         gesture: Nombre del gesto detectado
         
     Returns:
-        str: Acción realizada
+        str: Acción programada, o None si no hay acción o está en enfriamiento
     """
     if gesture == "pinch":
-        pyautogui.hotkey('ctrl', '-')  # Zoom out
-        time.sleep(0.2)
-        return "zoom_out"
+        return _dispatch("zoom_out", pyautogui.hotkey, 'ctrl', '-')  # Zoom out
     elif gesture == "rotate":
-        pyautogui.hotkey('ctrl', 'alt', 'left')  # Rotar izquierda
-        time.sleep(0.2)
-        return "rotate_left"
+        return _dispatch("rotate_left", pyautogui.hotkey, 'ctrl', 'alt', 'left')  # Rotar izquierda
     return None
 
 def handle_right_region(gesture):
@@ -147,14 +366,34 @@ def handle_right_region(gesture):
         gesture: Nombre del gesto detectado
         
     Returns:
-        str: Acción realizada
+        str: Acción programada, o None si no hay acción o está en enfriamiento
     """
     if gesture == "pinch":
-        pyautogui.hotkey('ctrl', '+')  # Zoom in
-        time.sleep(0.2)
-        return "zoom_in"
+        return _dispatch("zoom_in", pyautogui.hotkey, 'ctrl', '+')  # Zoom in
     elif gesture == "rotate":
-        pyautogui.hotkey('ctrl', 'alt', 'right')  # Rotar derecha
-        time.sleep(0.2)
-        return "rotate_right"
-    return None
\ No newline at end of file
+        return _dispatch("rotate_right", pyautogui.hotkey, 'ctrl', 'alt', 'right')  # Rotar derecha
+    return None
+
+def execute_action(result):
+    """
+    Ejecuta la acción de un resultado de detección estable según su región.
+    
+    Las acciones se basan en el gesto confirmado; el clic solo se hace en el
+    evento 'press', mientras que el resto se repite al mantener el gesto
+    (limitado por los enfriamientos).
+    
+    Args:
+        result: Diccionario devuelto por HandTracker.process
+        
+    Returns:
+        str: Acción realizada
+    """
+    gesture = result['active_gesture']
+    if result['region'] == 'left':
+        return handle_left_region(gesture)
+    elif result['region'] == 'right':
+        return handle_right_region(gesture)
+    
+    cursor_emitter.move(result['screen_position'])
+    pressed = ('press', gesture) in result['events']
+    return handle_center_region(gesture, result['area'], result['prev_area'], pressed)
\ No newline at end of file
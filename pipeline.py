@@ -0,0 +1,287 @@
+"""
+Modo pipeline: captura, visión y salida del ratón en hilos separados.
+
+Las etapas se comunican mediante colas de último valor: si una etapa se
+retrasa, los frames antiguos se descartan en lugar de acumularse, de modo que
+la latencia de extremo a extremo se mantiene en torno a un frame.
+"""
+import threading
+import time
+import cv2
+
+import calibration
+import config
+import frame_ring
+import movement
+import utils
+
+class LatestValueQueue:
+    """
+    Cola acotada de capacidad uno que conserva solo el valor más reciente.
+
+    Un put() sobre una cola llena reemplaza el valor pendiente y cuenta el
+    descarte en `dropped`. Con `merge`, el valor que se publica en su lugar es
+    merge(pendiente, nuevo), para no perder lo que no se puede descartar.
+    """
+
+    def __init__(self, merge=None):
+        """
+        Args:
+            merge: Función (pendiente, nuevo) -> valor que reemplaza al pendiente, o None
+        """
+        self._merge = merge
+        self._cond = threading.Condition()
+        self._item = None
+        self._has_item = False
+        self._closed = False
+        self.dropped = 0
+
+    def put(self, item):
+        """
+        Publica un valor, descartando el anterior si no se había consumido.
+        """
+        with self._cond:
+            if self._has_item:
+                self.dropped += 1
+                if self._merge is not None:
+                    item = self._merge(self._item, item)
+            self._item = item
+            self._has_item = True
+            self._cond.notify()
+
+    def get(self, timeout=None):
+        """
+        Espera y devuelve el valor más reciente.
+
+        Args:
+            timeout: Tiempo máximo de espera en segundos
+
+        Returns:
+            El valor más reciente, o None si vence el tiempo o la cola se cerró
+        """
+        with self._cond:
+            self._cond.wait_for(lambda: self._has_item or self._closed, timeout)
+            if not self._has_item:
+                return None
+            item = self._item
+            self._item = None
+            self._has_item = False
+            return item
+
+    def close(self):
+        """
+        Cierra la cola y despierta a los consumidores en espera.
+        """
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+def merge_commands(pending, new):
+    """
+    Une dos órdenes para la salida conservando los eventos de la descartada.
+
+    Los eventos ('press' del clic, 'release') ocurren una sola vez: si el
+    resultado que los trae se reemplaza antes de llegar a la salida, pasan al
+    resultado nuevo en lugar de perderse.
+
+    Args:
+        pending: Orden (resultado, tiempos por etapa) aún no consumida
+        new: Orden que la reemplaza
+
+    Returns:
+        tuple: Orden nueva con los eventos de ambas, en orden
+    """
+    pending_result, _ = pending
+    result, stage_times = new
+    if not pending_result['events']:
+        return new
+    return dict(result, events=pending_result['events'] + result['events']), stage_times
+
+class Pipeline:
+    """
+    Ejecuta las etapas de captura, visión y salida en hilos propios.
+
+    La visualización y el teclado quedan en el hilo principal (ver
+    run_pipeline), ya que HighGUI no es seguro fuera de él en todas las
+    plataformas.
+    """
+
+    def __init__(self, cap, tracker, stage_metrics=None, budget=None, recorder=None,
+                 copy_thresh=True):
+        """
+        Args:
+            cap: Objeto de captura de video
+            tracker: HandTracker que procesa cada frame
+            stage_metrics: StageMetrics donde registrar la latencia de cada etapa
+            budget: FrameBudgetController que ajusta la calidad de la visión, o None
+            recorder: TelemetryRecorder donde registrar cada frame, o None
+            copy_thresh: Entregar una copia de la silueta en cada resultado (hace
+                falta si otro hilo la dibuja)
+        """
+        self.cap = cap
+        self.tracker = tracker
+        self.metrics = stage_metrics
+        self.budget = budget
+        self.recorder = recorder
+        self.copy_thresh = copy_thresh
+        self.frames = LatestValueQueue()
+        self.commands = LatestValueQueue(merge_commands)
+        self.results = LatestValueQueue()
+        self.last_action = None
+        self._stop_event = threading.Event()
+        self._threads = []
+
+    @property
+    def running(self):
+        return not self._stop_event.is_set()
+
+    def start(self):
+        """
+        Arranca los hilos de captura, visión y salida.
+        """
+        for name, target in (("captura", self._capture_loop),
+                             ("vision", self._vision_loop),
+                             ("salida", self._output_loop)):
+            thread = threading.Thread(target=target, name=f"pipeline-{name}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self):
+        """
+        Detiene los hilos y espera a que terminen.
+        """
+        self._stop_event.set()
+        for queue in (self.frames, self.commands, self.results):
+            queue.close()
+        for thread in self._threads:
+            thread.join(timeout=1.0)
+        self._threads = []
+
+    def _capture_loop(self):
+        shared_capture = isinstance(self.cap, frame_ring.SharedMemoryCapture)
+        try:
+            while self.running:
+                start = time.perf_counter()
+                ret, frame = self.cap.read()
+                if not ret or frame is None:
+                    print("Error: No se pudo leer frame")
+                    break
+                captured = time.perf_counter()
+                # Voltear horizontalmente para una interfaz tipo espejo
+                frame = cv2.flip(frame, 1)
+                # Descartar el frame si el proceso de captura reescribió su ranura mientras se volteaba
+                if shared_capture and not self.cap.frame_valid():
+                    continue
+                if self.metrics is not None:
+                    self.metrics.record("capture", captured - start)
+                    self.metrics.record("flip", time.perf_counter() - captured)
+                self.frames.put((frame, self.cap.timestamp))
+        except Exception as e:
+            print(f"Error en la etapa de captura: {e}")
+        finally:
+            self._stop_event.set()
+
+    def _vision_loop(self):
+        try:
+            while self.running:
+                item = self.frames.get(timeout=0.1)
+                if item is None:
+                    continue
+                frame, timestamp = item
+                start = time.perf_counter()
+                result = self.tracker.process(frame, timestamp)
+                if self.budget is not None:
+                    # La visión es la etapa que marca el ritmo: su tiempo es el presupuestado
+                    self.budget.update(time.perf_counter() - start, time.monotonic())
+                # process() crea un diccionario nuevo por frame: se puede pasar a la salida
+                stage_times = self.tracker.stage_times
+                if self.metrics is not None:
+                    self.metrics.record_many(stage_times)
+                if result['stable']:
+                    # La salida registra la telemetría junto con la acción
+                    self.commands.put((result, stage_times))
+                elif self.recorder is not None:
+                    self.recorder.record(result, None, stage_times)
+                # La silueta es un buffer del workspace que la visión reescribe con el
+                # siguiente frame mientras el hilo principal la dibuja: entregar una copia
+                if self.copy_thresh and result['thresh'] is not None:
+                    result['thresh'] = result['thresh'].copy()
+                self.results.put(result)
+        except Exception as e:
+            print(f"Error en la etapa de visión: {e}")
+            self._stop_event.set()
+
+    def _output_loop(self):
+        try:
+            while self.running:
+                item = self.commands.get(timeout=0.1)
+                if item is None:
+                    continue
+                result, stage_times = item
+                start = time.perf_counter()
+                self.last_action = movement.execute_action(result)
+                output_times = {"mouse_output": time.perf_counter() - start,
+                                "capture_to_action": time.monotonic() - result['timestamp']}
+                if self.metrics is not None:
+                    self.metrics.record_many(output_times)
+                if self.recorder is not None:
+                    self.recorder.record(result, self.last_action, dict(stage_times, **output_times))
+        except Exception as e:
+            print(f"Error en la etapa de salida: {e}")
+            self._stop_event.set()
+
+def run_pipeline(cap, tracker, control_area, renderer, stage_metrics=None, budget=None,
+                 recorder=None):
+    """
+    Ejecuta el modo pipeline hasta que el usuario sale o falla la captura.
+
+    Args:
+        cap: Objeto de captura de video
+        tracker: HandTracker que procesa cada frame
+        control_area: Panel de control para mostrar información
+        renderer: RenderScheduler que decide cuándo dibujar
+        stage_metrics: StageMetrics donde registrar la latencia de cada etapa
+        budget: FrameBudgetController que ajusta la calidad de la visión, o None
+        recorder: TelemetryRecorder donde registrar cada frame, o None
+    """
+    pipeline = Pipeline(cap, tracker, stage_metrics, budget, recorder,
+                        copy_thresh=not renderer.headless)
+    pipeline.start()
+    try:
+        while pipeline.running and not movement.failsafe_triggered.is_set():
+            result = pipeline.results.get(timeout=0.1)
+            if renderer.headless or result is None or not renderer.due():
+                continue
+            start = time.perf_counter()
+            control_area = utils.render_views(
+                result, control_area, pipeline.last_action,
+                tracker.left_region, tracker.right_region, stage_metrics,
+                overlays=budget is None or budget.draw_overlays
+            )
+            if stage_metrics is not None:
+                stage_metrics.record("display", time.perf_counter() - start)
+
+            # Procesar teclas
+            key = cv2.waitKey(1)
+            if key == ord('q'):
+                print("Saliendo del programa por tecla 'q'.")
+                break
+            elif key == ord('r'):
+                # La calibración lee de la cámara: detener el pipeline mientras tanto
+                print("Recalibrando...")
+                pipeline.stop()
+                background, threshold_map = calibration.calibrate(cap)
+                if config.FAST_START:
+                    calibration.save_background_cache(background, threshold_map)
+                tracker.set_background(background, threshold_map)
+                print("Recalibración completada.")
+                pipeline = Pipeline(cap, tracker, stage_metrics, budget, recorder,
+                                    copy_thresh=not renderer.headless)
+                pipeline.start()
+            elif key == ord('b') and tracker.bg_model is not None:
+                frozen = tracker.bg_model.toggle_freeze()
+                print("Fondo congelado." if frozen else "Actualización del fondo reanudada.")
+    finally:
+        pipeline.stop()
+        print(f"Frames descartados por retraso: captura={pipeline.frames.dropped}, "
+              f"salida={pipeline.commands.dropped}")
\ No newline at end of file
@@ -0,0 +1,169 @@
+"""
+Segmentación por color de piel con una tabla de consulta BGR cuantizada.
+
+Cada canal se cuantiza a SKIN_LUT_BITS bits y el color resultante indexa una
+tabla de probabilidad de piel (32³ entradas con 5 bits). La consulta de un
+frame completo son tres operaciones vectorizadas (cv2.LUT, cv2.transform y
+np.take), sin bucles en Python. La tabla parte de una regla de crominancia
+en YCrCb y puede aprenderse de muestras de la mano del usuario.
+"""
+import os
+
+import cv2
+import numpy as np
+
+import config
+
+class SkinModel:
+    """
+    Tabla de probabilidad de piel por color BGR cuantizado.
+    """
+
+    def __init__(self, bits=config.SKIN_LUT_BITS, threshold=config.SKIN_THRESHOLD):
+        """
+        Args:
+            bits: Bits por canal de la cuantización (1-5)
+            threshold: Probabilidad mínima (0-255) para considerar piel un color
+        """
+        self.bits = bits
+        self.threshold = threshold
+        levels = 1 << bits
+
+        # cv2.LUT de 3 canales que lleva cada canal a su posición en el índice;
+        # cv2.transform los suma (los bits no se solapan)
+        quantized = np.arange(256, dtype=np.uint16) >> (8 - bits)
+        self._channel_lut = np.empty((1, 256, 3), np.uint16)
+        self._channel_lut[0, :, 0] = quantized << (2 * bits)
+        self._channel_lut[0, :, 1] = quantized << bits
+        self._channel_lut[0, :, 2] = quantized
+        self._sum = np.ones((1, 3), np.float32)
+
+        self.probability = self.prior_table(bits)
+        self._skin_counts = np.zeros(levels ** 3, np.float64)
+        self._other_counts = np.zeros(levels ** 3, np.float64)
+        self.learned = False
+        self._update_mask_table()
+
+    @staticmethod
+    def prior_table(bits):
+        """
+        Tabla inicial: piel si la crominancia del centro de cada celda cae en
+        el rango habitual de la piel (Cr 133-173, Cb 77-127).
+
+        Returns:
+            numpy.ndarray: Probabilidad (uint8, 0 o 255) por índice de color
+        """
+        levels = 1 << bits
+        centers = ((np.arange(levels) << (8 - bits)) + (1 << (7 - bits))).astype(np.uint8)
+        b, g, r = np.meshgrid(centers, centers, centers, indexing='ij')
+        bgr = np.stack((b.ravel(), g.ravel(), r.ravel()), axis=1).reshape(-1, 1, 3)
+        ycrcb = cv2.cvtColor(bgr, cv2.COLOR_BGR2YCrCb).reshape(-1, 3)
+        cr, cb = ycrcb[:, 1], ycrcb[:, 2]
+        skin = (cr >= 133) & (cr <= 173) & (cb >= 77) & (cb <= 127)
+        return np.where(skin, 255, 0).astype(np.uint8)
+
+    def _update_mask_table(self):
+        # Tabla binaria (0/255) para obtener la máscara directamente con np.take
+        self._mask_table = np.where(self.probability >= self.threshold, 255, 0).astype(np.uint8)
+
+    def _index(self, frame, workspace=None):
+        shape = frame.shape[:2]
+        shifted = cv2.LUT(frame, self._channel_lut,
+                          dst=_buffer(workspace, 'skin_shifted', shape + (3,), np.uint16))
+        return cv2.transform(shifted, self._sum,
+                             dst=_buffer(workspace, 'skin_index', shape, np.uint16))
+
+    def mask(self, frame, workspace=None):
+        """
+        Máscara de piel de un frame BGR.
+
+        Args:
+            frame: Frame BGR (uint8)
+            workspace: FrameWorkspace con los buffers a reutilizar, o None
+
+        Returns:
+            numpy.ndarray: Imagen binaria (255 = piel) del tamaño del frame
+        """
+        index = self._index(frame, workspace)
+        out = _buffer(workspace, 'skin', frame.shape[:2], np.uint8)
+        if out is None:
+            return np.take(self._mask_table, index)
+        return np.take(self._mask_table, index, out=out)
+
+    def accumulate(self, frame, skin_mask):
+        """
+        Suma las muestras de un frame: los píxeles de skin_mask como piel y el resto como no piel.
+
+        Args:
+            frame: Frame BGR (uint8)
+            skin_mask: Máscara (uint8) de los píxeles de la mano
+        """
+        index = self._index(frame).ravel()
+        skin = skin_mask.ravel() > 0
+        levels = self._skin_counts.size
+        self._skin_counts += np.bincount(index[skin], minlength=levels)
+        self._other_counts += np.bincount(index[~skin], minlength=levels)
+
+    @property
+    def skin_samples(self):
+        return int(self._skin_counts.sum())
+
+    def fit(self, min_samples=config.SKIN_MIN_SAMPLES):
+        """
+        Recalcula la tabla a partir de las muestras acumuladas.
+
+        La probabilidad de cada color es la proporción de muestras de piel con
+        ese color (priors iguales); los colores con menos de min_samples
+        muestras conservan la tabla inicial.
+
+        Returns:
+            int: Colores aprendidos de las muestras
+        """
+        total = self._skin_counts + self._other_counts
+        known = total >= min_samples
+        learned = np.round(255.0 * self._skin_counts[known] / total[known]).astype(np.uint8)
+        self.probability = self.prior_table(self.bits)
+        self.probability[known] = learned
+        self.learned = True
+        self._update_mask_table()
+        return int(np.count_nonzero(known))
+
+    def save(self, path=config.SKIN_TABLE_PATH):
+        """
+        Guarda la tabla de probabilidad aprendida.
+        """
+        if not path:
+            return
+        try:
+            np.save(path, self.probability)
+            print(f"Tabla de piel guardada en {path}")
+        except OSError as e:
+            print(f"No se pudo guardar la tabla de piel: {e}")
+
+    def load(self, path=config.SKIN_TABLE_PATH):
+        """
+        Carga una tabla guardada con la misma cuantización.
+
+        Returns:
+            bool: True si se cargó
+        """
+        if not path or not os.path.exists(path):
+            return False
+        try:
+            probability = np.load(path)
+        except (OSError, ValueError) as e:
+            print(f"No se pudo leer la tabla de piel: {e}")
+            return False
+        if probability.shape != self.probability.shape or probability.dtype != np.uint8:
+            print("La tabla de piel guardada no coincide con SKIN_LUT_BITS; se usa la inicial.")
+            return False
+        self.probability = probability
+        self.learned = True
+        self._update_mask_table()
+        return True
+
+def _buffer(workspace, name, shape, dtype):
+    """
+    Buffer del workspace, o None sin workspace (OpenCV reserva uno nuevo).
+    """
+    return workspace.get(name, shape, dtype) if workspace is not None else None
\ No newline at end of file
@@ -0,0 +1,304 @@
+"""
+Supervisor de varias estaciones: un proceso de trabajo por cámara.
+
+Cada sesión tiene su propia cámara, fondo calibrado y estado de gestos, y se
+ejecuta en un proceso aparte (fijado a un núcleo cuando el sistema lo
+permite), de modo que el procesamiento escala con los núcleos en lugar de
+compartir un solo bucle limitado por el GIL. El supervisor reinicia las
+sesiones que fallan y muestra periódicamente los FPS y la latencia de cada una.
+
+Uso:
+    python supervisor.py 0 1                # dos cámaras
+    python supervisor.py 0 grabacion.mp4    # cámara y video
+    python supervisor.py 0 "capturas/*.png" # cámara y secuencia de imágenes
+    python supervisor.py 0 1 --mouse 0      # la sesión 0 controla el ratón
+"""
+import argparse
+import multiprocessing
+import os
+import queue
+import time
+
+import config
+
+def _pin_to_core(core):
+    """
+    Fija el proceso actual a un núcleo, si el sistema lo permite.
+
+    Returns:
+        bool: True si se pudo fijar
+    """
+    if core is None or not hasattr(os, "sched_setaffinity"):
+        return False
+    try:
+        os.sched_setaffinity(0, {core})
+        return True
+    except OSError as e:
+        print(f"No se pudo fijar el proceso al núcleo {core}: {e}")
+        return False
+
+def run_session(session_id, source, core, stats_queue, stop_event, controls_mouse=False):
+    """
+    Proceso de trabajo: calibra y procesa una fuente hasta que se detiene.
+
+    Args:
+        session_id: Identificador de la sesión
+        source: Índice de cámara o ruta de video
+        core: Núcleo al que fijar el proceso, o None
+        stats_queue: Cola donde publicar las estadísticas de la sesión
+        stop_event: Evento que detiene la sesión
+        controls_mouse: Indica si la sesión envía eventos al ratón
+
+    Returns:
+        None. El código de salida es 0 si la fuente terminó y 1 si falló.
+    """
+    import cv2
+    import calibration
+    import frame_source
+    import metrics
+    import movement
+    import telemetry
+    import tracker
+
+    # Un hilo de OpenCV por proceso: el paralelismo lo dan los procesos
+    cv2.setNumThreads(1)
+    pinned = _pin_to_core(core)
+
+    cap = frame_source.open_source(source)
+    if not cap.isOpened():
+        print(f"[sesión {session_id}] Error: No se pudo abrir la fuente {source}")
+        raise SystemExit(1)
+
+    recorder = None
+    try:
+        background, threshold_map = calibration.calibrate(cap, show=False)
+        frame_width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)) or background.shape[1]
+        frame_height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)) or background.shape[0]
+        if controls_mouse:
+            # Misma configuración de PyAutoGUI que main.py
+            pyautogui = movement.pyautogui.load()
+            pyautogui.FAILSAFE = True
+            pyautogui.PAUSE = config.PYAUTOGUI_PAUSE
+            screen_size = pyautogui.size()
+        else:
+            screen_size = (config.FRAME_WIDTH, config.FRAME_HEIGHT)
+        hand_tracker = tracker.HandTracker(background, (frame_width, frame_height), screen_size,
+                                           threshold_map)
+
+        # Un archivo de telemetría por sesión: telemetria.bin -> telemetria_0.bin
+        root, ext = os.path.splitext(config.TELEMETRY_PATH)
+        recorder = telemetry.open_recorder(f"{root}_{session_id}{ext}")
+
+        stage_metrics = metrics.StageMetrics()
+        frames = 0
+        interval_start = time.monotonic()
+        failed = False
+        while not stop_event.is_set() and not movement.failsafe_triggered.is_set():
+            start = time.perf_counter()
+            ret, frame = cap.read()
+            if not ret or frame is None:
+                # Un video que termina no es un fallo; una cámara que deja de responder sí
+                failed = str(source).isdigit()
+                break
+            frame = cv2.flip(frame, 1, dst=hand_tracker.workspace.get('flip', frame.shape))
+            result = hand_tracker.process(frame, cap.timestamp)
+            stage_metrics.record_many(hand_tracker.stage_times)
+            action = None
+            if controls_mouse and result['stable']:
+                action = movement.execute_action(result)
+            stage_metrics.record("total", time.perf_counter() - start)
+            if recorder is not None:
+                recorder.record(result, action, hand_tracker.stage_times)
+            frames += 1
+
+            now = time.monotonic()
+            if now - interval_start >= config.SESSION_STATS_INTERVAL:
+                stats_queue.put({
+                    "session": session_id,
+                    "pid": os.getpid(),
+                    "core": core if pinned else None,
+                    "fps": frames / (now - interval_start),
+                    "gesture": result['active_gesture'],
+                    "stages": stage_metrics.summary(),
+                })
+                frames = 0
+                interval_start = now
+                stage_metrics = metrics.StageMetrics()
+    finally:
+        cap.release()
+        if recorder is not None:
+            recorder.close()
+        if controls_mouse:
+            movement.cursor_emitter.stop()
+            movement.action_dispatcher.shutdown()
+
+    if failed:
+        print(f"[sesión {session_id}] Error: No se pudo leer frame de {source}")
+        raise SystemExit(1)
+
+class Supervisor:
+    """
+    Arranca una sesión por fuente, las reinicia si fallan y recoge sus estadísticas.
+    """
+
+    def __init__(self, sources, cores=None, mouse_session=None,
+                 restart_delay=config.SESSION_RESTART_DELAY,
+                 max_restarts=config.SESSION_MAX_RESTARTS,
+                 stable_period=config.SESSION_STABLE_PERIOD):
+        """
+        Args:
+            sources: Lista de fuentes (índices de cámara o rutas de video)
+            cores: Núcleos disponibles para fijar las sesiones, o None para todos
+            mouse_session: Índice de la sesión que controla el ratón, o None
+            restart_delay: Espera inicial en segundos antes de reiniciar una sesión
+            max_restarts: Reinicios permitidos por sesión
+            stable_period: Segundos en marcha tras los que una sesión que
+                falla vuelve a contar sus reinicios desde cero
+        """
+        self.sources = list(sources)
+        if cores is None and hasattr(os, "sched_getaffinity"):
+            cores = sorted(os.sched_getaffinity(0))
+        self.cores = list(cores) if cores else None
+        self.mouse_session = mouse_session
+        self.restart_delay = restart_delay
+        self.max_restarts = max_restarts
+        self.stable_period = stable_period
+
+        # spawn: cada sesión arranca limpia, sin heredar hilos de OpenCV del padre
+        self._context = multiprocessing.get_context("spawn")
+        self.stats_queue = self._context.Queue()
+        self.stop_event = self._context.Event()
+        self.processes = {}
+        self.restarts = {session_id: 0 for session_id in range(len(self.sources))}
+        self._restart_at = {}
+        self._started_at = {}
+        self.stats = {}
+
+    def _core_for(self, session_id):
+        if not self.cores:
+            return None
+        return self.cores[session_id % len(self.cores)]
+
+    def _start_session(self, session_id):
+        process = self._context.Process(
+            target=run_session,
+            args=(session_id, self.sources[session_id], self._core_for(session_id),
+                  self.stats_queue, self.stop_event, session_id == self.mouse_session),
+            name=f"sesion-{session_id}",
+            daemon=True,
+        )
+        process.start()
+        self.processes[session_id] = process
+        self._started_at[session_id] = time.monotonic()
+
+    def start(self):
+        """
+        Arranca todas las sesiones.
+        """
+        for session_id in range(len(self.sources)):
+            self._start_session(session_id)
+
+    def _check_sessions(self, now):
+        """
+        Programa el reinicio de las sesiones caídas y arranca las que toca.
+        """
+        for session_id, process in list(self.processes.items()):
+            if process.is_alive() or session_id in self._restart_at:
+                continue
+            # Un fallo tras un rato estable no arrastra los reinicios anteriores
+            if now - self._started_at[session_id] >= self.stable_period:
+                self.restarts[session_id] = 0
+            if process.exitcode == 0:
+                print(f"Sesión {session_id} terminada ({self.sources[session_id]}).")
+                del self.processes[session_id]
+                self.stats.pop(session_id, None)
+            elif self.restarts[session_id] >= self.max_restarts:
+                print(f"Sesión {session_id} abandonada tras {self.restarts[session_id]} reinicios.")
+                del self.processes[session_id]
+                self.stats.pop(session_id, None)
+            else:
+                # Espera creciente entre reinicios sucesivos
+                delay = self.restart_delay * 2 ** self.restarts[session_id]
+                print(f"Sesión {session_id} falló (código {process.exitcode}); "
+                      f"reiniciando en {delay:.1f} s.")
+                self._restart_at[session_id] = now + delay
+
+        for session_id, when in list(self._restart_at.items()):
+            if now >= when:
+                del self._restart_at[session_id]
+                self.restarts[session_id] += 1
+                self._start_session(session_id)
+
+    def _drain_stats(self, timeout):
+        """
+        Recoge las estadísticas publicadas por las sesiones.
+        """
+        try:
+            stats = self.stats_queue.get(timeout=timeout)
+            while True:
+                self.stats[stats["session"]] = stats
+                stats = self.stats_queue.get_nowait()
+        except queue.Empty:
+            pass
+
+    def print_stats(self):
+        """
+        Imprime los FPS y la latencia total de cada sesión.
+        """
+        for session_id in sorted(self.stats):
+            stats = self.stats[session_id]
+            total = stats["stages"].get("total", {})
+            core = stats["core"] if stats["core"] is not None else "-"
+            print(f"Sesión {session_id} (pid {stats['pid']}, núcleo {core}): "
+                  f"{stats['fps']:.1f} FPS, latencia p50 {total.get('p50_ms', 0.0):.1f} ms, "
+                  f"p95 {total.get('p95_ms', 0.0):.1f} ms, "
+                  f"reinicios {self.restarts[session_id]}, gesto {stats['gesture']}")
+
+    def run(self):
+        """
+        Supervisa las sesiones hasta que todas terminan o se pulsa Ctrl+C.
+        """
+        self.start()
+        next_report = time.monotonic() + config.SESSION_STATS_INTERVAL
+        try:
+            while self.processes:
+                self._drain_stats(timeout=0.2)
+                now = time.monotonic()
+                self._check_sessions(now)
+                if now >= next_report:
+                    self.print_stats()
+                    next_report = now + config.SESSION_STATS_INTERVAL
+        except KeyboardInterrupt:
+            print("\nDeteniendo sesiones...")
+        finally:
+            self.stop()
+
+    def stop(self):
+        """
+        Detiene todas las sesiones y espera a que terminen.
+        """
+        self.stop_event.set()
+        for process in self.processes.values():
+            process.join(timeout=3.0)
+            if process.is_alive():
+                process.terminate()
+        self.processes = {}
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Ejecuta una sesión de Hand Mouse por cámara.")
+    parser.add_argument("sources", nargs="+", help="Índices de cámara o rutas de video")
+    parser.add_argument("--cores", type=int, nargs="*",
+                        help="Núcleos a los que fijar las sesiones (por defecto todos)")
+    parser.add_argument("--mouse", type=int, default=None,
+                        help="Índice de la sesión que controla el ratón")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    supervisor = Supervisor(args.sources, cores=args.cores, mouse_session=args.mouse)
+    print(f"Iniciando {len(args.sources)} sesiones. Presiona Ctrl+C para salir.")
+    supervisor.run()
+    print("Programa terminado.")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,285 @@
+"""
+Registro de telemetría por frame en un archivo circular mapeado en memoria.
+
+Cada frame se guarda como un registro de ancho fijo (arreglo estructurado de
+NumPy) en un anillo de TELEMETRY_CAPACITY registros: instante, centro, área,
+dedos, proporción, gesto crudo y estable, eventos, acción y latencia de cada
+etapa. Escribir un registro es copiar unos bytes en el mapa (microsegundos);
+el sistema operativo vuelca las páginas al disco, así que el archivo
+sobrevive a un cierre inesperado del programa.
+
+Para analizarlo:
+    import telemetry
+    records = telemetry.load_telemetry("telemetria.bin", last_seconds=3600)
+    clicks = records[records['action'] == b'click']
+
+O desde la consola:
+    python telemetry.py telemetria.bin --last 3600
+"""
+import argparse
+import json
+import os
+import threading
+import time
+
+import numpy as np
+
+import config
+import metrics
+
+# Gestos codificados como enteros (-1 para uno desconocido)
+GESTURES = (None, "hand_open", "hand_closed", "pinch", "rotate")
+_GESTURE_CODES = {name: code for code, name in enumerate(GESTURES)}
+
+# Cabecera: contador de registros escritos (uint64) seguido de la descripción en JSON
+HEADER_SIZE = 4096
+MAGIC = "handmouse-telemetria"
+VERSION = 1
+
+# Clicks que se listan en el resumen (los más recientes)
+MAX_LISTED_CLICKS = 20
+
+def record_dtype(stages=metrics.STAGES):
+    """
+    Tipo de los registros, con una columna de latencia (ms) por etapa.
+    """
+    return np.dtype([
+        ('wall_time', np.float64),  # time.time() al registrar
+        ('frame_time', np.float64),  # Instante de captura del frame (monotónico)
+        ('x', np.int16),  # Centro de la mano (-1 sin mano)
+        ('y', np.int16),
+        ('area', np.float32),
+        ('fingers', np.int8),  # Dedos contados (-1 si no se analizó el contorno)
+        ('aspect_ratio', np.float32),
+        ('gesture', np.int8),  # Gesto del frame (código de GESTURES)
+        ('active_gesture', np.int8),  # Gesto confirmado por la máquina de estados
+        ('pressed', np.int8),  # Gesto con evento 'press' en este frame (0 si ninguno)
+        ('released', np.int8),  # Gesto con evento 'release' en este frame (0 si ninguno)
+        ('stable', np.bool_),
+        ('action', 'S16'),
+        ('stage_ms', np.float32, (len(stages),)),  # NaN en las etapas que no corrieron
+    ])
+
+def gesture_code(gesture):
+    return _GESTURE_CODES.get(gesture, -1)
+
+def gesture_name(code):
+    """
+    Nombre del gesto de un código (None para 'sin gesto' o desconocido).
+    """
+    return GESTURES[code] if 0 <= code < len(GESTURES) else None
+
+class TelemetryRecorder:
+    """
+    Escritor del anillo de telemetría.
+
+    Si el archivo existe y tiene la misma capacidad y tipo de registro, se
+    sigue escribiendo a continuación; si no, se crea de nuevo. record() es
+    seguro entre hilos (el modo pipeline registra desde la visión y la salida).
+    """
+
+    def __init__(self, path=config.TELEMETRY_PATH, capacity=config.TELEMETRY_CAPACITY,
+                 stages=metrics.STAGES):
+        """
+        Args:
+            path: Archivo del anillo
+            capacity: Número de registros que guarda el anillo
+            stages: Etapas con columna de latencia
+        """
+        self.path = path
+        self.capacity = capacity
+        self.stages = tuple(stages)
+        self._stage_index = {stage: i for i, stage in enumerate(self.stages)}
+        self.dtype = record_dtype(self.stages)
+        self._lock = threading.Lock()
+
+        header = {"magic": MAGIC, "version": VERSION, "capacity": capacity,
+                  "stages": list(self.stages), "dtype": self.dtype.descr}
+        encoded = json.dumps(header).encode()
+        if len(encoded) > HEADER_SIZE - 8:
+            raise ValueError("Demasiadas etapas para la cabecera de telemetría")
+
+        size = HEADER_SIZE + capacity * self.dtype.itemsize
+        reuse = os.path.exists(path) and os.path.getsize(path) == size and \
+            _read_header(path)[1] == json.loads(encoded)
+        if not reuse:
+            with open(path, "wb") as f:
+                f.truncate(size)
+                f.seek(8)
+                f.write(encoded)
+        self._count = np.memmap(path, np.uint64, "r+", 0, (1,))
+        self._records = np.memmap(path, self.dtype, "r+", HEADER_SIZE, (capacity,))
+        self._stage_ms = np.full(len(self.stages), np.nan, np.float32)
+
+    @property
+    def count(self):
+        """
+        Registros escritos desde que se creó el archivo.
+        """
+        return int(self._count[0])
+
+    def record(self, result, action=None, stage_times=None):
+        """
+        Registra un frame.
+
+        Args:
+            result: Diccionario devuelto por HandTracker.process
+            action: Acción realizada en este frame, o None
+            stage_times: Duración en segundos de cada etapa, o None
+        """
+        stage_ms = self._stage_ms
+        stage_ms.fill(np.nan)
+        if stage_times:
+            for stage, seconds in stage_times.items():
+                index = self._stage_index.get(stage)
+                if index is not None:
+                    stage_ms[index] = seconds * 1000.0
+
+        position = result['position'] or (-1, -1)
+        features = result['features']
+        pressed = released = 0
+        for kind, gesture in result['events']:
+            if kind == 'press':
+                pressed = gesture_code(gesture)
+            elif kind == 'release':
+                released = gesture_code(gesture)
+        row = (time.time(), result.get('timestamp') or 0.0, position[0], position[1],
+               result['area'], features['finger_count'] if features else -1,
+               features['aspect_ratio'] if features else 0.0,
+               gesture_code(result['gesture']), gesture_code(result['active_gesture']),
+               pressed, released, result['stable'], (action or "").encode()[:16], stage_ms)
+
+        with self._lock:
+            count = int(self._count[0])
+            self._records[count % self.capacity] = row
+            self._count[0] = count + 1
+
+    def close(self):
+        """
+        Vuelca el anillo al disco y lo cierra.
+        """
+        with self._lock:
+            self._records.flush()
+            self._count.flush()
+            del self._records, self._count
+
+def _read_header(path):
+    """
+    Lee el contador y la descripción del archivo.
+
+    Returns:
+        tuple: (registros escritos, cabecera como dict o None si no es válida)
+    """
+    with open(path, "rb") as f:
+        raw = f.read(HEADER_SIZE)
+    if len(raw) < HEADER_SIZE:
+        return 0, None
+    count = int(np.frombuffer(raw[:8], np.uint64)[0])
+    try:
+        header = json.loads(raw[8:].rstrip(b"\0").decode())
+    except ValueError:
+        return count, None
+    if header.get("magic") != MAGIC:
+        return count, None
+    return count, header
+
+def open_recorder(path=None):
+    """
+    Abre el registro de telemetría de config, o None si está desactivado o falla.
+
+    Args:
+        path: Archivo del anillo, o None para config.TELEMETRY_PATH
+    """
+    if not config.TELEMETRY:
+        return None
+    try:
+        return TelemetryRecorder(path or config.TELEMETRY_PATH, config.TELEMETRY_CAPACITY)
+    except (OSError, ValueError) as e:
+        print(f"No se pudo abrir la telemetría: {e}")
+        return None
+
+def load_telemetry(path=config.TELEMETRY_PATH, last_seconds=None):
+    """
+    Lee el anillo de telemetría en orden cronológico.
+
+    Args:
+        path: Archivo del anillo
+        last_seconds: Quedarse solo con los últimos segundos registrados, o None para todo
+
+    Returns:
+        numpy.ndarray: Arreglo estructurado (copia) con un registro por frame;
+            las columnas se usan como arreglos (records['area'], records['stage_ms'])
+    """
+    count, header = _read_header(path)
+    if header is None:
+        raise ValueError(f"{path} no es un archivo de telemetría")
+    dtype = np.dtype([tuple(field) if len(field) == 2 else (field[0], field[1], tuple(field[2]))
+                      for field in header["dtype"]])
+    capacity = header["capacity"]
+    ring = np.memmap(path, dtype, "r", HEADER_SIZE, (capacity,))
+
+    # Con el anillo lleno, el registro más antiguo es el siguiente a escribir
+    if count <= capacity:
+        records = np.array(ring[:count])
+    else:
+        start = count % capacity
+        records = np.concatenate((ring[start:], ring[:start]))
+    del ring
+
+    if last_seconds is not None and len(records):
+        records = records[records['wall_time'] >= records['wall_time'][-1] - last_seconds]
+    return records
+
+def summarize(records, stages=metrics.STAGES):
+    """
+    Imprime un resumen del registro: duración, gestos, acciones y latencias.
+    """
+    if not len(records):
+        print("Sin registros.")
+        return
+    duration = records['wall_time'][-1] - records['wall_time'][0]
+    print(f"{len(records)} frames en {duration:.0f} s "
+          f"({len(records) / duration if duration > 0 else 0.0:.1f} FPS), "
+          f"desde {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(records['wall_time'][0]))}")
+
+    codes, counts = np.unique(records['gesture'], return_counts=True)
+    print("Gestos: " + ", ".join(f"{gesture_name(code)}={count}"
+                                 for code, count in zip(codes.tolist(), counts.tolist())))
+
+    acted = records[records['action'] != b""]
+    actions, counts = np.unique(acted['action'], return_counts=True)
+    print("Acciones: " + (", ".join(f"{action.decode()}={count}"
+                                    for action, count in zip(actions.tolist(), counts.tolist()))
+                          or "ninguna"))
+    clicks = acted[acted['action'] == b'click']
+    if len(clicks) > MAX_LISTED_CLICKS:
+        print(f"  (últimos {MAX_LISTED_CLICKS} de {len(clicks)} clicks)")
+    for record in clicks[-MAX_LISTED_CLICKS:]:
+        when = time.strftime('%H:%M:%S', time.localtime(record['wall_time']))
+        print(f"  click a las {when} en ({record['x']}, {record['y']}), "
+              f"área {record['area']:.0f}, dedos {record['fingers']}")
+
+    stage_ms = records['stage_ms']
+    for i, stage in enumerate(stages[:stage_ms.shape[1]]):
+        values = stage_ms[:, i]
+        values = values[~np.isnan(values)]
+        if len(values):
+            print(f"{stage:<18} p50 {np.percentile(values, 50):7.3f} ms  "
+                  f"p99 {np.percentile(values, 99):7.3f} ms")
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Resume el registro de telemetría de Hand Mouse.")
+    parser.add_argument("path", nargs="?", default=config.TELEMETRY_PATH,
+                        help="Archivo de telemetría")
+    parser.add_argument("--last", type=float, default=None,
+                        help="Solo los últimos segundos registrados")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    records = load_telemetry(args.path, args.last)
+    _, header = _read_header(args.path)
+    summarize(records, header["stages"])
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
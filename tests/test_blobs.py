@@ -0,0 +1,46 @@
+"""
+Pruebas de la asignación de identificadores de BlobTracker.
+"""
+from blobs import BlobTracker
+
+def blob(x, y):
+    return {'centroid': (float(x), float(y))}
+
+def ids(blobs):
+    return [(b['id'], b['centroid']) for b in blobs]
+
+def test_ids_follow_nearest_blob():
+    tracker = BlobTracker(max_distance=50, max_misses=2)
+    first = tracker.update([blob(10, 10), blob(200, 10)])
+    assert ids(first) == [(0, (10.0, 10.0)), (1, (200.0, 10.0))]
+    # Las manchas llegan en otro orden y se han movido un poco
+    second = tracker.update([blob(210, 15), blob(20, 12)])
+    assert ids(second) == [(0, (20.0, 12.0)), (1, (210.0, 15.0))]
+
+def test_far_blob_gets_new_id():
+    tracker = BlobTracker(max_distance=50, max_misses=2)
+    tracker.update([blob(10, 10)])
+    assert ids(tracker.update([blob(300, 300)])) == [(1, (300.0, 300.0))]
+
+def test_closest_pair_wins_contested_track():
+    tracker = BlobTracker(max_distance=50, max_misses=2)
+    tracker.update([blob(100, 100)])
+    result = tracker.update([blob(130, 100), blob(105, 100)])
+    assert ids(result) == [(0, (105.0, 100.0)), (1, (130.0, 100.0))]
+
+def test_track_survives_misses_then_is_forgotten():
+    tracker = BlobTracker(max_distance=50, max_misses=2)
+    tracker.update([blob(10, 10)])
+    tracker.update([])
+    tracker.update([])
+    assert ids(tracker.update([blob(12, 10)])) == [(0, (12.0, 10.0))]
+    for _ in range(3):
+        tracker.update([])
+    assert tracker.tracks == {}
+    assert ids(tracker.update([blob(12, 10)])) == [(1, (12.0, 10.0))]
+
+def test_reset_restarts_ids():
+    tracker = BlobTracker(max_distance=50, max_misses=2)
+    tracker.update([blob(10, 10), blob(200, 10)])
+    tracker.reset()
+    assert ids(tracker.update([blob(200, 10)])) == [(0, (200.0, 10.0))]
\ No newline at end of file
@@ -0,0 +1,57 @@
+"""
+Pruebas de cuándo HandTracker reinicia el filtro del cursor.
+"""
+import numpy as np
+
+import config
+import tracker
+
+class CountingFilter:
+    def __init__(self):
+        self.resets = 0
+
+    def __call__(self, point, timestamp):
+        return point
+
+    def reset(self):
+        self.resets += 1
+
+def scripted_tracker(monkeypatch, detections):
+    hand_tracker = tracker.HandTracker(np.zeros((120, 160, 3), np.uint8), (160, 120), (1600, 1200))
+    hand_tracker.detector = None
+    hand_tracker.cursor_filter = CountingFilter()
+    hand_tracker.gesture_state = tracker.GestureStateMachine(enter_dwell=0.0, exit_dwell=0.2, dwells={},
+                                                             max_outliers=1)
+    script = iter(detections)
+
+    def detect(small):
+        center = next(script)
+        return {'center': center, 'area': 1000.0 if center else 0,
+                'gesture': 'hand_open' if center else None,
+                'thresh': None, 'roi': None, 'contour': None, 'features': None,
+                'landmarks': None, 'hands': []}
+
+    monkeypatch.setattr(hand_tracker, "_detect_contour", detect)
+    return hand_tracker
+
+def run(hand_tracker, frames, period=1 / 30):
+    frame = np.zeros((120, 160, 3), np.uint8)
+    for i in range(frames):
+        hand_tracker.process(frame, i * period)
+    return hand_tracker.cursor_filter.resets
+
+def test_single_dropped_detection_keeps_filter(monkeypatch):
+    hand_tracker = scripted_tracker(monkeypatch, [(80, 60), (82, 60), None, (84, 60), (86, 60)])
+    assert run(hand_tracker, 5) == 0
+
+def test_released_hand_resets_filter(monkeypatch):
+    hand_tracker = scripted_tracker(monkeypatch, [(80, 60), (82, 60)] + [None] * 10)
+    assert run(hand_tracker, 12) > 0
+
+def test_long_gap_between_positions_resets_filter(monkeypatch):
+    hand_tracker = scripted_tracker(monkeypatch, [(80, 60), (82, 60), (84, 60)])
+    frame = np.zeros((120, 160, 3), np.uint8)
+    hand_tracker.process(frame, 0.0)
+    hand_tracker.process(frame, 1 / 30)
+    hand_tracker.process(frame, 1 / 30 + config.CURSOR_FILTER_RESET_GAP + 0.1)
+    assert hand_tracker.cursor_filter.resets == 1
\ No newline at end of file
@@ -0,0 +1,28 @@
+"""
+Pruebas de los enfriamientos del despachador de acciones con un reloj inyectado.
+"""
+import movement
+
+def test_cooldown_follows_injected_clock():
+    now = [0.0]
+    fired = []
+    dispatcher = movement.ActionDispatcher(cooldown=0.5, cooldowns={}, clock=lambda: now[0])
+    try:
+        assert dispatcher.submit("click", fired.append, 1)
+        assert not dispatcher.submit("click", fired.append, 2)
+        now[0] = 0.5
+        assert dispatcher.submit("click", fired.append, 3)
+        dispatcher.flush()
+    finally:
+        dispatcher.shutdown()
+    assert fired == [1, 3]
+
+def test_reset_clears_cooldowns():
+    dispatcher = movement.ActionDispatcher(cooldown=10.0, cooldowns={}, clock=lambda: 0.0)
+    try:
+        assert dispatcher.submit("scroll_up", lambda: None)
+        assert not dispatcher.ready("scroll_up")
+        dispatcher.reset()
+        assert dispatcher.ready("scroll_up")
+    finally:
+        dispatcher.shutdown()
\ No newline at end of file
@@ -0,0 +1,68 @@
+"""
+Pruebas del failsafe de pyautogui en el despachador y en la salida del cursor.
+"""
+import sys
+import types
+
+import pytest
+
+class FailSafeException(Exception):
+    pass
+
+class CornerPyAutoGUI(types.ModuleType):
+    """
+    pyautogui falso con el cursor en una esquina: toda llamada salta el failsafe.
+    """
+
+    FailSafeException = FailSafeException
+
+    def __init__(self):
+        super().__init__("pyautogui")
+        self.calls = []
+
+    def _fail(self, *args, **kwargs):
+        self.calls.append(args)
+        raise FailSafeException("esquina")
+
+    click = moveTo = scroll = hotkey = _fail
+
+@pytest.fixture
+def movement(monkeypatch):
+    fake = CornerPyAutoGUI()
+    monkeypatch.setitem(sys.modules, "pyautogui", fake)
+    import movement
+    monkeypatch.setattr(movement, "pyautogui", movement.LazyModule("pyautogui"))
+    movement.failsafe_triggered.clear()
+    yield movement
+    movement.failsafe_triggered.clear()
+
+def test_dispatcher_failsafe_stops_program(movement):
+    dispatcher = movement.ActionDispatcher(cooldowns={})
+    assert dispatcher.submit("click", movement.pyautogui.click)
+    dispatcher.flush()
+    assert movement.failsafe_triggered.is_set()
+    # Tras el failsafe no se programan más acciones
+    assert not dispatcher.submit("scroll_up", movement.pyautogui.scroll, 50)
+    dispatcher.shutdown()
+
+def test_dispatcher_other_errors_keep_running(movement):
+    dispatcher = movement.ActionDispatcher(cooldowns={})
+
+    def broken():
+        raise RuntimeError("fallo")
+
+    dispatcher.submit("click", broken)
+    dispatcher.flush()
+    assert not movement.failsafe_triggered.is_set()
+    dispatcher.shutdown()
+
+def test_cursor_failsafe_stops_emitter(movement):
+    emitter = movement.CursorEmitter(rate_hz=200, deadband=0)
+    emitter.move((0, 0))
+    assert movement.failsafe_triggered.wait(1.0)
+    emitter._stop_event.wait(1.0)
+    calls = len(sys.modules["pyautogui"].calls)
+    # Ni el hilo ni nuevos movimientos vuelven a llamar a pyautogui
+    emitter.move((10, 10))
+    emitter.stop()
+    assert len(sys.modules["pyautogui"].calls) == calls == 1
\ No newline at end of file
@@ -0,0 +1,58 @@
+"""
+Pruebas de la validación por secuencia del anillo de frames compartido.
+"""
+import numpy as np
+import pytest
+
+from frame_ring import SharedFrameRing
+
+@pytest.fixture
+def ring():
+    ring = SharedFrameRing((4, 4, 3), slots=3)
+    yield ring
+    ring.close()
+
+def write(ring, value, timestamp):
+    seq, slot = ring.begin_write()
+    slot[:] = value
+    ring.publish(seq, timestamp)
+    return seq
+
+def test_latest_frame_and_timestamp(ring):
+    assert ring.wait_newer(0, timeout=0) is None
+    write(ring, 1, 0.5)
+    seq = write(ring, 2, 1.0)
+    latest, frame, timestamp = ring.wait_newer(0, timeout=0)
+    assert latest == seq == 2
+    assert timestamp == 1.0
+    assert np.all(frame == 2)
+    assert ring.is_valid(seq)
+
+def test_slot_being_rewritten_is_invalid(ring):
+    seq = write(ring, 1, 0.0)
+    for value in range(2, ring.slots + 1):
+        write(ring, value, 0.0)
+    # El escritor reserva de nuevo la ranura del primer frame
+    next_seq, _ = ring.begin_write()
+    assert next_seq % ring.slots == seq % ring.slots
+    assert not ring.is_valid(seq)
+    assert not ring.is_valid(next_seq)
+    ring.publish(next_seq, 0.0)
+    assert ring.is_valid(next_seq)
+    assert not ring.is_valid(seq)
+
+def test_closed_ring_stops_waiting(ring):
+    write(ring, 1, 0.0)
+    ring.mark_closed()
+    assert ring.wait_newer(ring.latest, timeout=1.0) is None
+
+def test_reader_attaches_by_name(ring):
+    seq = write(ring, 7, 2.0)
+    reader = SharedFrameRing(ring.shape, slots=ring.slots, name=ring.name)
+    try:
+        latest, frame, timestamp = reader.wait_newer(0, timeout=0)
+        assert (latest, timestamp) == (seq, 2.0)
+        assert np.all(frame == 7)
+        del frame
+    finally:
+        reader.close()
\ No newline at end of file
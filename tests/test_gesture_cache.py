@@ -0,0 +1,53 @@
+"""
+Pruebas de aciertos e invalidación de GestureCache.
+"""
+import cv2
+import numpy as np
+
+from gesture_detection import GestureCache, analyze_gesture
+
+def hand_contour(dx=0, dy=0, scale=1.0):
+    """
+    Contorno de una silueta con tres dedos, desplazado y escalado.
+    """
+    mask = np.zeros((400, 400), np.uint8)
+    s = lambda v: int(v * scale)
+    cv2.rectangle(mask, (50 + dx, s(120) + dy), (50 + s(120) + dx, s(240) + dy), 255, -1)
+    for finger in range(3):
+        x = 55 + s(40 * finger) + dx
+        cv2.rectangle(mask, (x, 20 + dy), (x + s(25), s(125) + dy), 255, -1)
+    contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    return max(contours, key=cv2.contourArea)
+
+def test_same_shape_hits_and_translates_features():
+    cache = GestureCache()
+    gesture, features = cache.analyze(hand_contour())
+    moved_gesture, moved = cache.analyze(hand_contour(dx=30, dy=10))
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert moved_gesture == gesture
+    assert np.array_equal(moved['box'], features['box'] + (30, 10))
+    expected = analyze_gesture(hand_contour(dx=30, dy=10))[1]
+    assert np.array_equal(np.sort(moved['defects']['far'], axis=0),
+                          np.sort(expected['defects']['far'], axis=0))
+
+def test_shape_change_invalidates():
+    cache = GestureCache(tolerance=0.05)
+    cache.analyze(hand_contour())
+    cache.analyze(hand_contour(scale=1.3))
+    assert (cache.hits, cache.misses) == (0, 2)
+
+def test_reference_not_updated_on_hits():
+    cache = GestureCache(tolerance=0.05, hu_tolerance=10.0)
+    cache.analyze(hand_contour())
+    # Cada paso cabe en la tolerancia, pero el cambio acumulado no
+    cache.analyze(hand_contour(scale=1.03))
+    cache.analyze(hand_contour(scale=1.06))
+    assert (cache.hits, cache.misses) == (1, 2)
+
+def test_reset_forgets_result():
+    cache = GestureCache()
+    cache.analyze(hand_contour())
+    cache.reset()
+    cache.analyze(hand_contour())
+    assert (cache.hits, cache.misses) == (0, 2)
+    assert cache.hit_rate == 0.0
\ No newline at end of file
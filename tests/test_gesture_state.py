@@ -0,0 +1,82 @@
+"""
+Pruebas de la máquina de estados de confirmación de gestos.
+"""
+import pytest
+
+from tracker import GestureStateMachine
+
+FRAME = 1.0 / 30
+
+def run(machine, gestures, start=0.0):
+    """
+    Alimenta la máquina con un gesto por frame a 30 FPS.
+
+    Returns:
+        list: (instante, evento) de los eventos 'press' y 'release'
+    """
+    events = []
+    for i, gesture in enumerate(gestures):
+        timestamp = start + i * FRAME
+        for kind, name in machine.update(gesture, timestamp):
+            if kind != 'hold':
+                events.append((round(timestamp, 3), kind, name))
+    return events
+
+def press_time(events, gesture):
+    return next(t for t, kind, name in events if kind == 'press' and name == gesture)
+
+def test_enter_dwell():
+    machine = GestureStateMachine(0.5, 0.1, {}, max_outliers=0)
+    events = run(machine, ["pinch"] * 30)
+    # El primer frame con el gesto es el instante 0
+    assert press_time(events, "pinch") == pytest.approx(0.5, abs=FRAME)
+    assert machine.active == "pinch" and machine.confirmed
+
+def test_no_press_before_enter_dwell():
+    machine = GestureStateMachine(0.5, 0.1, {}, max_outliers=0)
+    assert run(machine, ["pinch"] * 10) == []
+    assert not machine.confirmed or machine.active is None
+
+def test_exit_dwell():
+    machine = GestureStateMachine(0.1, 0.3, {}, max_outliers=0)
+    events = run(machine, ["pinch"] * 10 + [None] * 20)
+    release = next(t for t, kind, _ in events if kind == 'release')
+    # Los frames con None empiezan en el frame 10
+    assert release - 10 * FRAME == pytest.approx(0.3, abs=FRAME)
+
+def test_outliers_are_tolerated_while_entering():
+    machine = GestureStateMachine(0.5, 0.1, {}, max_outliers=1)
+    gestures = ["pinch"] * 5 + ["rotate"] + ["pinch"] * 20
+    events = run(machine, gestures)
+    # Un frame suelto no reinicia la espera de entrada
+    assert press_time(events, "pinch") == pytest.approx(0.5, abs=FRAME)
+    assert all(name == "pinch" for _, _, name in events)
+
+def test_outliers_are_tolerated_while_active():
+    machine = GestureStateMachine(0.1, 0.1, {}, max_outliers=2)
+    gestures = ["pinch"] * 10 + ["rotate", "rotate"] + ["pinch"] * 10
+    events = run(machine, gestures)
+    assert [kind for _, kind, _ in events] == ['press']
+
+def test_blip_does_not_shorten_enter_dwell():
+    machine = GestureStateMachine(0.5, 0.1, {}, max_outliers=2)
+    gestures = ["hand_open"] * 30 + ["pinch", "rotate"] + ["hand_closed"] * 40
+    events = run(machine, gestures)
+    first = 32 * FRAME
+    # Los frames sueltos de otros gestos no adelantan la entrada del nuevo
+    assert press_time(events, "hand_closed") - first >= 0.5 - 1e-6
+
+def test_blip_of_same_gesture_counts_towards_enter_dwell():
+    machine = GestureStateMachine(0.5, 0.1, {}, max_outliers=2)
+    gestures = ["hand_open"] * 30 + ["hand_closed"] * 40
+    events = run(machine, gestures)
+    first = 30 * FRAME
+    # Sin frames ajenos, la espera se cuenta desde el primer frame del gesto nuevo
+    assert press_time(events, "hand_closed") - first == pytest.approx(0.5, abs=FRAME)
+
+def test_reset_forgets_active_gesture():
+    machine = GestureStateMachine(0.1, 0.1, {}, max_outliers=0)
+    run(machine, ["pinch"] * 10)
+    machine.reset()
+    assert machine.active is None and not machine.confirmed
+    assert run(machine, ["pinch"] * 2, start=10.0) == []
\ No newline at end of file
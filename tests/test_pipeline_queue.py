@@ -0,0 +1,49 @@
+"""
+Pruebas de las colas de último valor del modo pipeline.
+"""
+import threading
+
+from pipeline import LatestValueQueue, merge_commands
+
+def make_result(events, gesture="hand_closed"):
+    return {'events': events, 'active_gesture': gesture}
+
+def test_get_returns_latest_and_counts_drops():
+    queue = LatestValueQueue()
+    for value in range(3):
+        queue.put(value)
+    assert queue.get(timeout=0.1) == 2
+    assert queue.dropped == 2
+
+def test_get_times_out_when_empty():
+    assert LatestValueQueue().get(timeout=0.01) is None
+
+def test_close_wakes_waiting_reader():
+    queue = LatestValueQueue()
+    values = []
+    reader = threading.Thread(target=lambda: values.append(queue.get(timeout=5.0)))
+    reader.start()
+    queue.close()
+    reader.join(timeout=1.0)
+    assert not reader.is_alive()
+    assert values == [None]
+
+def test_merge_keeps_discarded_values():
+    queue = LatestValueQueue(lambda pending, new: pending + new)
+    queue.put([1])
+    queue.put([2])
+    assert queue.get(timeout=0.1) == [1, 2]
+    assert queue.dropped == 1
+
+def test_press_survives_replacement():
+    queue = LatestValueQueue(merge_commands)
+    queue.put((make_result([('press', "hand_closed")]), {"a": 1.0}))
+    queue.put((make_result([('hold', "hand_closed")]), {"a": 2.0}))
+    result, stage_times = queue.get(timeout=0.1)
+    assert ('press', "hand_closed") in result['events']
+    assert result['events'] == [('press', "hand_closed"), ('hold', "hand_closed")]
+    assert stage_times == {"a": 2.0}
+
+def test_merge_without_events_keeps_new_item():
+    new = (make_result([]), {})
+    assert merge_commands((make_result([]), {}), new) is new
\ No newline at end of file
@@ -0,0 +1,35 @@
+"""
+Pruebas de la política de reinicio del supervisor (sin lanzar procesos).
+"""
+import supervisor
+
+class DeadProcess:
+    exitcode = 1
+
+    def is_alive(self):
+        return False
+
+def failed_supervisor(restarts, started_at):
+    sup = supervisor.Supervisor(["video.mp4"], cores=[0], restart_delay=1.0,
+                                max_restarts=5, stable_period=60.0)
+    sup.processes[0] = DeadProcess()
+    sup.restarts[0] = restarts
+    sup._started_at[0] = started_at
+    return sup
+
+def test_quick_failures_accumulate_restarts():
+    sup = failed_supervisor(restarts=3, started_at=100.0)
+    sup._check_sessions(110.0)
+    assert sup.restarts[0] == 3
+    assert sup._restart_at[0] == 110.0 + 8.0
+
+def test_stable_session_forgets_restarts():
+    sup = failed_supervisor(restarts=3, started_at=100.0)
+    sup._check_sessions(200.0)
+    assert sup.restarts[0] == 0
+    assert sup._restart_at[0] == 200.0 + 1.0
+
+def test_session_abandoned_after_max_restarts():
+    sup = failed_supervisor(restarts=5, started_at=100.0)
+    sup._check_sessions(110.0)
+    assert 0 not in sup.processes
\ No newline at end of file
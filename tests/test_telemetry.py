@@ -0,0 +1,56 @@
+"""
+Pruebas del anillo de telemetría: vuelta del anillo, orden de lectura y reapertura.
+"""
+import numpy as np
+
+import telemetry
+
+def result(i):
+    return {'position': (i, 2 * i), 'features': None, 'events': [('press', 'pinch')],
+            'timestamp': float(i), 'area': 100.0 * i, 'gesture': 'pinch',
+            'active_gesture': 'pinch', 'stable': True}
+
+def record(recorder, frames):
+    for i in frames:
+        recorder.record(result(i), "click" if i % 2 else None, {"process_frame": i / 1000.0})
+
+def test_wraparound_reads_in_order(tmp_path):
+    path = str(tmp_path / "telemetria.bin")
+    recorder = telemetry.TelemetryRecorder(path, capacity=4)
+    record(recorder, range(10))
+    assert recorder.count == 10
+    recorder.close()
+
+    records = telemetry.load_telemetry(path)
+    assert records['frame_time'].tolist() == [6.0, 7.0, 8.0, 9.0]
+    assert records['x'].tolist() == [6, 7, 8, 9]
+    assert records['action'].tolist() == [b"", b"click", b"", b"click"]
+    assert records['pressed'].tolist() == [telemetry.gesture_code('pinch')] * 4
+    stage = telemetry.metrics.STAGES.index("process_frame")
+    assert np.allclose(records['stage_ms'][:, stage], [6.0, 7.0, 8.0, 9.0])
+
+def test_partial_ring(tmp_path):
+    path = str(tmp_path / "telemetria.bin")
+    recorder = telemetry.TelemetryRecorder(path, capacity=8)
+    record(recorder, range(3))
+    recorder.close()
+    assert telemetry.load_telemetry(path)['frame_time'].tolist() == [0.0, 1.0, 2.0]
+
+def test_reopen_continues_ring(tmp_path):
+    path = str(tmp_path / "telemetria.bin")
+    recorder = telemetry.TelemetryRecorder(path, capacity=4)
+    record(recorder, range(3))
+    recorder.close()
+    recorder = telemetry.TelemetryRecorder(path, capacity=4)
+    record(recorder, range(3, 6))
+    recorder.close()
+    assert telemetry.load_telemetry(path)['frame_time'].tolist() == [2.0, 3.0, 4.0, 5.0]
+
+def test_different_capacity_recreates_file(tmp_path):
+    path = str(tmp_path / "telemetria.bin")
+    recorder = telemetry.TelemetryRecorder(path, capacity=4)
+    record(recorder, range(3))
+    recorder.close()
+    recorder = telemetry.TelemetryRecorder(path, capacity=6)
+    assert recorder.count == 0
+    recorder.close()
\ No newline at end of file
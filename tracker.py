@@ -0,0 +1,687 @@
+"""
+Procesamiento de visión por frame: segmentación, búsqueda de la mano,
+detección y estabilización de gestos.
+"""
+import cv2
+import numpy as np
+import time
+
+import blobs
+import calibration
+import config
+import filters
+import gesture_detection
+import hand_landmarks
+import skin
+import utils
+
+class RoiTracker:
+    """
+    Ventana de seguimiento alrededor de la mano detectada en el frame anterior.
+    
+    Mientras la mano está localizada, solo se procesa un recuadro con margen
+    alrededor de su contorno. Si la mano se acerca al borde de la ventana el
+    margen crece, y si se pierde se vuelve a buscar en todo el frame.
+    """
+
+    def __init__(self, frame_size, padding=config.ROI_PADDING,
+                 edge_margin=config.ROI_EDGE_MARGIN, growth=config.ROI_GROWTH,
+                 max_padding=config.ROI_MAX_PADDING):
+        """
+        Args:
+            frame_size: Tupla (ancho, alto) del frame
+            padding: Margen base en píxeles alrededor del contorno
+            edge_margin: Distancia al borde de la ventana que dispara el crecimiento
+            growth: Factor de crecimiento del margen
+            max_padding: Margen máximo en píxeles
+        """
+        self.frame_width, self.frame_height = frame_size
+        self.base_padding = padding
+        self.edge_margin = edge_margin
+        self.growth = growth
+        self.max_padding = max_padding
+        self.padding = padding
+        self.roi = None
+
+    def reset(self):
+        """
+        Vuelve a la búsqueda en todo el frame.
+        """
+        self.roi = None
+        self.padding = self.base_padding
+
+    def _near_edge(self, bbox):
+        x, y, w, h = bbox
+        rx, ry, rw, rh = self.roi
+        margin = self.edge_margin
+        return (x - rx < margin and rx > 0 or
+                y - ry < margin and ry > 0 or
+                rx + rw - (x + w) < margin and rx + rw < self.frame_width or
+                ry + rh - (y + h) < margin and ry + rh < self.frame_height)
+
+    def update(self, bbox):
+        """
+        Actualiza la ventana con el rectángulo de la mano en el frame actual.
+        
+        Args:
+            bbox: Rectángulo (x, y, ancho, alto) del contorno en coordenadas
+                del frame, o None si la mano se perdió
+        """
+        if bbox is None:
+            self.reset()
+            return
+
+        # Crecer si la mano toca el borde, si no volver poco a poco al margen base
+        if self.roi is not None and self._near_edge(bbox):
+            self.padding = min(int(self.padding * self.growth), self.max_padding)
+        else:
+            self.padding = max(self.base_padding, int(self.padding / self.growth))
+
+        x, y, w, h = bbox
+        x0 = max(x - self.padding, 0)
+        y0 = max(y - self.padding, 0)
+        x1 = min(x + w + self.padding, self.frame_width)
+        y1 = min(y + h + self.padding, self.frame_height)
+        self.roi = (x0, y0, x1 - x0, y1 - y0)
+
+# Marca de "sin candidato" (None es un valor válido: mano sin gesto reconocido)
+_NO_CANDIDATE = object()
+
+class GestureStateMachine:
+    """
+    Confirmación de gestos por tiempo, con histéresis.
+    
+    Un gesto se activa cuando se observa de forma continua durante su tiempo
+    de entrada y se libera cuando otro lo sustituye durante su tiempo de
+    salida. Hasta `max_outliers` frames seguidos con otro gesto se toleran
+    como errores de clasificación sin reiniciar las esperas. Los tiempos se
+    miden con las marcas de tiempo de los frames, de modo que la latencia de
+    activación no depende de los FPS.
+    
+    El valor None (mano sin gesto reconocido o sin mano) también se confirma
+    como estado, pero no genera eventos.
+    """
+    
+    def __init__(self, enter_dwell=config.GESTURE_ENTER_DWELL, exit_dwell=config.GESTURE_EXIT_DWELL,
+                 dwells=None, max_outliers=config.GESTURE_MAX_OUTLIERS):
+        """
+        Args:
+            enter_dwell: Segundos por defecto que debe mantenerse un gesto para activarse
+            exit_dwell: Segundos por defecto que debe faltar un gesto para liberarse
+            dwells: Diccionario gesto -> (entrada, salida) en segundos
+            max_outliers: Frames seguidos discrepantes que se ignoran
+        """
+        self.enter_dwell = enter_dwell
+        self.exit_dwell = exit_dwell
+        self.dwells = dict(config.GESTURE_DWELLS if dwells is None else dwells)
+        self.max_outliers = max_outliers
+        self.reset()
+    
+    def reset(self):
+        """
+        Olvida el gesto activo sin generar eventos.
+        """
+        self.active = None
+        self.confirmed = False
+        self._clear_candidate()
+        self._candidate_since = 0.0
+        self._mismatches = 0
+        self._mismatch_since = 0.0
+    
+    def _clear_candidate(self):
+        # Sin candidato tampoco quedan frames tolerados pendientes
+        self._candidate = _NO_CANDIDATE
+        self._candidate_misses = 0
+        self._miss_since = 0.0
+        self._miss_gesture = _NO_CANDIDATE
+    
+    def get_dwell(self, gesture):
+        """
+        Devuelve los tiempos (entrada, salida) en segundos de un gesto.
+        """
+        return self.dwells.get(gesture, (self.enter_dwell, self.exit_dwell))
+    
+    def update(self, gesture, timestamp):
+        """
+        Incorpora la clasificación de un frame.
+        
+        Args:
+            gesture: Gesto detectado en el frame, o None
+            timestamp: Instante del frame en segundos (time.monotonic())
+            
+        Returns:
+            list: Eventos (tipo, gesto) con tipo 'press', 'hold' o 'release'
+        """
+        events = []
+        if self.confirmed and gesture == self.active:
+            self._clear_candidate()
+            self._mismatches = 0
+            if gesture is not None:
+                events.append(('hold', gesture))
+            return events
+        
+        # Candidato a sustituir al gesto activo, tolerando frames sueltos
+        if gesture == self._candidate:
+            self._candidate_misses = 0
+        elif self._candidate is not _NO_CANDIDATE and self._candidate_misses < self.max_outliers:
+            # Racha de frames tolerados con el mismo gesto
+            if self._candidate_misses == 0 or gesture != self._miss_gesture:
+                self._miss_since = timestamp
+                self._miss_gesture = gesture
+            self._candidate_misses += 1
+        else:
+            # Si el cambio ya venía de los frames tolerados (con este mismo
+            # gesto), contar desde el primero de ellos
+            backdate = self._candidate_misses and gesture == self._miss_gesture
+            since = self._miss_since if backdate else timestamp
+            self._clear_candidate()
+            self._candidate = gesture
+            self._candidate_since = since
+        
+        # Salida del gesto activo
+        if self.confirmed:
+            if self._mismatches == 0:
+                self._mismatch_since = timestamp
+            self._mismatches += 1
+            if (self._mismatches <= self.max_outliers or
+                    timestamp - self._mismatch_since < self.get_dwell(self.active)[1]):
+                if self.active is not None:
+                    events.append(('hold', self.active))
+                return events
+            if self.active is not None:
+                events.append(('release', self.active))
+            self.active = None
+            self.confirmed = False
+            self._mismatches = 0
+        
+        # Entrada del candidato
+        if (gesture == self._candidate and
+                timestamp - self._candidate_since >= self.get_dwell(gesture)[0]):
+            self.active = gesture
+            self.confirmed = True
+            self._clear_candidate()
+            if gesture is not None:
+                events.append(('press', gesture))
+        return events
+
+class HandTracker:
+    """
+    Mantiene el estado de visión entre frames (fondo, estabilidad del gesto,
+    historial de posiciones) y convierte cada frame en un resultado de detección.
+
+    Se usa tanto desde el bucle secuencial de main.py como desde la etapa de
+    visión del modo pipeline.
+    """
+
+    def __init__(self, background, frame_size, screen_size, threshold_map=None):
+        """
+        Args:
+            background: Fondo calibrado
+            frame_size: Tupla (ancho, alto) del frame de la cámara
+            screen_size: Tupla (ancho, alto) de la pantalla
+            threshold_map: Umbral por píxel de la calibración estadística, o None
+        """
+        self.frame_width, self.frame_height = frame_size
+        self.screen_width, self.screen_height = screen_size
+
+        # Definir regiones de la pantalla
+        self.left_region = self.frame_width * config.LEFT_REGION_FACTOR
+        self.right_region = self.frame_width * config.RIGHT_REGION_FACTOR
+
+        # Resolución de procesamiento y umbrales ajustados a ella
+        self._configure_scale(config.PROCESSING_SCALE)
+
+        # Variables para seguimiento y estabilidad de gestos
+        self.prev_area = 0
+        self.cursor_filter = filters.create_filter()
+        self._last_filtered = None
+        self.gesture_state = GestureStateMachine()
+
+        # Buffers reutilizados entre frames
+        self.workspace = utils.FrameWorkspace()
+
+        # Duración en segundos de cada etapa en el último frame procesado
+        self.stage_times = {}
+
+        # Ajustes de calidad que puede rebajar el control de presupuesto
+        # (ver frame_budget): iteraciones morfológicas de menos y cada cuántos
+        # frames se analiza el gesto
+        self.morph_reduction = 0
+        self.gesture_interval = 1
+        self._frame_index = 0
+        self._background_frames = 0
+        self._last_analysis = None
+
+        # Tabla de color de piel (la guardada si existe; si no, la regla inicial)
+        self.skin_model = None
+        if config.SKIN_SEGMENTATION:
+            self.skin_model = skin.SkinModel()
+            self.skin_model.load(config.SKIN_TABLE_PATH)
+
+        # Caché de la clasificación de gestos por firma del contorno
+        self.gesture_cache = gesture_detection.GestureCache() if config.GESTURE_CACHE else None
+
+        # Detector por puntos de referencia (None para la resta de fondo y contornos)
+        self.detector = None
+        if config.DETECTOR_BACKEND == "mediapipe":
+            self.detector = hand_landmarks.create_detector()
+
+        # Fondo, adaptativo si está activado
+        self.bg_model = None
+        self.set_background(background, threshold_map)
+
+    def _configure_scale(self, scale):
+        """
+        Fija la resolución de procesamiento y los umbrales que dependen de ella:
+        las áreas escalan con el cuadrado de la escala y las distancias linealmente.
+        """
+        self.scale = scale
+        self.proc_width = max(1, int(round(self.frame_width * self.scale)))
+        self.proc_height = max(1, int(round(self.frame_height * self.scale)))
+        self.min_area = config.MIN_AREA * self.scale ** 2
+        self.defect_threshold = config.DEFECT_THRESHOLD * self.scale
+        self.blur_size = max(3, int(round(7 * self.scale)) | 1)
+
+        # Identificadores de las manos (la distancia de emparejamiento escala con la resolución)
+        self.blob_tracker = blobs.BlobTracker(max_distance=config.BLOB_MATCH_DISTANCE * self.scale)
+
+        # Ventana de seguimiento (solo en modo ROI)
+        self.roi_tracker = None
+        if config.ROI_TRACKING:
+            self.roi_tracker = RoiTracker(
+                (self.proc_width, self.proc_height),
+                padding=int(config.ROI_PADDING * self.scale),
+                edge_margin=max(1, int(config.ROI_EDGE_MARGIN * self.scale)),
+                max_padding=int(config.ROI_MAX_PADDING * self.scale))
+
+    def set_scale(self, scale):
+        """
+        Cambia la escala de procesamiento sin recalibrar.
+
+        El fondo (el aprendido, si es adaptativo) y el mapa de umbrales se
+        vuelven a reducir desde la resolución de captura.
+        """
+        if scale == self.scale:
+            return
+        background, threshold_map = self._calibrated
+        if self.bg_model is not None:
+            background = cv2.resize(self.bg_model.image, (self.frame_width, self.frame_height),
+                                    interpolation=cv2.INTER_LINEAR)
+        self._configure_scale(scale)
+        self._apply_background(background, threshold_map)
+        self._last_analysis = None
+        if self.gesture_cache is not None:
+            self.gesture_cache.reset()
+        if self.detector is not None:
+            self.detector.reset()
+
+    def set_background(self, background, threshold_map=None):
+        """
+        Reemplaza el fondo calibrado (por ejemplo tras recalibrar).
+
+        El fondo y el mapa de umbrales se reciben a la resolución de captura y
+        se reducen a la de procesamiento si hace falta. Con mapa de umbrales
+        la limpieza morfológica usa STAT_MORPH_ITERATIONS iteraciones.
+        """
+        self._calibrated = (background, threshold_map)
+        self._apply_background(background, threshold_map)
+
+    def _apply_background(self, background, threshold_map):
+        """
+        Prepara el fondo y el mapa de umbrales a la resolución de procesamiento actual.
+        """
+        if self.scale != 1.0:
+            background = cv2.resize(background, (self.proc_width, self.proc_height),
+                                    interpolation=cv2.INTER_AREA)
+            if threshold_map is not None:
+                threshold_map = cv2.resize(threshold_map, (self.proc_width, self.proc_height),
+                                           interpolation=cv2.INTER_AREA)
+        self.threshold_map = threshold_map
+        self.morph_iterations = (config.STAT_MORPH_ITERATIONS if threshold_map is not None
+                                 else config.MORPH_ITERATIONS)
+        if self.skin_model is not None:
+            self.morph_iterations = min(self.morph_iterations, config.SKIN_MORPH_ITERATIONS)
+        if config.ADAPTIVE_BACKGROUND:
+            if self.bg_model is None:
+                self.bg_model = calibration.BackgroundModel(background)
+            else:
+                self.bg_model.reset(background)
+            # La imagen del modelo se actualiza en el sitio en cada frame
+            background = self.bg_model.image
+        self.background = background
+        if self.roi_tracker is not None:
+            self.roi_tracker.reset()
+
+    def get_region(self, cx):
+        """
+        Devuelve la región ('left', 'right', 'center') de una coordenada x.
+        """
+        if cx < self.left_region:
+            return 'left'
+        elif cx > self.right_region:
+            return 'right'
+        return 'center'
+
+    def map_to_screen(self, cx, cy):
+        """
+        Mapea coordenadas de la cámara a coordenadas de pantalla.
+        """
+        screen_x = int(np.interp(cx, [0, self.frame_width],
+                                 [config.SCREEN_MARGIN, self.screen_width - config.SCREEN_MARGIN]))
+        screen_y = int(np.interp(cy, [0, self.frame_height],
+                                 [config.SCREEN_MARGIN, self.screen_height - config.SCREEN_MARGIN]))
+        return screen_x, screen_y
+
+    def _find_hands(self, thresh, roi=None):
+        """
+        Busca las MAX_HANDS manchas más grandes que superen el área mínima.
+        
+        Con BLOB_ANALYSIS se usan componentes conexas (ver blobs.find_blobs);
+        si no, se trazan todos los contornos y se ordenan por área.
+        
+        Args:
+            thresh: Imagen binaria (de la ventana si hay roi)
+            roi: Ventana (x, y, ancho, alto) de thresh dentro del frame
+            
+        Returns:
+            list: Manchas de mayor a menor área con 'contour', 'area', 'bbox' y
+                'centroid' en coordenadas del frame (vacía sin mano)
+        """
+        offset = (roi[0], roi[1]) if roi is not None else (0, 0)
+        if config.BLOB_ANALYSIS:
+            return blobs.find_blobs(thresh, self.min_area, config.MAX_HANDS, offset)
+
+        contours, _ = cv2.findContours(thresh, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE,
+                                       offset=offset)
+        hands = []
+        for contour in sorted(contours, key=cv2.contourArea, reverse=True)[:config.MAX_HANDS]:
+            area = cv2.contourArea(contour)
+            # Procesar solo si el contorno supera el área mínima
+            if area <= self.min_area:
+                break
+            x, y, w, h = cv2.boundingRect(contour)
+            hands.append({'contour': contour, 'area': area, 'bbox': (x, y, w, h),
+                          'centroid': (x + w / 2.0, y + h / 2.0)})
+        return hands
+
+    def _segment(self, frame, roi):
+        """
+        Extrae la silueta y busca la mano, acumulando el tiempo de cada etapa.
+
+        Returns:
+            tuple: (thresh, manchas encontradas por _find_hands)
+        """
+        start = time.perf_counter()
+        thresh, _ = utils.process_frame(frame, self.background, roi,
+                                        copy_display=False, workspace=self.workspace,
+                                        blur_size=self.blur_size,
+                                        threshold_map=self.threshold_map,
+                                        morph_iterations=max(0, self.morph_iterations -
+                                                             self.morph_reduction),
+                                        skin_model=self.skin_model,
+                                        threshold=config.FOREGROUND_THRESHOLD)
+        middle = time.perf_counter()
+        hands = self._find_hands(thresh, roi)
+        end = time.perf_counter()
+
+        times = self.stage_times
+        times['process_frame'] = times.get('process_frame', 0.0) + middle - start
+        times['find_contours'] = times.get('find_contours', 0.0) + end - middle
+        return thresh, hands
+
+    def _update_background(self, frame, thresh, roi):
+        """
+        Actualiza el fondo adaptativo con la segmentación que se conservó del frame.
+
+        Se llama una sola vez por frame, tras descartar la pasada en la
+        ventana si hubo que buscar la mano en todo el frame. Con ventana, el
+        resto del frame se pone al día cada BACKGROUND_FULL_UPDATE_INTERVAL frames.
+        """
+        start = time.perf_counter()
+        # Gris desenfocado de la última pasada, que process_frame deja en el workspace
+        self.bg_model.update(self.workspace.get('blur', thresh.shape), thresh, roi)
+        if roi is not None:
+            self._background_frames += 1
+            interval = config.BACKGROUND_FULL_UPDATE_INTERVAL
+            if self._background_frames % interval == 0:
+                shape = frame.shape[:2]
+                gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY,
+                                    dst=self.workspace.get('background_gray', shape))
+                blurred = cv2.GaussianBlur(gray, (self.blur_size, self.blur_size), 0,
+                                           dst=self.workspace.get('background_blur', shape))
+                self.bg_model.update_outside(blurred, roi, interval)
+        times = self.stage_times
+        times['process_frame'] = times.get('process_frame', 0.0) + time.perf_counter() - start
+
+    def _downscale(self, frame):
+        """
+        Reduce el frame a la resolución de procesamiento.
+        """
+        if self.scale == 1.0:
+            return frame
+        start = time.perf_counter()
+        small = cv2.resize(frame, (self.proc_width, self.proc_height),
+                           dst=self.workspace.get('resize', (self.proc_height, self.proc_width, 3)),
+                           interpolation=cv2.INTER_AREA)
+        self.stage_times['resize'] = time.perf_counter() - start
+        return small
+
+    def _detect_contour(self, small):
+        """
+        Detección por resta de fondo y defectos de convexidad.
+
+        Returns:
+            dict: Claves 'thresh', 'roi', 'contour', 'features', 'landmarks',
+                'center', 'area' y 'hands' (en la resolución de procesamiento,
+                'center' None sin mano) y 'gesture'
+        """
+        roi = self.roi_tracker.roi if self.roi_tracker is not None else None
+        thresh, hands = self._segment(small, roi)
+
+        # Mano perdida dentro de la ventana: buscar de nuevo en todo el frame
+        if not hands and roi is not None:
+            self.roi_tracker.reset()
+            roi = None
+            thresh, hands = self._segment(small, roi)
+
+        if self.bg_model is not None:
+            self._update_background(small, thresh, roi)
+
+        # Identificadores estables; la mano más antigua es la que controla el cursor
+        hands = self.blob_tracker.update(hands)
+
+        if self.roi_tracker is not None:
+            # Con dos manos la ventana cubre a ambas
+            bbox = None
+            if hands:
+                x0 = min(hand['bbox'][0] for hand in hands)
+                y0 = min(hand['bbox'][1] for hand in hands)
+                x1 = max(hand['bbox'][0] + hand['bbox'][2] for hand in hands)
+                y1 = max(hand['bbox'][1] + hand['bbox'][3] for hand in hands)
+                bbox = (x0, y0, x1 - x0, y1 - y0)
+            self.roi_tracker.update(bbox)
+
+        max_contour = hands[0]['contour'] if hands else None
+        detection = {'thresh': thresh, 'roi': roi, 'contour': max_contour, 'features': None,
+                     'landmarks': None, 'center': None,
+                     'area': hands[0]['area'] if hands else 0, 'gesture': None,
+                     'hands': hands}
+
+        # Gesto de las demás manos, para gestos a dos manos
+        for hand in hands[1:]:
+            hand['gesture'], _ = gesture_detection.analyze_gesture(hand['contour'],
+                                                                   self.defect_threshold)
+
+        M = cv2.moments(max_contour) if max_contour is not None else None
+        if M is None or M["m00"] == 0:
+            return detection
+        detection['center'] = (M["m10"] / M["m00"], M["m01"] / M["m00"])
+
+        # Con el presupuesto de frame agotado, el gesto solo se analiza cada
+        # gesture_interval frames; entre medias se desplaza el anterior
+        self._frame_index += 1
+        if self.gesture_interval > 1 and self._last_analysis is not None and \
+                self._frame_index % self.gesture_interval:
+            gesture, features, (prev_x, prev_y) = self._last_analysis
+            detection['gesture'] = gesture
+            detection['features'] = gesture_detection.translate_features(
+                features, int(round(detection['center'][0] - prev_x)),
+                int(round(detection['center'][1] - prev_y)))
+            return detection
+
+        # Detectar gestos (reutilizando la clasificación si la forma no cambió)
+        start = time.perf_counter()
+        if self.gesture_cache is not None:
+            detection['gesture'], detection['features'] = self.gesture_cache.analyze(
+                max_contour, M, self.defect_threshold)
+        else:
+            detection['gesture'], detection['features'] = gesture_detection.analyze_gesture(
+                max_contour, self.defect_threshold)
+        self.stage_times['detect_gestures'] = time.perf_counter() - start
+        self._last_analysis = (detection['gesture'], detection['features'], detection['center'])
+        return detection
+
+    def _detect_landmarks(self, small, timestamp):
+        """
+        Detección por puntos de referencia (MediaPipe), con el mismo formato
+        que _detect_contour.
+        """
+        landmarks = self.detector.detect(small, timestamp)
+        # Costo propio del backend, separado según haya corrido el modelo o el seguimiento
+        self.stage_times[f'landmarks_{self.detector.last_mode}'] = self.detector.last_cost
+        detection = {'thresh': None, 'roi': None, 'contour': None, 'features': None,
+                     'landmarks': None, 'center': None, 'area': 0, 'gesture': None,
+                     'hands': []}
+        if landmarks is not None:
+            detection.update(landmarks)
+            detection['hands'] = [{'id': 0, 'contour': landmarks['contour'],
+                                   'centroid': landmarks['center'], 'area': landmarks['area']}]
+        return detection
+
+    def process(self, frame, timestamp=None):
+        """
+        Procesa un frame ya volteado y detecta la mano y su gesto.
+
+        No dibuja nada: el resultado sirve de instantánea para dibujar después
+        (ver utils.render_views), sobre el propio frame y sin copias.
+
+        Con PROCESSING_SCALE distinta de 1, 'thresh', 'roi', 'contour',
+        'features' y 'landmarks' quedan en la resolución de procesamiento (ver
+        'scale'), mientras que 'area' y 'position' se devuelven en unidades del
+        frame. Con el detector de MediaPipe no hay 'thresh', 'roi' ni
+        'features' (None) y 'contour' es la envolvente de los puntos.
+
+        'hands' lista las manos seguidas (hasta MAX_HANDS), la que controla el
+        cursor primero, cada una con 'id' estable entre frames, 'contour',
+        'position', 'area' y 'gesture'.
+
+        Args:
+            frame: Frame capturado
+            timestamp: Instante de captura (time.monotonic()), o None para ahora
+
+        Returns:
+            dict: Resultado con las claves 'frame', 'timestamp', 'scale', 'thresh', 'roi',
+                'contour', 'features', 'landmarks', 'hands', 'area', 'position', 'gesture',
+                'active_gesture', 'events', 'stable', 'region', 'screen_position'
+                y 'prev_area'
+        """
+        self.stage_times = {}
+        if timestamp is None:
+            timestamp = time.monotonic()
+        small = self._downscale(frame)
+        if self.detector is not None:
+            detection = self._detect_landmarks(small, timestamp)
+        else:
+            detection = self._detect_contour(small)
+
+        result = {
+            'frame': frame,
+            'timestamp': timestamp,
+            'scale': self.scale,
+            'thresh': detection['thresh'],
+            'roi': detection['roi'],
+            'contour': None,
+            'features': None,
+            'landmarks': None,
+            'hands': [],
+            'area': 0,
+            'position': None,
+            'gesture': None,
+            'active_gesture': None,
+            'events': [],
+            'stable': False,
+            'region': None,
+            'screen_position': None,
+            'prev_area': None,
+        }
+        # Sin mano: el gesto activo se libera tras su tiempo de salida y, con
+        # él, el filtro del cursor olvida la velocidad para no arrastrarla al
+        # volver; una detección perdida suelta no lo reinicia
+        if detection['center'] is None:
+            events = result['events'] = self.gesture_state.update(None, timestamp)
+            if (not self.gesture_state.confirmed or
+                    any(kind == 'release' for kind, _ in events)):
+                self._reset_cursor_filter()
+            return result
+
+        # Centro de la mano, en coordenadas del frame y con decimales
+        center_x = detection['center'][0] / self.scale
+        center_y = detection['center'][1] / self.scale
+        cx, cy = int(center_x), int(center_y)
+        area = detection['area'] / self.scale ** 2
+        current_gesture = detection['gesture']
+
+        # Estabilizar gestos
+        events = self.gesture_state.update(current_gesture, timestamp)
+
+        # Manos seguidas en coordenadas del frame (el contorno queda a la resolución de procesamiento)
+        hands = [{
+            'id': hand['id'],
+            'contour': hand['contour'],
+            'position': (int(hand['centroid'][0] / self.scale),
+                         int(hand['centroid'][1] / self.scale)),
+            'area': hand['area'] / self.scale ** 2,
+            'gesture': hand.get('gesture'),
+        } for hand in detection['hands']]
+        if hands:
+            hands[0]['position'] = (cx, cy)
+            hands[0]['gesture'] = current_gesture
+
+        result.update({
+            'contour': detection['contour'],
+            'features': detection['features'],
+            'landmarks': detection['landmarks'],
+            'hands': hands,
+            'area': area,
+            'position': (cx, cy),
+            'gesture': current_gesture,
+            'active_gesture': self.gesture_state.active,
+            'events': events,
+            'region': self.get_region(cx),
+        })
+
+        # Aplicar gestos solo si son estables
+        if self.gesture_state.confirmed:
+            screen_x, screen_y = self.map_to_screen(center_x, center_y)
+            start = time.perf_counter()
+            result['stable'] = True
+            # Tras un hueco largo sin posiciones la velocidad estimada ya no vale
+            if (self._last_filtered is not None and
+                    timestamp - self._last_filtered > config.CURSOR_FILTER_RESET_GAP):
+                self.cursor_filter.reset()
+            self._last_filtered = timestamp
+            result['screen_position'] = self.cursor_filter((screen_x, screen_y), timestamp)
+            self.stage_times['smooth_movement'] = time.perf_counter() - start
+            result['prev_area'] = self.prev_area
+            self.prev_area = area
+        else:
+            self._reset_cursor_filter()
+
+        return result
+
+    def _reset_cursor_filter(self):
+        """
+        Reinicia el filtro del cursor al soltarse el gesto.
+        """
+        self.cursor_filter.reset()
+        self._last_filtered = None
\ No newline at end of file
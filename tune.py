@@ -0,0 +1,334 @@
+"""
+Ajuste automático de umbrales sobre sesiones grabadas y etiquetadas.
+
+Reproduce clips etiquetados por el mismo camino de segmentación y detección
+de gestos que el programa (process_frame -> contorno más grande ->
+analyze_contour -> classify_gesture -> GestureStateMachine) para cada
+combinación de parámetros de una rejilla o de una búsqueda aleatoria, y se
+queda con la de mayor precisión (a igual precisión, la de menos iteraciones
+morfológicas, que es lo que más pesa en el coste por frame).
+
+Las combinaciones se agrupan por sus parámetros de segmentación: cada grupo
+segmenta los clips una sola vez y evalúa con esa segmentación en caché todas
+las combinaciones que solo difieren después (área mínima, defectos,
+proporción y confirmación). Los grupos se reparten entre varios procesos.
+
+Cada clip es un video, una carpeta o un patrón de imágenes cuyos primeros
+CALIBRATION_FRAMES frames muestran solo el fondo, con un CSV de etiquetas:
+
+    inicio,fin,gesto
+    0,89,ninguno
+    90,150,hand_open
+
+donde inicio y fin (incluido) cuentan los frames tras la calibración y el
+gesto es uno de GESTURES o "ninguno". Los frames sin etiqueta no puntúan.
+
+Uso:
+    python tune.py --clip sesion.avi sesion.csv
+    python tune.py --clip sesion.avi sesion.csv --clip otra.avi otra.csv --random 500 --workers 4
+"""
+import argparse
+import csv
+import itertools
+import json
+import multiprocessing
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import cv2
+import numpy as np
+
+import calibration
+import config
+import frame_source
+import gesture_detection
+import tracker
+import utils
+
+# Valores a probar de cada parámetro de config
+SEARCH_SPACE = {
+    "FOREGROUND_THRESHOLD": (15, 20, 25, 30, 40),
+    "MORPH_ITERATIONS": (1, 2, 3),
+    "MIN_AREA": (500, 1000, 2000, 4000),
+    "DEFECT_THRESHOLD": (8000, 10000, 12000, 15000, 20000),
+    "HAND_RATIO_THRESHOLD": (1.3, 1.5, 1.7, 2.0),
+    "GESTURE_ENTER_DWELL": (0.05, 0.1, 0.15, 0.25),
+    "GESTURE_MAX_OUTLIERS": (0, 1, 2),
+}
+
+# Parámetros que cambian la segmentación (el resto se evalúa sobre la segmentación en caché)
+SEGMENTATION_PARAMS = ("FOREGROUND_THRESHOLD", "MORPH_ITERATIONS")
+
+# Gestos válidos en las etiquetas ("ninguno" = sin gesto)
+GESTURES = ("hand_open", "hand_closed", "pinch", "rotate")
+NO_GESTURE = "ninguno"
+
+def load_labels(path):
+    """
+    Lee un CSV de etiquetas por tramos.
+
+    Returns:
+        dict: Índice de frame (tras la calibración) -> gesto esperado o None
+    """
+    labels = {}
+    with open(path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            gesture = row["gesto"].strip()
+            if gesture == NO_GESTURE or not gesture:
+                gesture = None
+            elif gesture not in GESTURES:
+                raise ValueError(f"{path}: gesto desconocido '{gesture}'")
+            for index in range(int(row["inicio"]), int(row["fin"]) + 1):
+                labels[index] = gesture
+    return labels
+
+def grid_search(space=SEARCH_SPACE):
+    """
+    Todas las combinaciones de la rejilla.
+
+    Returns:
+        list: Diccionarios parámetro -> valor
+    """
+    names = list(space)
+    return [dict(zip(names, values)) for values in itertools.product(*space.values())]
+
+def random_search(count, space=SEARCH_SPACE, seed=0):
+    """
+    Combinaciones distintas elegidas al azar de la rejilla.
+    """
+    grid = grid_search(space)
+    return random.Random(seed).sample(grid, min(count, len(grid)))
+
+def group_by_segmentation(candidates):
+    """
+    Agrupa las combinaciones que comparten los parámetros de segmentación.
+
+    Returns:
+        dict: Tupla de valores de SEGMENTATION_PARAMS -> lista de combinaciones
+    """
+    groups = {}
+    for params in candidates:
+        key = tuple(params[name] for name in SEGMENTATION_PARAMS)
+        groups.setdefault(key, []).append(params)
+    return groups
+
+def segment_clip(path, threshold, morph_iterations):
+    """
+    Calibra el fondo de un clip y extrae el contorno más grande de cada frame.
+
+    Returns:
+        tuple: (contornos (o None) con su área por frame tras la calibración,
+            instantes de los frames en segundos, segundos de segmentación por frame)
+    """
+    source = frame_source.open_source(path)
+    if not source.isOpened():
+        raise ValueError(f"No se pudo abrir {path}")
+    try:
+        background = calibration.calibrate_background(source, show=False)
+        frame_period = 1.0 / (source.get(cv2.CAP_PROP_FPS) or 30.0)
+        workspace = utils.FrameWorkspace()
+        hands = []
+        elapsed = 0.0
+        while True:
+            ret, frame = source.read()
+            if not ret or frame is None:
+                break
+            start = time.perf_counter()
+            # El fondo calibrado está volteado, como los frames del programa
+            frame = cv2.flip(frame, 1, dst=workspace.get('flip', frame.shape))
+            thresh, _ = utils.process_frame(frame, background, copy_display=False,
+                                            workspace=workspace,
+                                            morph_iterations=morph_iterations,
+                                            threshold=threshold)
+            contours, _ = cv2.findContours(thresh, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+            hand = None
+            if contours:
+                areas = [cv2.contourArea(contour) for contour in contours]
+                largest = int(np.argmax(areas))
+                hand = (contours[largest], areas[largest])
+            elapsed += time.perf_counter() - start
+            hands.append(hand)
+    finally:
+        source.release()
+    timestamps = [i * frame_period for i in range(len(hands))]
+    return hands, timestamps, elapsed / max(1, len(hands))
+
+def _score(timestamps, labels, features, params):
+    """
+    Clasifica y confirma los gestos de un clip con unos parámetros.
+
+    Returns:
+        tuple: (aciertos del gesto confirmado, aciertos del gesto crudo,
+            frames etiquetados, segundos de clasificación y confirmación)
+    """
+    exit_dwell = config.GESTURE_EXIT_DWELL
+    state = tracker.GestureStateMachine(
+        params["GESTURE_ENTER_DWELL"], exit_dwell,
+        {gesture: (params["GESTURE_ENTER_DWELL"], exit_dwell) for gesture in GESTURES},
+        params["GESTURE_MAX_OUTLIERS"])
+    ratio_threshold = params["HAND_RATIO_THRESHOLD"]
+    correct = raw_correct = labeled = 0
+    start = time.perf_counter()
+    for index, (timestamp, frame_features) in enumerate(zip(timestamps, features)):
+        gesture = (gesture_detection.classify_gesture(frame_features, ratio_threshold)
+                   if frame_features is not None else None)
+        state.update(gesture, timestamp)
+        if index in labels:
+            expected = labels[index]
+            labeled += 1
+            raw_correct += gesture == expected
+            correct += (state.active if state.confirmed else None) == expected
+    return correct, raw_correct, labeled, time.perf_counter() - start
+
+def evaluate_group(clips, segmentation, candidates):
+    """
+    Segmenta los clips una vez y evalúa todas las combinaciones del grupo.
+
+    Se ejecuta en un proceso del pool.
+
+    Args:
+        clips: Lista de (ruta del clip, etiquetas)
+        segmentation: Valores de SEGMENTATION_PARAMS del grupo
+        candidates: Combinaciones que comparten esa segmentación
+
+    Returns:
+        list: Un resultado por combinación con 'params', 'accuracy',
+            'raw_accuracy', 'frames' y 'ms_per_frame'
+    """
+    settings = dict(zip(SEGMENTATION_PARAMS, segmentation))
+    segmented = [(segment_clip(path, settings["FOREGROUND_THRESHOLD"],
+                               settings["MORPH_ITERATIONS"]), labels)
+                 for path, labels in clips]
+
+    # Las características solo dependen del área mínima y del umbral de defectos
+    analyzed = {}
+    results = []
+    for params in candidates:
+        key = (params["MIN_AREA"], params["DEFECT_THRESHOLD"])
+        if key not in analyzed:
+            analyzed[key] = []
+            for (hands, _, _), _ in segmented:
+                start = time.perf_counter()
+                features = [gesture_detection.analyze_contour(hand[0], key[1])
+                            if hand is not None and hand[1] > key[0] else None
+                            for hand in hands]
+                analyzed[key].append((features, (time.perf_counter() - start) / max(1, len(hands))))
+
+        correct = raw_correct = labeled = frames = 0
+        cost = 0.0
+        for ((hands, timestamps, segment_time), labels), (features, analyze_time) in \
+                zip(segmented, analyzed[key]):
+            c, r, n, classify_time = _score(timestamps, labels, features, params)
+            correct += c
+            raw_correct += r
+            labeled += n
+            frames += len(hands)
+            cost += (segment_time + analyze_time) * len(hands) + classify_time
+        results.append({
+            "params": params,
+            "accuracy": correct / labeled if labeled else 0.0,
+            "raw_accuracy": raw_correct / labeled if labeled else 0.0,
+            "frames": frames,
+            "ms_per_frame": 1000.0 * cost / max(1, frames),
+        })
+    return results
+
+def tune(clips, candidates, workers=None):
+    """
+    Evalúa las combinaciones repartiendo los grupos de segmentación entre procesos.
+
+    Args:
+        clips: Lista de (ruta del clip, etiquetas)
+        candidates: Combinaciones a evaluar
+        workers: Procesos del pool, o None para uno por núcleo
+
+    Returns:
+        list: Resultados ordenados con _rank (de mejor a peor)
+    """
+    groups = group_by_segmentation(candidates)
+    print(f"{len(candidates)} combinaciones en {len(groups)} grupos de segmentación")
+    results = []
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        futures = {pool.submit(evaluate_group, clips, key, group): key
+                   for key, group in groups.items()}
+        for done, future in enumerate(as_completed(futures), 1):
+            group_results = future.result()
+            results.extend(group_results)
+            best = max(group_results, key=lambda result: result["accuracy"])
+            print(f"[{done}/{len(groups)}] "
+                  + ", ".join(f"{name}={value}" for name, value in
+                              zip(SEGMENTATION_PARAMS, futures[future]))
+                  + f": mejor precisión {100.0 * best['accuracy']:.1f}%")
+    results.sort(key=_rank)
+    return results
+
+def _rank(result):
+    """
+    Clave de orden de un resultado: mayor precisión primero.
+
+    A igual precisión decide un coste determinista (las iteraciones
+    morfológicas) en lugar de ms_per_frame, que es ruido de medida entre
+    procesos, y después los propios parámetros, para que el ganador no
+    dependa del orden en que terminan los grupos.
+    """
+    params = result["params"]
+    return (-round(result["accuracy"], 4), params["MORPH_ITERATIONS"], sorted(params.items()))
+
+def config_lines(params):
+    """
+    Líneas de config.py con los valores de una combinación.
+    """
+    lines = [f"{name} = {value}" for name, value in params.items()]
+    dwells = {gesture: (params["GESTURE_ENTER_DWELL"], config.GESTURE_DWELLS.get(
+        gesture, (config.GESTURE_ENTER_DWELL, config.GESTURE_EXIT_DWELL))[1])
+        for gesture in GESTURES}
+    lines.append(f"GESTURE_DWELLS = {dwells}")
+    return lines
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Ajusta los umbrales de Hand Mouse con clips etiquetados.")
+    parser.add_argument("--clip", nargs=2, action="append", required=True,
+                        metavar=("CLIP", "ETIQUETAS"),
+                        help="Video, carpeta o patrón de imágenes y su CSV de etiquetas; se puede repetir")
+    parser.add_argument("--random", type=int, default=None,
+                        help="Evaluar este número de combinaciones al azar en lugar de toda la rejilla")
+    parser.add_argument("--seed", type=int, default=0, help="Semilla de la búsqueda aleatoria")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Procesos del pool (por defecto uno por núcleo)")
+    parser.add_argument("--top", type=int, default=10, help="Mejores combinaciones a mostrar")
+    parser.add_argument("--output", default="umbrales_ajustados.json",
+                        help="Archivo JSON donde guardar la mejor configuración")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    clips = [(path, load_labels(labels_path)) for path, labels_path in args.clip]
+    candidates = (random_search(args.random, seed=args.seed) if args.random
+                  else grid_search())
+
+    start = time.perf_counter()
+    results = tune(clips, candidates, args.workers)
+    print(f"\nEvaluadas {len(results)} combinaciones en {time.perf_counter() - start:.1f} s")
+
+    print(f"{'precisión':>10}{'cruda':>8}{'ms/frame':>10}  parámetros")
+    for result in results[:args.top]:
+        print(f"{100.0 * result['accuracy']:>9.1f}%{100.0 * result['raw_accuracy']:>7.1f}%"
+              f"{result['ms_per_frame']:>10.3f}  "
+              + ", ".join(f"{name}={value}" for name, value in result["params"].items()))
+
+    best = results[0]
+    lines = config_lines(best["params"])
+    print("\nMejor configuración (para config.py):")
+    for line in lines:
+        print(f"    {line}")
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump({"best": best, "config": lines, "clips": [path for path, _ in args.clip],
+                   "top": results[:args.top]}, f, indent=2)
+    print(f"Resultados guardados en {args.output}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
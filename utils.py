@@ -2,9 +2,110 @@
 Utilidades varias para el programa de control por gestos.
 """
 import cv2
+import importlib
 import numpy as np
 import sys
 import signal
+import threading
+import time
+import gesture_detection
+import metrics
+try:
+    from importlib import metadata
+except ImportError:  # Python < 3.8
+    metadata = None
+from config import DISPLAY_MODE, PREVIEW_RATE_HZ, FOREGROUND_THRESHOLD, MORPH_ITERATIONS
+
+# Elemento estructurante de las operaciones morfológicas, creado una sola vez
+MORPH_KERNEL = np.ones((5, 5), np.uint8)
+
+# Tabla de latencias del panel de control: primera fila y alto de cada fila
+STAGE_TABLE_TOP = 193
+STAGE_ROW_HEIGHT = 13
+
+class LazyModule:
+    """
+    Módulo que se importa la primera vez que se usa uno de sus atributos.
+    
+    Permite diferir la importación de módulos pesados (como pyautogui) fuera
+    del arranque, o adelantarla en segundo plano con preload() mientras se
+    abre la cámara y se calibra.
+    """
+    
+    def __init__(self, name):
+        """
+        Args:
+            name: Nombre del módulo a importar
+        """
+        self._name = name
+        self._module = None
+        self._lock = threading.Lock()
+    
+    def load(self):
+        """
+        Importa el módulo si hace falta y lo devuelve.
+        """
+        if self._module is None:
+            with self._lock:
+                if self._module is None:
+                    self._module = importlib.import_module(self._name)
+        return self._module
+    
+    def preload(self):
+        """
+        Empieza a importar el módulo en un hilo en segundo plano.
+        """
+        thread = threading.Thread(target=self.load, name=f"importar-{self._name}", daemon=True)
+        thread.start()
+        return thread
+    
+    def __getattr__(self, attr):
+        return getattr(self.load(), attr)
+
+class FrameWorkspace:
+    """
+    Buffers reutilizables para procesar frames sin reservar memoria en cada uno.
+    
+    Cada buffer se reserva la primera vez que se pide y después se reutiliza;
+    los tamaños más pequeños (por ejemplo una ventana ROI) reciben una vista de
+    su esquina superior izquierda. Solo se vuelve a reservar si se pide un
+    tamaño mayor que el del buffer existente.
+    
+    El contenido de un buffer es válido hasta el siguiente frame procesado.
+    """
+    
+    def __init__(self):
+        self._buffers = {}
+    
+    def get(self, name, shape, dtype=np.uint8):
+        """
+        Devuelve un buffer con la forma pedida.
+        
+        Args:
+            name: Nombre de la etapa que usa el buffer
+            shape: Forma (alto, ancho) o (alto, ancho, canales)
+            dtype: Tipo de dato del buffer
+            
+        Returns:
+            numpy.ndarray: Buffer (o vista) de la forma pedida
+        """
+        height, width = shape[:2]
+        channels = tuple(shape[2:])
+        buffer = self._buffers.get(name)
+        if (buffer is None or buffer.dtype != dtype or buffer.shape[2:] != channels
+                or buffer.shape[0] < height or buffer.shape[1] < width):
+            # Crecer sin perder el tamaño que ya tenía el buffer
+            if buffer is not None and buffer.dtype == dtype and buffer.shape[2:] == channels:
+                height = max(height, buffer.shape[0])
+                width = max(width, buffer.shape[1])
+            buffer = self._buffers[name] = np.empty((height, width) + channels, dtype)
+        return buffer[:shape[0], :shape[1]]
+
+def _buffer(workspace, name, shape):
+    """
+    Devuelve el buffer de una etapa, o None (OpenCV reservará uno nuevo) sin workspace.
+    """
+    return workspace.get(name, shape) if workspace is not None else None
 
 def signal_handler(sig, frame):
     """
@@ -19,47 +120,112 @@ def setup_exit_handler():
     """
     signal.signal(signal.SIGINT, signal_handler)
 
-def process_frame(frame, background):
+def process_frame(frame, background, roi=None, bg_model=None, copy_display=True, workspace=None,
+                  blur_size=7, threshold_map=None, morph_iterations=MORPH_ITERATIONS, skin_model=None,
+                  threshold=FOREGROUND_THRESHOLD):
     """
     Procesa el frame para extraer la silueta de la mano.
     
     Args:
         frame: Frame capturado
         background: Fondo calibrado
+        roi: Ventana (x, y, ancho, alto) a procesar, o None para todo el frame
+        bg_model: BackgroundModel a actualizar con este frame, o None
+        copy_display: Si es False no se copia el frame para visualización
+        workspace: FrameWorkspace con los buffers a reutilizar, o None
+        blur_size: Tamaño (impar) del kernel del desenfoque gaussiano
+        threshold_map: Umbral por píxel (uint8 del tamaño del fondo), o None
+            para el umbral global
+        morph_iterations: Iteraciones del cierre y la apertura (0 para omitirlos)
+        skin_model: SkinModel cuya máscara de piel se combina con la de
+            movimiento, o None
+        threshold: Diferencia mínima con el fondo del umbral global
         
     Returns:
-        thresh: Imagen binaria con la silueta
-        display_frame: Frame para visualización
+        thresh: Imagen binaria con la silueta (del tamaño de la ventana si hay roi;
+            con workspace, válida hasta el siguiente frame)
+        display_frame: Copia del frame completo para visualización, o None
     """
-    display_frame = frame.copy()
+    display_frame = frame.copy() if copy_display else None
+    
+    # Recortar a la ventana de seguimiento
+    if roi is not None:
+        x, y, w, h = roi
+        frame = frame[y:y + h, x:x + w]
+        background = background[y:y + h, x:x + w]
+        if threshold_map is not None:
+            threshold_map = threshold_map[y:y + h, x:x + w]
+    
+    shape = frame.shape[:2]
     
     # Convertir a escala de grises y aplicar blur
-    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-    gray = cv2.GaussianBlur(gray, (7, 7), 0)
+    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY, dst=_buffer(workspace, 'gray', shape))
+    blurred = cv2.GaussianBlur(gray, (blur_size, blur_size), 0, dst=_buffer(workspace, 'blur', shape))
     
     # Restar el fondo para obtener el primer plano
-    fg = cv2.absdiff(background, gray)
+    fg = cv2.absdiff(background, blurred, dst=_buffer(workspace, 'fg', shape))
     
-    # Binarizar la imagen
-    _, thresh = cv2.threshold(fg, 25, 255, cv2.THRESH_BINARY)
+    # Binarizar la imagen, con un umbral por píxel si hay mapa de umbrales
+    if threshold_map is not None:
+        thresh = cv2.compare(fg, threshold_map, cv2.CMP_GT,
+                             dst=_buffer(workspace, 'thresh', shape))
+    else:
+        _, thresh = cv2.threshold(fg, threshold, 255, cv2.THRESH_BINARY,
+                                  dst=_buffer(workspace, 'thresh', shape))
     
-    # Operaciones morfológicas para limpiar la imagen
-    kernel = np.ones((5, 5), np.uint8)
-    thresh = cv2.morphologyEx(thresh, cv2.MORPH_CLOSE, kernel, iterations=2)
-    thresh = cv2.morphologyEx(thresh, cv2.MORPH_OPEN, kernel, iterations=2)
+    # Quedarse solo con lo que se mueve y además tiene color de piel
+    if skin_model is not None:
+        thresh = cv2.bitwise_and(thresh, skin_model.mask(frame, workspace), dst=thresh)
+    
+    # Operaciones morfológicas para limpiar la imagen: cierre y apertura
+    # (equivalentes a morphologyEx) alternando entre dos buffers
+    if morph_iterations > 0:
+        morph = cv2.dilate(thresh, MORPH_KERNEL, dst=_buffer(workspace, 'morph', shape),
+                           iterations=morph_iterations)
+        thresh = cv2.erode(morph, MORPH_KERNEL, dst=thresh, iterations=morph_iterations)
+        morph = cv2.erode(thresh, MORPH_KERNEL, dst=morph, iterations=morph_iterations)
+        thresh = cv2.dilate(morph, MORPH_KERNEL, dst=thresh, iterations=morph_iterations)
+    
+    # Adaptar el fondo a los cambios lentos de iluminación
+    if bg_model is not None:
+        bg_model.update(blurred, thresh, roi)
     
     return thresh, display_frame
 
+def place_in_frame(mask, roi, frame_shape):
+    """
+    Coloca una máscara recortada a una ventana en una imagen del tamaño del frame.
+    
+    Args:
+        mask: Imagen binaria de la ventana
+        roi: Ventana (x, y, ancho, alto), o None si la máscara ya es completa
+        frame_shape: Forma (alto, ancho) del frame completo
+        
+    Returns:
+        full_mask: Imagen binaria del tamaño del frame
+    """
+    if roi is None:
+        return mask
+    x, y, w, h = roi
+    full_mask = np.zeros(frame_shape[:2], np.uint8)
+    full_mask[y:y + h, x:x + w] = mask
+    return full_mask
+
 def create_control_panel():
     """
     Crea un panel de control para mostrar información.
     
+    El alto deja una fila de latencias por cada etapa de metrics.STAGES y
+    una más para avisar de las etapas que no quepan.
+    
     Returns:
         control_area: Imagen negra para mostrar información
     """
-    return np.zeros((300, 400, 3), np.uint8)
+    height = STAGE_TABLE_TOP + len(metrics.STAGES) * STAGE_ROW_HEIGHT + 4
+    return np.zeros((max(300, height), 400, 3), np.uint8)
 
-def update_control_panel(control_area, area=0, position=(0, 0), gesture=None, action=None, is_gesture_applied=False):
+def update_control_panel(control_area, area=0, position=(0, 0), gesture=None, action=None, is_gesture_applied=False,
+                         stage_stats=None):
     """
     Actualiza el panel de control con la información actual.
     
@@ -70,6 +236,7 @@ def update_control_panel(control_area, area=0, position=(0, 0), gesture=None, ac
         gesture: Gesto detectado actualmente
         action: Acción realizada
         is_gesture_applied: Indica si el gesto se está aplicando
+        stage_stats: Resumen de latencias por etapa (StageMetrics.summary), o None
         
     Returns:
         control_area: Panel de control actualizado
@@ -99,6 +266,29 @@ def update_control_panel(control_area, area=0, position=(0, 0), gesture=None, ac
         cv2.putText(control_area, f"ACCIÓN: {action}", (10, 150),
                     cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 255), 2)
     
+    # Latencias por etapa en milisegundos (columnas en posiciones fijas)
+    if stage_stats:
+        columns = ("p50_ms", "p95_ms", "p99_ms", "max_ms")
+        for j, header in enumerate(("p50", "p95", "p99", "max")):
+            cv2.putText(control_area, header, (150 + j * 60, 178),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.4, (200, 200, 200), 1)
+        rows = (control_area.shape[0] - 4 - STAGE_TABLE_TOP) // STAGE_ROW_HEIGHT + 1
+        stages = list(stage_stats.items())
+        if len(stages) > rows:
+            # La última fila avisa de las etapas que no caben
+            hidden = len(stages) - (rows - 1)
+            stages = stages[:rows - 1]
+            cv2.putText(control_area, f"(+{hidden} etapas más)",
+                        (10, STAGE_TABLE_TOP + (rows - 1) * STAGE_ROW_HEIGHT),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.4, (200, 200, 200), 1)
+        for i, (stage, stats) in enumerate(stages):
+            y = STAGE_TABLE_TOP + i * STAGE_ROW_HEIGHT
+            cv2.putText(control_area, stage, (10, y),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.4, (200, 200, 200), 1)
+            for j, column in enumerate(columns):
+                cv2.putText(control_area, f"{stats[column]:.1f}", (150 + j * 60, y),
+                            cv2.FONT_HERSHEY_SIMPLEX, 0.4, (255, 255, 0), 1)
+    
     return control_area
 
 def draw_interface_guides(frame, left_region, right_region, frame_height, frame_width):
@@ -126,6 +316,137 @@ def draw_interface_guides(frame, left_region, right_region, frame_height, frame_
     
     return frame
 
+def draw_detection(frame, result):
+    """
+    Dibuja el contorno, el centro y la depuración del gesto de un resultado.
+    
+    Args:
+        frame: Frame donde dibujar
+        result: Diccionario devuelto por HandTracker.process
+        
+    Returns:
+        frame: Frame con la detección dibujada
+    """
+    contour, features = result['contour'], result['features']
+    landmarks = result.get('landmarks')
+    
+    # Llevar a coordenadas del frame lo calculado a la resolución de procesamiento
+    scale = result.get('scale', 1.0)
+    if scale != 1.0:
+        if contour is not None:
+            contour = (contour / scale).astype(np.int32)
+        if landmarks is not None:
+            landmarks = landmarks / scale
+        features = gesture_detection.scale_features(features, 1.0 / scale)
+    
+    if contour is not None:
+        cv2.drawContours(frame, [contour], 0, (0, 255, 0), 2)
+    if landmarks is not None:
+        for x, y in landmarks.astype(np.int32).tolist():
+            cv2.circle(frame, (x, y), 3, (255, 0, 0), -1)
+    if result['position'] is not None:
+        cv2.circle(frame, result['position'], 5, (0, 0, 255), -1)
+    gesture_detection.draw_gesture_debug(frame, features)
+    
+    # Demás manos seguidas, con su identificador y su gesto
+    for hand in result.get('hands', [])[1:]:
+        other = hand['contour'] if scale == 1.0 else (hand['contour'] / scale).astype(np.int32)
+        cv2.drawContours(frame, [other], 0, (255, 255, 0), 2)
+        cv2.putText(frame, f"#{hand['id']} {hand['gesture'] or ''}", hand['position'],
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 0), 1)
+    return frame
+
+def render_views(result, control_area, action, left_region, right_region, metrics=None,
+                 overlays=True):
+    """
+    Dibuja y muestra las ventanas de visualización a partir de un resultado.
+    
+    Dibuja directamente sobre result['frame'], por lo que solo debe llamarse
+    cuando la detección de ese frame ya terminó.
+    
+    Args:
+        result: Diccionario devuelto por HandTracker.process
+        control_area: Panel de control a actualizar
+        action: Última acción realizada
+        left_region: Coordenada x de la región izquierda
+        right_region: Coordenada x de la región derecha
+        metrics: StageMetrics cuyas latencias se muestran en el panel, o None
+        overlays: Si es False solo se muestra el frame, sin umbral, guías,
+            detección ni panel (para ahorrar tiempo con el equipo cargado)
+        
+    Returns:
+        control_area: Panel de control actualizado
+    """
+    frame = result['frame']
+    frame_height, frame_width = frame.shape[:2]
+    if not overlays:
+        cv2.imshow('Hand Mouse', frame)
+        return control_area
+    
+    # Mostrar imagen umbralizada (a la resolución de procesamiento)
+    proc_shape = frame.shape
+    scale = result.get('scale', 1.0)
+    if scale != 1.0:
+        proc_shape = (int(round(frame_height * scale)), int(round(frame_width * scale)))
+    if result['thresh'] is not None:
+        cv2.imshow('Threshold', place_in_frame(result['thresh'], result['roi'], proc_shape))
+    
+    # Dibujar guías de interfaz y la detección
+    display_frame = draw_interface_guides(frame, left_region, right_region,
+                                          frame_height, frame_width)
+    display_frame = draw_detection(display_frame, result)
+    
+    # Actualizar panel de control
+    if result['position'] is not None:
+        control_area = update_control_panel(
+            control_area, result['area'], result['position'],
+            result['gesture'], action, result['stable'],
+            metrics.summary() if metrics is not None else None
+        )
+    
+    # Mostrar frames
+    cv2.imshow('Hand Mouse', display_frame)
+    cv2.imshow('Control Area', control_area)
+    return control_area
+
+class RenderScheduler:
+    """
+    Decide en qué iteraciones se dibuja la visualización.
+    
+    Modos: "full" dibuja cada frame, "preview" dibuja a una frecuencia fija
+    a partir del último resultado y "headless" no dibuja ni abre ventanas.
+    """
+    
+    def __init__(self, mode=DISPLAY_MODE, rate_hz=PREVIEW_RATE_HZ):
+        """
+        Args:
+            mode: Modo de visualización ("full", "preview" o "headless")
+            rate_hz: Frecuencia de dibujo en modo "preview"
+        """
+        if mode not in ("full", "preview", "headless"):
+            raise ValueError(f"Modo de visualización desconocido: {mode}")
+        self.mode = mode
+        self.interval = 1.0 / rate_hz if rate_hz > 0 else 0.0
+        self._last_render = None
+    
+    @property
+    def headless(self):
+        return self.mode == "headless"
+    
+    def due(self, now=None):
+        """
+        Indica si toca dibujar en esta iteración.
+        """
+        if self.mode == "headless":
+            return False
+        if self.mode == "full":
+            return True
+        now = time.monotonic() if now is None else now
+        if self._last_render is None or now - self._last_render >= self.interval:
+            self._last_render = now
+            return True
+        return False
+
 def print_system_info():
     """
     Imprime información del sistema al iniciar el programa.
@@ -134,8 +455,10 @@ def print_system_info():
     print(f"OpenCV versión: {cv2.__version__}")
     print(f"NumPy versión: {np.__version__}")
     
+    # Consultar la versión instalada sin importar pyautogui (se carga en diferido)
+    if metadata is None:
+        return
     try:
-        import pyautogui
-        print(f"PyAutoGUI versión: {pyautogui.__version__}")
-    except ImportError:
+        print(f"PyAutoGUI versión: {metadata.version('pyautogui')}")
+    except metadata.PackageNotFoundError:
         print("PyAutoGUI no está instalado correctamente.")
\ No newline at end of file